@@ -0,0 +1,23 @@
+# app/api/health.py
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from app.service import startup
+
+router = APIRouter(tags=["health"])
+
+
+@router.get("/healthz")
+def healthz():
+    """GET /healthz (프로세스 생존 여부, 워밍업과 무관하게 항상 200)"""
+    return {"ok": True}
+
+
+@router.get("/readyz")
+def readyz():
+    """
+    GET /readyz (로드밸런서/배포 readiness 확인용)
+    - 임베딩 모델 / tokenizer / Qdrant 워밍업이 끝나야 200, 그 전이나 실패 시 503
+    """
+    status = dict(startup.state)
+    return JSONResponse(status, status_code=200 if status["ready"] else 503)
@@ -1,8 +1,16 @@
+import asyncio
+import json
 import os
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import JSONResponse
-from ..service.chat_service import ask_upstream
-from ..service.rag_service import build_context, augment_prompt
+import time
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from ..service import metrics
+from ..service.admission import AdmissionRejected, admission, coalesce, request_key
+from ..service.chat_service import ask_upstream, stream_upstream
+from ..service.rag_service import (
+    ANSWER_CACHE_ENABLED, build_context, build_contexts, augment_prompt, embed_query, embed_queries,
+    lookup_answer, store_answer, cache_stats,
+)
 
 router = APIRouter(
     prefix="/api/chat",
@@ -12,8 +20,87 @@ router = APIRouter(
 # .env 설정값 중 STRICT_RAG: RAG 엄격 모드 (컨텍스트 없으면 바로 종료)
 STRICT_RAG = os.getenv("STRICT_RAG", "false").lower() == "true"
 
+# 일괄 질의(/ask-batch) 설정
+ASK_BATCH_SIZE = int(os.getenv("ASK_BATCH_SIZE", "64"))                # 임베딩/Qdrant 배치 검색 1번에 묶는 질문 수
+ASK_BATCH_CONCURRENCY = int(os.getenv("ASK_BATCH_CONCURRENCY", "8"))   # 요청 1건당 동시 LLM 호출 수 상한
+ASK_BATCH_MAX_ITEMS = int(os.getenv("ASK_BATCH_MAX_ITEMS", "10000"))   # 요청 1건당 최대 질문 수
+
+
+# ---------------------------------------------------------
+# /ask, /ask-stream 공통 전처리
+#    - 입력 검증 → RAG 컨텍스트 생성 → 프롬프트 구성
+#    - LLM 호출 없이 바로 안내 메시지를 돌려줘야 하면 "answer"/"reason"을 채워서 반환
+#    - 일괄 질의는 미리 계산한 질의 벡터(vector)와 검색 결과(retrieved)를 넘김
+# ---------------------------------------------------------
+async def _prepare(payload: dict, vector: list | None = None, retrieved: tuple | None = None) -> dict:
+    # 1. 입력 검증
+    message = (payload.get("message") or "").strip()
+    if not message:
+        raise HTTPException(status_code=400, detail="message is required")
+
+    # 2. .env 값 (없으면 기본값 사용)
+    temperature = float(os.getenv("DEFAULT_TEMPERATURE", "0.7"))
+    max_tokens  = int(os.getenv("DEFAULT_MAX_TOKENS", "4096"))
+    system_prompt = os.getenv("DEFAULT_SYSTEM")
+
+    # 3. 의미 기반 답변 캐시 조회 (비슷한 질문에 이미 답했으면 검색/LLM 호출 생략)
+    params = (system_prompt, temperature, max_tokens)
+    if vector is None and ANSWER_CACHE_ENABLED:
+        vector = await embed_query(message)
+    if vector is not None:
+        cached = await lookup_answer(vector, params)
+        if cached is not None:
+            return {"answer": cached["answer"], "reason": "semantic_cache", "sources": cached["sources"]}
+
+    # 4. RAG 컨텍스트 생성
+    if retrieved is None:
+        retrieved = await build_context(message, vector=vector)
+    context, sources, ready = retrieved
+
+    # 5. 색인된 데이터가 아예 없는 경우 (컬렉션 없음 or 비어 있음)
+    if not ready:
+        return {
+            "answer": "현재 검색 가능한 데이터가 없습니다. 먼저 문서를 색인해 주세요.",
+            "reason": "no_collection_or_empty",
+            "sources": [],
+        }
+
+    # 6. 색인은 있지만 관련 문서가 없을 경우 (컨텍스트 없음)
+    if STRICT_RAG and not context.strip():
+        metrics.STRICT_RAG_SHORT_CIRCUITS.inc()
+        return {
+            "answer": "관련된 정보를 찾을 수 없습니다. 다른 표현으로 다시 질문해 주세요.",
+            "reason": "no_context",
+            "sources": sources,
+        }
+
+    # 7. LLM 프롬프트 생성
+    system_prompt, augmented = augment_prompt(system_prompt, context, message)
+
+    return {
+        "answer": None,
+        "sources": sources,
+        "cache": {"query": message, "vector": vector, "params": params},
+        "upstream": {
+            "message": augmented,
+            "system": system_prompt,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+        },
+    }
+
+
+def _client_key(request: Request) -> str:
+    """공정 대기열에서 사용자를 구분하는 값 (X-Client-Id 헤더, 없으면 IP)"""
+    return request.headers.get("x-client-id") or (request.client.host if request.client else "")
+
+
+def _queue_info(wait: float, coalesced: bool = False) -> dict:
+    return {"wait_ms": round(wait * 1000, 1), "coalesced": coalesced}
+
+
 @router.post("/ask")
-async def ask(payload: dict):
+async def ask(payload: dict, request: Request):
     """
     클라이언트로부터 들어온 질의(`message`)를 받아
     1) RAG 컨텍스트를 생성하고
@@ -23,61 +110,317 @@ async def ask(payload: dict):
     - 색인 없음 → "색인 필요 안내"
     - 컨텍스트 없음 → "적절한 정보 없음 안내"
     - 컨텍스트 있음 → vLLM 호출 후 응답 반환
+      (동시 요청 제한 대기열을 거치며, 같은 프롬프트로 처리 중인 요청이 있으면 그 결과를 공유)
     """
     try:
-        # 1. 입력 검증
-        message = (payload.get("message") or "").strip()
-        if not message:
-            raise HTTPException(status_code=400, detail="message is required")
-
-        # 2. .env 값 (없으면 기본값 사용)
-        temperature = float(os.getenv("DEFAULT_TEMPERATURE", "0.7"))
-        max_tokens  = int(os.getenv("DEFAULT_MAX_TOKENS", "4096"))
-        system_prompt = os.getenv("DEFAULT_SYSTEM")
-
-        # 3. RAG 컨텍스트 생성
-        context, sources, ready = build_context(message)
-
-        # 4. 색인된 데이터가 아예 없는 경우 (컬렉션 없음 or 비어 있음)
-        if not ready:
-            return JSONResponse({
-                "ok": True,
-                "answer": "현재 검색 가능한 데이터가 없습니다. 먼저 문서를 색인해 주세요.",
-                "raw": {"reason": "no_collection_or_empty"}
-            })
+        prepared = await _prepare(payload)
 
-        # 5. 색인은 있지만 관련 문서가 없을 경우 (컨텍스트 없음)
-        if STRICT_RAG and not context.strip():
+        # 캐시 적중 / 색인 없음 / 컨텍스트 없음 → LLM 호출 없이 응답
+        if prepared["answer"] is not None:
+            raw = {"reason": prepared["reason"]}
+            if prepared["reason"] == "semantic_cache":
+                raw["sources"] = prepared["sources"]
             return JSONResponse({
                 "ok": True,
-                "answer": "관련된 정보를 찾을 수 없습니다. 다른 표현으로 다시 질문해 주세요.",
-                "raw": {"reason": "no_context"}
+                "answer": prepared["answer"],
+                "raw": raw
             })
 
-        # 6. LLM 프롬프트 생성
-        system_prompt, augmented = augment_prompt(system_prompt, context, message)
+        # 8. vLLM 서버로 질의 전송 (슬롯 대기 → 호출, 동일 요청은 합침)
+        result, coalesced = await _call_upstream(prepared, _client_key(request))
 
-        # 7. vLLM 서버로 질의 전송
-        result = await ask_upstream(
-            message=augmented,
-            system=system_prompt,
-            temperature=temperature,
-            max_tokens=max_tokens,
-        )
-
-        # 8. 최종 응답 (일관된 포맷)
+        # 9. 최종 응답 (일관된 포맷)
         return JSONResponse({
             "ok": True,
             "answer": result["answer"],
-            "raw": {"llm_raw": result["raw"], "sources": sources}
+            "raw": {
+                "llm_raw": result["raw"],
+                "sources": prepared["sources"],
+                "upstream_timing": result["timing"],
+                "queue": _queue_info(result["queue_wait"], coalesced),
+            }
         })
 
-    # FastAPI 기본 예외
+    # FastAPI 기본 예외 (대기열 거절 429/503은 Retry-After 헤더 포함)
     except HTTPException as e:
         print("[/api/ask] HTTPException:", repr(e.detail))
-        return JSONResponse(status_code=e.status_code, content={"ok": False, "error": e.detail})
+        return JSONResponse(status_code=e.status_code, content={"ok": False, "error": e.detail}, headers=e.headers)
 
     # 기타 모든 예외 (예: 네트워크, JSON 파싱, Qdrant 오류 등)
     except Exception as e:
         print("[/api/ask] Exception:", repr(e))
         return JSONResponse(status_code=500, content={"ok": False, "error": str(e)})
+
+
+async def _call_upstream(prepared: dict, client: str) -> tuple:
+    """
+    vLLM 호출 (대기열 슬롯 대기 → 호출)
+    - 같은 프롬프트로 처리 중인 요청이 있으면 그 결과를 공유
+    - 반환: (result, coalesced), 직접 호출한 경우에만 답변 캐시에 저장
+    """
+    upstream = prepared["upstream"]
+
+    async def call():
+        async with admission.slot(client) as slot:
+            result = await ask_upstream(**upstream)
+        return {**result, "queue_wait": slot["wait"]}
+
+    result, coalesced = await coalesce(request_key(**upstream), call)
+    if not coalesced:
+        _store(prepared, result["answer"])
+    return result, coalesced
+
+
+def _store(prepared: dict, answer: str):
+    cache = prepared["cache"]
+    if cache["vector"] is not None:
+        store_answer(cache["query"], cache["vector"], cache["params"], answer, prepared["sources"])
+
+
+@router.get("/cache")
+async def get_cache_stats():
+    """질의 벡터 / 답변 캐시 적중률 조회"""
+    return {"ok": True, **cache_stats()}
+
+
+@router.get("/admission")
+async def get_admission_stats():
+    """vLLM 동시 요청 수 / 대기열 상태 조회"""
+    return {"ok": True, **admission.stats()}
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@router.post("/ask-stream")
+async def ask_stream(payload: dict, request: Request):
+    """
+    /ask 와 같은 처리를 하되, 응답을 Server-Sent Events로 스트리밍하는 엔드포인트.
+
+    이벤트 순서
+    - sources : 컨텍스트에 사용된 문서 출처 목록 (항상 첫 이벤트)
+    - token   : 모델이 생성한 텍스트 조각 (여러 번)
+    - done    : 종료 (reason 또는 upstream timing, 대기열 대기 시간 포함)
+    - error   : 오류 발생 시 (status, error, 대기열 거절이면 retry_after)
+
+    스트리밍은 응답 전체 동안 슬롯을 점유하며, 요청을 합치지 않습니다.
+    """
+    # 입력 검증 / RAG 오류 / 대기열 가득 참은 스트림 시작 전에 일반 JSON 오류로 반환
+    try:
+        prepared = await _prepare(payload)
+        if prepared["answer"] is None:
+            admission.check(_client_key(request))
+    except HTTPException as e:
+        print("[/api/ask-stream] HTTPException:", repr(e.detail))
+        return JSONResponse(status_code=e.status_code, content={"ok": False, "error": e.detail}, headers=e.headers)
+    except Exception as e:
+        print("[/api/ask-stream] Exception:", repr(e))
+        return JSONResponse(status_code=500, content={"ok": False, "error": str(e)})
+
+    async def events():
+        yield _sse("sources", {"sources": prepared["sources"]})
+
+        # 캐시 적중 / 색인 없음 / 컨텍스트 없음 → 안내 메시지(또는 캐시된 답변) 1개로 종료
+        if prepared["answer"] is not None:
+            yield _sse("token", {"text": prepared["answer"]})
+            yield _sse("done", {"reason": prepared["reason"]})
+            return
+
+        try:
+            parts = []
+            async with admission.slot(_client_key(request)) as slot:
+                async for ev in stream_upstream(**prepared["upstream"]):
+                    if ev["type"] == "token":
+                        parts.append(ev["text"])
+                        yield _sse("token", {"text": ev["text"]})
+                    else:
+                        _store(prepared, "".join(parts))
+                        yield _sse("done", {
+                            "finish_reason": ev["finish_reason"],
+                            "upstream_timing": ev["timing"],
+                            "queue": _queue_info(slot["wait"]),
+                        })
+        except AdmissionRejected as e:
+            print("[/api/ask-stream] AdmissionRejected:", repr(e.detail))
+            yield _sse("error", {"status": e.status_code, "error": e.detail, "retry_after": e.retry_after})
+        except HTTPException as e:
+            print("[/api/ask-stream] HTTPException:", repr(e.detail))
+            yield _sse("error", {"status": e.status_code, "error": e.detail})
+        except Exception as e:
+            print("[/api/ask-stream] Exception:", repr(e))
+            yield _sse("error", {"status": 500, "error": str(e)})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+# ---------------------------------------------------------
+# 일괄 질의 (/ask-batch)
+#    - 질문을 ASK_BATCH_SIZE개씩 묶어 임베딩 일괄 forward + Qdrant 배치 검색 1번
+#    - 검색이 끝난 질문은 작업 대기열로 → 워커 concurrency개가 LLM 호출
+#      (작업 대기열 크기 제한으로 검색이 LLM 호출보다 너무 앞서가지 않음)
+#    - 각 질문은 /ask 와 같은 전처리/대기열/요청 합치기를 거침
+#    - 질문별 오류는 해당 결과에만 기록하고 나머지는 계속 처리
+#    - 검색/워커 태스크 자체가 실패하면 남은 질문을 모두 실패로 기록하고 종료
+# ---------------------------------------------------------
+def _batch_items(payload: dict) -> list:
+    items = payload.get("items")
+    if not isinstance(items, list) or not items:
+        raise HTTPException(status_code=400, detail="items is required")
+    if len(items) > ASK_BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"items must be at most {ASK_BATCH_MAX_ITEMS}")
+
+    parsed = []
+    for i, item in enumerate(items):
+        # 문자열 또는 {"id": ..., "message": ...}
+        message = item.get("message") if isinstance(item, dict) else item
+        parsed.append({
+            "index": i,
+            "id": item.get("id", i) if isinstance(item, dict) else i,
+            "message": message.strip() if isinstance(message, str) else "",
+        })
+    return parsed
+
+
+async def _retrieve_batch(items: list):
+    """질문 묶음의 질의 벡터 / RAG 컨텍스트를 item에 채움 (실패하면 묶음 전체에 오류 기록)"""
+    valid = [it for it in items if it["message"]]
+    if not valid:
+        return
+    try:
+        messages = [it["message"] for it in valid]
+        vectors = await embed_queries(messages)
+        contexts = await build_contexts(messages, vectors)
+    except Exception as e:
+        print("[/api/ask-batch] Retrieval error:", repr(e))
+        for it in valid:
+            it["error"] = e
+        return
+    for it, vector, retrieved in zip(valid, vectors, contexts):
+        it["vector"], it["retrieved"] = vector, retrieved
+
+
+async def _answer_item(item: dict, client: str) -> dict:
+    base = {"index": item["index"], "id": item["id"]}
+    if "error" in item:
+        return {**base, "ok": False, "status": 500, "error": str(item["error"])}
+
+    try:
+        prepared = await _prepare(
+            {"message": item["message"]}, vector=item.get("vector"), retrieved=item.get("retrieved")
+        )
+        if prepared["answer"] is not None:
+            return {**base, "ok": True, "answer": prepared["answer"],
+                    "reason": prepared["reason"], "sources": prepared["sources"]}
+
+        result, coalesced = await _call_upstream(prepared, client)
+        return {
+            **base,
+            "ok": True,
+            "answer": result["answer"],
+            "sources": prepared["sources"],
+            "upstream_timing": result["timing"],
+            "queue": _queue_info(result["queue_wait"], coalesced),
+        }
+    except AdmissionRejected as e:
+        return {**base, "ok": False, "status": e.status_code, "error": e.detail, "retry_after": e.retry_after}
+    except HTTPException as e:
+        return {**base, "ok": False, "status": e.status_code, "error": e.detail}
+    except Exception as e:
+        print("[/api/ask-batch] Exception:", repr(e))
+        return {**base, "ok": False, "status": 500, "error": str(e)}
+
+
+@router.post("/ask-batch")
+async def ask_batch(payload: dict, request: Request):
+    """
+    여러 질문을 한 번에 처리하고, 끝나는 순서대로 NDJSON(한 줄에 JSON 1개)으로 스트리밍하는 엔드포인트.
+
+    요청: {"items": ["질문", {"id": "q-1", "message": "질문"}, ...], "concurrency": 4}
+    - concurrency: 동시 LLM 호출 수 (ASK_BATCH_CONCURRENCY 이하, 생략 시 상한값)
+
+    응답 줄
+    - 질문별 결과: {"index", "id", "ok", "answer", "sources", ...}
+      실패 시 {"index", "id", "ok": false, "status", "error"} (배치는 계속 진행)
+    - 마지막 줄: {"done": true, "total", "ok", "errors", "elapsed_ms"}
+    """
+    try:
+        items = _batch_items(payload)
+        concurrency = int(payload.get("concurrency") or ASK_BATCH_CONCURRENCY)
+    except HTTPException as e:
+        return JSONResponse(status_code=e.status_code, content={"ok": False, "error": e.detail})
+    except (TypeError, ValueError):
+        return JSONResponse(status_code=400, content={"ok": False, "error": "concurrency must be an integer"})
+
+    concurrency = max(1, min(concurrency, ASK_BATCH_CONCURRENCY))
+    client = _client_key(request)
+
+    async def lines():
+        started = time.perf_counter()
+        work = asyncio.Queue(maxsize=ASK_BATCH_SIZE)
+        done = asyncio.Queue()
+
+        async def retrieve():
+            for start in range(0, len(items), ASK_BATCH_SIZE):
+                group = items[start:start + ASK_BATCH_SIZE]
+                await _retrieve_batch(group)
+                for it in group:
+                    await work.put(it)
+            for _ in range(concurrency):
+                await work.put(None)
+
+        async def worker():
+            while (item := await work.get()) is not None:
+                await done.put(await _answer_item(item, client))
+
+        async def guarded(coro):
+            # 검색/워커 태스크가 예외로 끝나면 결과 대기열에 알려서 스트림이 멈추지 않도록 함
+            try:
+                await coro
+            except Exception as e:
+                print("[/api/ask-batch] Task failed:", repr(e))
+                await done.put(e)
+
+        tasks = [asyncio.create_task(guarded(retrieve()))]
+        tasks += [asyncio.create_task(guarded(worker())) for _ in range(concurrency)]
+        pending = {it["index"]: it for it in items}
+        ok = 0
+        try:
+            while pending:
+                result = await done.get()
+                if isinstance(result, Exception):
+                    # 아직 결과가 없는 질문은 모두 실패로 기록하고 스트림 종료
+                    results = [{"index": i, "id": it["id"], "ok": False, "status": 500, "error": str(result)}
+                               for i, it in pending.items()]
+                else:
+                    results = [result]
+                for r in results:
+                    pending.pop(r["index"], None)
+                    ok += r["ok"]
+                    metrics.BATCH_ITEMS.inc(outcome="ok" if r["ok"] else "error")
+                    yield json.dumps(r, ensure_ascii=False) + "\n"
+
+            elapsed = time.perf_counter() - started
+            print(f"[/api/ask-batch] {len(items)} items ({ok} ok, {len(items) - ok} errors) in {elapsed:.2f}s")
+            yield json.dumps({
+                "done": True,
+                "total": len(items),
+                "ok": ok,
+                "errors": len(items) - ok,
+                "elapsed_ms": round(elapsed * 1000, 1),
+            }) + "\n"
+        finally:
+            # 클라이언트 연결이 끊기면 남은 검색/LLM 호출 취소
+            for t in tasks:
+                t.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    return StreamingResponse(
+        lines(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,59 +1,267 @@
 # app/api/upload.py
-from pathlib import Path
+import asyncio
+from pathlib import PurePosixPath
+from typing import List
 
-from fastapi import APIRouter, UploadFile, File, HTTPException
+from fastapi import APIRouter, UploadFile, File, HTTPException, Request
+from fastapi.responses import JSONResponse
 
-from app.rag.indexer import run as run_indexer
+from app.rag import catalog, jobs
+from app.service import upload_service
+from app.service.upload_service import UPLOAD_DIR, save_upload
 
 router = APIRouter(prefix="/api/rag", tags=["rag"])
 
-UPLOAD_DIR = Path("data/uploads")
-UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
-
 
 @router.post("/upload")
-async def upload_file(file: UploadFile = File(...)):
+async def upload_file(
+    files: List[UploadFile] = File(None),
+    file: UploadFile | None = File(None),
+):
     """
     업로드된 파일을 data/uploads 디렉토리에 저장합니다.
+    - 여러 파일은 "files" 필드로 전송 (기존 "file" 단일 필드도 허용)
+    - 청크 단위로 임시 파일에 쓴 뒤 완료 시 이동, 파일별 크기와 sha256 반환
+    - 파일별로 따로 저장: 일부가 실패해도 나머지는 계속 저장하고
+      207 응답의 files(저장됨) / failed(파일명, status, error)로 어떤 파일이 저장됐는지 알려줌
     """
-    out_path = UPLOAD_DIR / file.filename
+    uploads = list(files or []) + ([file] if file is not None else [])
+    if not uploads:
+        raise HTTPException(status_code=400, detail="업로드할 파일이 없습니다.")
+
+    saved, failed = [], []
+    for f in uploads:
+        try:
+            saved.append(await save_upload(f))
+        except HTTPException as e:
+            failed.append({"filename": f.filename, "status": e.status_code, "error": e.detail})
+        except Exception as e:
+            failed.append({"filename": f.filename, "status": 500, "error": f"파일 저장 중 오류: {e}"})
+        finally:
+            await f.close()
+
+    # 파일 1개 업로드는 기존처럼 오류 응답
+    if len(uploads) == 1 and failed:
+        raise HTTPException(status_code=failed[0]["status"], detail=failed[0]["error"])
+    if failed:
+        return JSONResponse(status_code=207, content={
+            "ok": False,
+            "filename": saved[0]["filename"] if saved else None,
+            "files": saved,
+            "failed": failed,
+        })
 
+    return {"ok": True, "filename": saved[0]["filename"], "files": saved, "failed": []}
+
+# ---------------------------------------------------------
+# 분할(재개 가능) 업로드
+#    1) POST   /uploads                      {filename, size, part_size?} → session_id, part_size, total_parts
+#    2) PUT    /uploads/{id}/parts/{n}       요청 본문 = 파트 바이트 (순서 무관, 동시 전송 가능)
+#    3) GET    /uploads/{id}                 받은 파트 번호(received) 조회 → 끊긴 경우 나머지만 재전송
+#    4) POST   /uploads/{id}/complete        서버에서 조립 후 data/uploads 로 이동
+#       DELETE /uploads/{id}                 세션 취소
+# ---------------------------------------------------------
+@router.post("/uploads")
+async def create_upload_session(payload: dict):
+    filename = payload.get("filename")
     try:
-        contents = await file.read()
-        out_path.write_bytes(contents)
+        size = int(payload.get("size") or 0)
+        part_size = int(payload["part_size"]) if payload.get("part_size") else None
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="size/part_size는 정수여야 합니다.")
+
+    meta = await upload_service.create_session(filename, size, part_size)
+    return {"ok": True, **meta}
+
+
+@router.get("/uploads/{session_id}")
+async def get_upload_session(session_id: str):
+    return {"ok": True, **await upload_service.session_status(session_id)}
+
+
+@router.put("/uploads/{session_id}/parts/{part_number}")
+async def put_upload_part(session_id: str, part_number: int, request: Request):
+    part = await upload_service.put_part(session_id, part_number, request.stream())
+    return {"ok": True, **part}
+
+
+@router.post("/uploads/{session_id}/complete")
+async def complete_upload_session(session_id: str):
+    try:
+        saved = await upload_service.complete_session(session_id)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
-            detail=f"파일 저장 중 오류: {e}",
+            detail=f"파일 조립 중 오류: {e}",
         )
 
-    return {"ok": True, "filename": file.filename}
+    return {"ok": True, **saved}
+
+
+@router.delete("/uploads/{session_id}")
+async def abort_upload_session(session_id: str):
+    await upload_service.abort_session(session_id)
+    return {"ok": True, "session_id": session_id}
+
 
 @router.post("/embed-all")
 async def embed_all():
+    """
+    data/uploads 전체 색인 작업을 백그라운드 워커에 등록하고 즉시 job_id를 반환합니다.
+    진행 상황은 GET /api/rag/jobs/{job_id} 로 조회합니다.
+    """
     try:
-        run_indexer()
+        job = jobs.submit()
     except Exception as e:
         raise HTTPException(
             status_code=500,
-            detail=f"임베딩 중 오류: {e}",
+            detail=f"임베딩 작업 등록 중 오류: {e}",
         )
 
-    return {"ok": True}
+    return {"ok": True, "job_id": job.id, "status": job.status}
+
+
+@router.get("/jobs")
+async def list_jobs():
+    return {"ok": True, "jobs": jobs.list_jobs()}
+
+
+@router.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="작업이 존재하지 않습니다.")
+
+    return {"ok": True, **job.to_dict()}
+
+@router.get("/documents")
+async def list_documents(
+    page: int = 1,
+    page_size: int = 50,
+    sort: str = "uploaded_at",
+    order: str = "desc",
+    status: str | None = None,
+):
+    """
+    문서 카탈로그 목록 (페이지 단위, 정렬 가능)
+    - sort: source_id / uploaded_at / indexed_at / updated_at / size / status / chunks
+    - status: uploaded / indexing / indexed / failed
+    """
+    if sort not in catalog.SORT_COLUMNS:
+        raise HTTPException(status_code=400, detail=f"sort는 {', '.join(catalog.SORT_COLUMNS)} 중 하나여야 합니다.")
+    if status and status not in catalog.STATUSES:
+        raise HTTPException(status_code=400, detail=f"status는 {', '.join(catalog.STATUSES)} 중 하나여야 합니다.")
+
+    # SQLite 조회는 색인 작업의 쓰기와 겹치면 대기할 수 있으므로 이벤트 루프 밖에서 실행
+    result = await asyncio.to_thread(
+        catalog.list_documents, page=page, page_size=page_size, sort=sort, order=order, status=status
+    )
+    counts = await asyncio.to_thread(catalog.counts_by_status)
+    return {"ok": True, **result, "counts": counts}
 
-@router.delete("/file/{filename}")
-async def delete_file(filename: str):
-    file_path = UPLOAD_DIR / filename
 
+def _check_source_id(source_id: str) -> str:
+    """data/uploads 기준 상대 경로만 허용 (절대 경로, .. 금지)"""
+    parts = PurePosixPath(source_id).parts
+    if not parts or source_id.startswith("/") or any(p in ("", ".", "..") for p in parts):
+        raise HTTPException(status_code=400, detail="문서 ID가 올바르지 않습니다.")
+    return source_id
+
+
+async def _run_exclusive(fn, *args):
+    """
+    색인 작업은 매니페스트를 통째로 읽고 쓰므로, 문서 단위 변경은 색인 잠금을 잡고 스레드에서 실행
+    (작업이 대기/실행 중이면 409)
+    """
+    try:
+        return await asyncio.to_thread(jobs.run_exclusive, fn, *args)
+    except jobs.IndexBusy as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+@router.get("/documents/{source_id:path}")
+async def get_document(source_id: str):
+    doc = await asyncio.to_thread(catalog.get, source_id)
+    if doc is None:
+        raise HTTPException(status_code=404, detail="문서가 존재하지 않습니다.")
+
+    return {"ok": True, **doc}
+
+
+@router.delete("/documents/{source_id:path}")
+async def delete_document(source_id: str):
+    """
+    문서를 색인에서 삭제합니다.
+    - source_id payload 필터로 해당 문서의 Qdrant 포인트만 삭제
+    - 업로드/임베딩 완료 파일, 매니페스트, 카탈로그 항목도 함께 삭제
+    """
+    _check_source_id(source_id)
+    if await asyncio.to_thread(catalog.get, source_id) is None:
+        raise HTTPException(status_code=404, detail="문서가 존재하지 않습니다.")
+
+    from app.rag.indexer import delete_document as delete_indexed_document
+
+    try:
+        result = await _run_exclusive(delete_indexed_document, source_id)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"문서 삭제 중 오류: {e}",
+        )
+
+    return {"ok": True, **result}
+
+
+@router.post("/documents/{source_id:path}/reindex")
+async def reindex_document(source_id: str):
+    """
+    문서 1건만 다시 임베딩하는 작업을 등록합니다.
+    - 같은 청크는 같은 포인트 ID로 덮어쓰고, 더 이상 없는 청크의 포인트는 삭제
+    """
+    _check_source_id(source_id)
+
+    from app.rag.indexer import prepare_reindex
+
+    if not await _run_exclusive(prepare_reindex, source_id):
+        raise HTTPException(status_code=404, detail="원본 파일이 존재하지 않습니다.")
+
+    job = jobs.submit(source_ids=[source_id], force=True)
+    return {"ok": True, "job_id": job.id, "status": job.status}
+
+
+def _delete_upload(filename: str) -> bool:
+    """색인 전 업로드 파일 삭제 (없으면 False)"""
+    file_path = UPLOAD_DIR / filename
     if not file_path.exists():
-        raise HTTPException(status_code=404, detail="파일이 존재하지 않습니다.")
+        return False
+
+    file_path.unlink()
+    doc = catalog.get(filename)
+    if doc is not None and doc["indexed_at"] is not None:
+        # 이전에 색인된 버전이 남아 있으면 그 상태로 되돌림
+        catalog.mark_indexed(filename)
+    else:
+        catalog.remove(filename)
+    return True
 
+
+@router.delete("/file/{filename}")
+async def delete_file(filename: str):
+    # 색인 작업이 이 파일을 읽거나 옮기는 중일 수 있으므로 같은 잠금 아래에서 삭제
     try:
-        file_path.unlink()
+        deleted = await _run_exclusive(_delete_upload, filename)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"파일 삭제 중 오류: {e}",
         )
 
+    if not deleted:
+        raise HTTPException(status_code=404, detail="파일이 존재하지 않습니다.")
     return {"ok": True, "filename": filename}
\ No newline at end of file
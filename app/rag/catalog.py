@@ -0,0 +1,252 @@
+# app/rag/catalog.py
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+# === 환경 변수 설정 ===
+CATALOG_PATH = Path(os.getenv("RAG_CATALOG_PATH", "data/catalog.db"))
+
+BASE_DATA_DIR = Path("data")
+UPLOAD_DIR = BASE_DATA_DIR / "uploads"      # 임베딩 대기 파일
+EMBEDDED_DIR = BASE_DATA_DIR / "embedded"   # 임베딩 완료 파일
+
+# 문서 상태
+STATUSES = ("uploaded", "indexing", "indexed", "failed")
+STATUS_LABELS = {
+    "uploaded": "업로드됨",
+    "indexing": "색인 중",
+    "indexed": "색인 완료",
+    "failed": "실패",
+}
+
+# 목록 정렬에 허용하는 컬럼 (SQL에 직접 넣으므로 반드시 화이트리스트로 제한)
+SORT_COLUMNS = ("source_id", "uploaded_at", "indexed_at", "updated_at", "size", "status", "chunks")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    source_id   TEXT PRIMARY KEY,          -- data/uploads 기준 상대 경로 (indexer.source_id_of)
+    sha256      TEXT,
+    size        INTEGER NOT NULL DEFAULT 0,
+    status      TEXT NOT NULL,
+    chunks      INTEGER NOT NULL DEFAULT 0,
+    point_ids   TEXT NOT NULL DEFAULT '[]',  -- Qdrant 포인트 ID 목록 (JSON)
+    error       TEXT,
+    location    TEXT NOT NULL,             -- uploads / embedded
+    uploaded_at REAL NOT NULL,
+    indexed_at  REAL,
+    updated_at  REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_documents_status ON documents(status);
+CREATE INDEX IF NOT EXISTS idx_documents_uploaded_at ON documents(uploaded_at);
+CREATE INDEX IF NOT EXISTS idx_documents_indexed_at ON documents(indexed_at);
+CREATE INDEX IF NOT EXISTS idx_documents_updated_at ON documents(updated_at);
+"""
+
+# 목록 조회 시 읽는 컬럼 (point_ids는 문서당 수천 개일 수 있으므로 제외)
+_LIST_COLUMNS = "source_id, sha256, size, status, chunks, error, location, uploaded_at, indexed_at, updated_at"
+
+
+# ----------------------------------------------------------
+# 문서 카탈로그 (SQLite)
+#    - 업로드/색인/삭제 시 문서 1건의 상태를 기록
+#    - 화면 목록은 디렉토리를 훑지 않고 인덱스가 있는 테이블에서 페이지 단위로 조회
+#    - 연결은 스레드별로 1개 (API 이벤트 루프 / 색인 워커 스레드)
+#    - WAL 모드: 색인 워커가 쓰는 동안에도 목록 조회가 막히지 않음
+# ----------------------------------------------------------
+_local = threading.local()
+_init_lock = threading.Lock()
+_initialized = False
+
+
+def _connect() -> sqlite3.Connection:
+    conn = getattr(_local, "conn", None)
+    if conn is not None:
+        return conn
+
+    CATALOG_PATH.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(CATALOG_PATH, timeout=5.0)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    _local.conn = conn
+
+    global _initialized
+    with _init_lock:
+        if not _initialized:
+            conn.executescript(_SCHEMA)
+            _bootstrap(conn)
+            _initialized = True
+    return conn
+
+
+def _bootstrap(conn: sqlite3.Connection):
+    """
+    카탈로그가 비어 있으면 기존 디렉토리 내용으로 한 번 채움
+    (카탈로그 도입 전에 올린 파일, 해시는 다음 색인 때 기록)
+    """
+    if conn.execute("SELECT 1 FROM documents LIMIT 1").fetchone():
+        return
+
+    rows = []
+    for base, location, status in ((EMBEDDED_DIR, "embedded", "indexed"), (UPLOAD_DIR, "uploads", "uploaded")):
+        if not base.exists():
+            continue
+        for path in base.glob("**/*"):
+            if not path.is_file():
+                continue
+            st = path.stat()
+            rows.append((
+                path.relative_to(base).as_posix(), st.st_size, status, location,
+                st.st_mtime, st.st_mtime if status == "indexed" else None, st.st_mtime,
+            ))
+    with conn:
+        conn.executemany(
+            "INSERT OR REPLACE INTO documents (source_id, size, status, location, uploaded_at, indexed_at, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            rows,
+        )
+    if rows:
+        print(f"[RAG] Catalog initialized from disk: {len(rows)} documents")
+
+
+def _row_to_dict(row: sqlite3.Row) -> dict:
+    d = dict(row)
+    if "point_ids" in d:
+        d["point_ids"] = json.loads(d["point_ids"] or "[]")
+    d["status_label"] = STATUS_LABELS.get(d["status"], d["status"])
+    return d
+
+
+# ----------------------------------------------------------
+# 기록
+# ----------------------------------------------------------
+def record_upload(source_id: str, sha256: str, size: int):
+    """업로드 완료 (같은 이름의 파일이면 새 버전으로 교체, 다음 색인 때 다시 처리)"""
+    now = time.time()
+    conn = _connect()
+    with conn:
+        conn.execute(
+            """
+            INSERT INTO documents (source_id, sha256, size, status, location, uploaded_at, updated_at)
+            VALUES (?, ?, ?, 'uploaded', 'uploads', ?, ?)
+            ON CONFLICT(source_id) DO UPDATE SET
+                sha256 = excluded.sha256, size = excluded.size, status = 'uploaded', error = NULL,
+                location = 'uploads', uploaded_at = excluded.uploaded_at, updated_at = excluded.updated_at
+            """,
+            (source_id, sha256, size, now, now),
+        )
+
+
+def mark_indexing(source_id: str, sha256: str, size: int):
+    """색인 시작 (카탈로그에 없던 파일도 등록)"""
+    now = time.time()
+    conn = _connect()
+    with conn:
+        conn.execute(
+            """
+            INSERT INTO documents (source_id, sha256, size, status, location, uploaded_at, updated_at)
+            VALUES (?, ?, ?, 'indexing', 'uploads', ?, ?)
+            ON CONFLICT(source_id) DO UPDATE SET
+                sha256 = excluded.sha256, size = excluded.size, status = 'indexing', error = NULL,
+                updated_at = excluded.updated_at
+            """,
+            (source_id, sha256, size, now, now),
+        )
+
+
+def mark_indexed(source_id: str, point_ids: list | None = None):
+    """색인 완료 (point_ids가 None이면 변경 없는 파일 → 기존 포인트 목록 유지)"""
+    now = time.time()
+    conn = _connect()
+    with conn:
+        if point_ids is None:
+            conn.execute(
+                "UPDATE documents SET status = 'indexed', error = NULL, location = 'embedded', "
+                "indexed_at = COALESCE(indexed_at, ?), updated_at = ? WHERE source_id = ?",
+                (now, now, source_id),
+            )
+        else:
+            conn.execute(
+                "UPDATE documents SET status = 'indexed', error = NULL, location = 'embedded', "
+                "chunks = ?, point_ids = ?, indexed_at = ?, updated_at = ? WHERE source_id = ?",
+                (len(point_ids), json.dumps(point_ids), now, now, source_id),
+            )
+
+
+def mark_failed(source_id: str, error):
+    now = time.time()
+    conn = _connect()
+    with conn:
+        conn.execute(
+            "UPDATE documents SET status = 'failed', error = ?, updated_at = ? WHERE source_id = ?",
+            (str(error), now, source_id),
+        )
+
+
+def fail_indexing(error):
+    """색인 작업이 중간에 실패했을 때 "indexing" 상태로 남은 문서를 모두 실패로 표시"""
+    now = time.time()
+    conn = _connect()
+    with conn:
+        conn.execute(
+            "UPDATE documents SET status = 'failed', error = ?, updated_at = ? WHERE status = 'indexing'",
+            (str(error), now),
+        )
+
+
+def remove(source_id: str):
+    conn = _connect()
+    with conn:
+        conn.execute("DELETE FROM documents WHERE source_id = ?", (source_id,))
+
+
+# ----------------------------------------------------------
+# 조회
+# ----------------------------------------------------------
+def get(source_id: str) -> dict | None:
+    row = _connect().execute("SELECT * FROM documents WHERE source_id = ?", (source_id,)).fetchone()
+    return _row_to_dict(row) if row else None
+
+
+def list_documents(page: int = 1, page_size: int = 50, sort: str = "uploaded_at", order: str = "desc",
+                   status: str | None = None) -> dict:
+    """
+    페이지 단위 문서 목록
+    - sort: SORT_COLUMNS 중 하나, order: asc/desc
+    - status를 주면 해당 상태만
+    """
+    if sort not in SORT_COLUMNS:
+        raise ValueError(f"sort must be one of {SORT_COLUMNS}")
+    order = "ASC" if str(order).lower() == "asc" else "DESC"
+    page = max(1, int(page))
+    page_size = min(max(1, int(page_size)), 500)
+
+    where, params = "", []
+    if status:
+        where, params = "WHERE status = ?", [status]
+
+    conn = _connect()
+    total = conn.execute(f"SELECT COUNT(*) FROM documents {where}", params).fetchone()[0]
+    rows = conn.execute(
+        f"SELECT {_LIST_COLUMNS} FROM documents {where} "
+        f"ORDER BY {sort} {order}, source_id ASC LIMIT ? OFFSET ?",
+        params + [page_size, (page - 1) * page_size],
+    ).fetchall()
+
+    return {
+        "items": [_row_to_dict(r) for r in rows],
+        "total": total,
+        "page": page,
+        "page_size": page_size,
+        "pages": max(1, -(-total // page_size)),
+        "sort": sort,
+        "order": order.lower(),
+    }
+
+
+def counts_by_status() -> dict:
+    rows = _connect().execute("SELECT status, COUNT(*) FROM documents GROUP BY status").fetchall()
+    return {status: n for status, n in rows}
@@ -0,0 +1,130 @@
+# app/rag/collection.py
+import os
+
+from qdrant_client import AsyncQdrantClient, QdrantClient, models
+
+from app.rag import sparse
+
+# === 환경 변수 설정 ===
+QDRANT_URL = os.getenv("QDRANT_URL", "http://localhost:6333")
+COLLECTION = os.getenv("QDRANT_COLLECTION", "kb")
+# 로컬 모드 (서버 없이 디렉토리에 저장, 개발/벤치마크용). 설정하면 QDRANT_URL 대신 사용
+#   ":memory:"는 클라이언트 객체마다 별도 저장소 → 색인(sync)과 검색(async)이 공유되지 않으므로 디렉토리 경로 권장
+#   로컬 모드 디렉토리는 한 번에 클라이언트 1개만 열 수 있음
+QDRANT_PATH = os.getenv("QDRANT_PATH") or None
+
+# 컬렉션 생성 설정 (이미 있는 컬렉션에는 적용되지 않음)
+ON_DISK = os.getenv("QDRANT_ON_DISK", "false").lower() == "true"            # 원본 벡터를 디스크(mmap)에 저장
+HNSW_M = int(os.getenv("QDRANT_HNSW_M", "16"))                              # HNSW 노드당 연결 수
+HNSW_EF_CONSTRUCT = int(os.getenv("QDRANT_HNSW_EF_CONSTRUCT", "100"))       # HNSW 생성 시 후보 수
+HNSW_ON_DISK = os.getenv("QDRANT_HNSW_ON_DISK", "false").lower() == "true"  # HNSW 그래프를 디스크에 저장
+QUANTIZATION = os.getenv("QDRANT_QUANTIZATION", "none").lower()             # none / scalar / binary
+QUANTIZATION_ALWAYS_RAM = os.getenv("QDRANT_QUANTIZATION_ALWAYS_RAM", "true").lower() == "true"
+
+# 검색 설정
+SEARCH_EF = int(os.getenv("QDRANT_SEARCH_EF", "0"))                          # 검색 시 HNSW 후보 수 (0이면 서버 기본값)
+SEARCH_RESCORE = os.getenv("QDRANT_SEARCH_RESCORE", "true").lower() == "true"  # 양자화 후보를 원본 벡터로 재채점
+SEARCH_OVERSAMPLING = float(os.getenv("QDRANT_SEARCH_OVERSAMPLING", "2.0"))  # 재채점용 후보 배수
+
+if QUANTIZATION not in ("none", "scalar", "binary"):
+    raise ValueError(f"QDRANT_QUANTIZATION must be none, scalar or binary (got '{QUANTIZATION}')")
+
+
+# ----------------------------------------------------------
+# 클라이언트 생성 (서버 / 로컬 모드)
+# ----------------------------------------------------------
+def _client_kwargs() -> dict:
+    if QDRANT_PATH == ":memory:":
+        return {"location": ":memory:"}
+    if QDRANT_PATH:
+        return {"path": QDRANT_PATH}
+    return {"url": QDRANT_URL}
+
+
+def client() -> QdrantClient:
+    return QdrantClient(**_client_kwargs())
+
+
+def async_client() -> AsyncQdrantClient:
+    return AsyncQdrantClient(**_client_kwargs())
+
+
+def location() -> str:
+    """로그용 접속 위치"""
+    return f"local:{QDRANT_PATH}" if QDRANT_PATH else QDRANT_URL
+
+
+# ----------------------------------------------------------
+# 컬렉션 생성 파라미터
+#    - 양자화: scalar(int8, 메모리 1/4), binary(1bit, 메모리 1/32, 고차원 모델에 적합)
+#    - ON_DISK + 양자화 always_ram: 원본 벡터는 디스크, 양자화 벡터만 RAM
+#      → 검색은 RAM의 양자화 벡터로, 상위 후보만 디스크의 원본으로 재채점
+# ----------------------------------------------------------
+def vectors_config(dim: int) -> models.VectorParams:
+    return models.VectorParams(size=dim, distance=models.Distance.COSINE, on_disk=ON_DISK)
+
+
+def sparse_vectors_config() -> dict | None:
+    if not sparse.SPARSE_ENABLED:
+        return None
+    return {
+        sparse.SPARSE_VECTOR_NAME: models.SparseVectorParams(
+            index=models.SparseIndexParams(on_disk=ON_DISK),
+            modifier=models.Modifier.IDF,
+        ),
+    }
+
+
+def hnsw_config() -> models.HnswConfigDiff:
+    return models.HnswConfigDiff(m=HNSW_M, ef_construct=HNSW_EF_CONSTRUCT, on_disk=HNSW_ON_DISK)
+
+
+def quantization_config():
+    if QUANTIZATION == "scalar":
+        return models.ScalarQuantization(
+            scalar=models.ScalarQuantizationConfig(
+                type=models.ScalarType.INT8,
+                quantile=0.99,
+                always_ram=QUANTIZATION_ALWAYS_RAM,
+            )
+        )
+    if QUANTIZATION == "binary":
+        return models.BinaryQuantization(
+            binary=models.BinaryQuantizationConfig(always_ram=QUANTIZATION_ALWAYS_RAM)
+        )
+    return None
+
+
+def describe() -> dict:
+    """현재 설정 요약 (로그/리포트용)"""
+    return {
+        "on_disk": ON_DISK,
+        "hnsw_m": HNSW_M,
+        "hnsw_ef_construct": HNSW_EF_CONSTRUCT,
+        "hnsw_on_disk": HNSW_ON_DISK,
+        "quantization": QUANTIZATION,
+        "quantization_always_ram": QUANTIZATION_ALWAYS_RAM,
+        "search_ef": SEARCH_EF or None,
+        "search_rescore": SEARCH_RESCORE,
+        "search_oversampling": SEARCH_OVERSAMPLING,
+    }
+
+
+# ----------------------------------------------------------
+# 검색 파라미터 (dense 검색에 사용)
+#    - exact=True: HNSW/양자화 없이 전체 비교 (정확도 기준선, 리포트용)
+# ----------------------------------------------------------
+def search_params(ef: int | None = None, exact: bool = False) -> models.SearchParams | None:
+    if exact:
+        return models.SearchParams(exact=True)
+
+    ef = SEARCH_EF if ef is None else ef
+    quantization = None
+    if QUANTIZATION != "none":
+        quantization = models.QuantizationSearchParams(
+            rescore=SEARCH_RESCORE,
+            oversampling=SEARCH_OVERSAMPLING if SEARCH_RESCORE else None,
+        )
+    if not ef and quantization is None:
+        return None
+    return models.SearchParams(hnsw_ef=ef or None, quantization=quantization)
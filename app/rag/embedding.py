@@ -0,0 +1,81 @@
+# app/rag/embedding.py
+import os
+from typing import TYPE_CHECKING, List
+
+# sentence-transformers(torch)는 import만 수 초 걸리므로 모델을 처음 쓸 때 불러옴
+#   → 웹 프로세스 시작 시간에 포함되지 않고, 로딩은 lifespan 워밍업에서 진행
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
+
+# === 환경 변수 설정 ===
+EMB_MODEL = os.getenv("EMB_MODEL", "intfloat/multilingual-e5-base")
+EMB_DEVICE = os.getenv("EMB_DEVICE") or None                        # 예: cpu, cuda, cuda:0 (없으면 자동)
+EMB_BATCH_SIZE = int(os.getenv("EMB_BATCH_SIZE", "64"))             # 모델 forward 1회당 문장 수
+EMB_WORKERS = int(os.getenv("EMB_WORKERS", "1"))                    # 2 이상이면 멀티 프로세스 인코딩
+EMB_NORMALIZE = os.getenv("EMB_NORMALIZE", "true").lower() == "true"
+
+
+# === 전역 객체 (lazy load: 한 번만 로딩 후 재사용) ===
+_model = None
+
+
+def get_model() -> "SentenceTransformer":
+    global _model
+    if _model is None:
+        from sentence_transformers import SentenceTransformer
+
+        print(f"[RAG] Loading embedding model: {EMB_MODEL} (device={EMB_DEVICE or 'auto'})")
+        _model = SentenceTransformer(EMB_MODEL, device=EMB_DEVICE)
+    return _model
+
+
+def dimension() -> int:
+    return get_model().get_sentence_embedding_dimension()
+
+
+# ----------------------------------------------------------
+# 색인용 인코더
+#    - EMB_WORKERS가 2 이상이면 sentence-transformers 멀티 프로세스 풀로 분산
+#      (CPU 장비: 워커 수만큼 cpu 프로세스, GPU 장비: 보이는 GPU마다 1개)
+#    - with 블록을 벗어나면 풀 종료
+# ----------------------------------------------------------
+class Encoder:
+    def __init__(self, workers: int = EMB_WORKERS, batch_size: int = EMB_BATCH_SIZE):
+        self.workers = max(1, workers)
+        self.batch_size = batch_size
+        self.model = get_model()
+        self._pool = None
+
+    @property
+    def step(self) -> int:
+        """파이프라인 한 단계에서 처리할 청크 수 (워커마다 배치 1개씩)"""
+        return self.batch_size * self.workers
+
+    def __enter__(self):
+        if self.workers > 1:
+            devices = None if (EMB_DEVICE or "").startswith("cuda") else ["cpu"] * self.workers
+            self._pool = self.model.start_multi_process_pool(target_devices=devices)
+            print(f"[RAG] Started embedding process pool ({self.workers} workers)")
+        return self
+
+    def __exit__(self, *exc):
+        if self._pool is not None:
+            self.model.stop_multi_process_pool(self._pool)
+            self._pool = None
+
+    def encode(self, texts: List[str]) -> List[List[float]]:
+        if self._pool is not None:
+            vectors = self.model.encode_multi_process(
+                texts,
+                self._pool,
+                batch_size=self.batch_size,
+                normalize_embeddings=EMB_NORMALIZE,
+            )
+        else:
+            vectors = self.model.encode(
+                texts,
+                batch_size=self.batch_size,
+                normalize_embeddings=EMB_NORMALIZE,
+                show_progress_bar=False,
+            )
+        return vectors.tolist()
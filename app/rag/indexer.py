@@ -1,24 +1,28 @@
 # app/rag/indexer.py
-import os, glob, shutil
+import glob, shutil, time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain, islice
 from pathlib import Path
-from typing import List
-from langchain_community.document_loaders import (
-    TextLoader, PDFPlumberLoader, UnstructuredWordDocumentLoader, CSVLoader
-)
+from typing import Iterable, Iterator, List
 from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_community.embeddings import HuggingFaceEmbeddings
-from langchain_qdrant import QdrantVectorStore
-from qdrant_client import QdrantClient
+from qdrant_client import QdrantClient, models
+
+from app.rag import catalog, collection
+from app.rag.collection import COLLECTION
+from app.rag.embedding import EMB_MODEL, Encoder, dimension
+from app.rag.jobs import Progress
+from app.rag.loaders import failure, parse_files
+from app.rag import sparse
+from app.rag.manifest import Manifest, file_hash, chunk_hash, point_id
+from app.service import metrics
+from app.service.rag_service import invalidate_ready
 
 # === 환경 변수 기본 설정 ===
 BASE_DATA_DIR = Path("data")
 UPLOAD_DIR = BASE_DATA_DIR / "uploads"      # 임베딩 대기 파일
 EMBEDDED_DIR = BASE_DATA_DIR / "embedded"   # 임베딩 완료 파일
 
-QDRANT_URL = os.getenv("QDRANT_URL", "http://localhost:6333")
-COLLECTION = os.getenv("QDRANT_COLLECTION", "kb")
-EMB_MODEL = os.getenv("EMB_MODEL", "intfloat/multilingual-e5-base")
-
 UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
 EMBEDDED_DIR.mkdir(parents=True, exist_ok=True)
 
@@ -26,78 +30,381 @@ EMBEDDED_DIR.mkdir(parents=True, exist_ok=True)
 # ----------------------------------------------------------
 # 1. 문서 로드 함수
 # ----------------------------------------------------------
-def load_docs() -> List:
-    docs = []
-    for p in glob.glob(str(UPLOAD_DIR / "**" / "*.*"), recursive=True):
-        lower = p.lower()
+def list_upload_files() -> List[Path]:
+    return [Path(p) for p in glob.glob(str(UPLOAD_DIR / "**" / "*.*"), recursive=True) if Path(p).is_file()]
+
+
+def source_id_of(path) -> str:
+    """업로드 디렉토리 기준 상대 경로 (파일이 embedded로 이동해도 변하지 않는 문서 ID)"""
+    return Path(path).relative_to(UPLOAD_DIR).as_posix()
+
+
+# ----------------------------------------------------------
+# 2. Qdrant 포인트 정리
+#    - source_id(또는 이전 버전에서 쓰던 source 경로)가 같은 포인트 중
+#      이번에 유지할 ID(keep_ids)에 없는 것을 삭제
+# ----------------------------------------------------------
+def delete_stale_points(client: QdrantClient, source_id: str, keep_ids: List[str], legacy_source: str | None = None):
+    should = [models.FieldCondition(key="metadata.source_id", match=models.MatchValue(value=source_id))]
+    if legacy_source:
+        should.append(models.FieldCondition(key="metadata.source", match=models.MatchValue(value=legacy_source)))
+
+    client.delete(
+        collection_name=COLLECTION,
+        points_selector=models.FilterSelector(
+            filter=models.Filter(
+                should=should,
+                must_not=[models.HasIdCondition(has_id=keep_ids)] if keep_ids else None,
+            )
+        ),
+    )
+    invalidate_ready()
+
+
+# ----------------------------------------------------------
+# 3. 배치 임베딩 + 업로드 파이프라인
+#    - 청크를 Encoder.step 개씩 묶어 임베딩
+#    - 배치 N 업로드(별도 스레드)와 배치 N+1 임베딩을 겹쳐서 실행
+#    - 업로드는 항상 1개만 진행 중이도록 제한 (메모리 상한 = 배치 2개)
+#    - BM25 희소 벡터는 업로드 스레드에서 계산 (다음 배치 임베딩과 겹침)
+# ----------------------------------------------------------
+def _batched(items: Iterable, size: int):
+    it = iter(items)
+    while batch := list(islice(it, size)):
+        yield batch
+
+
+def ensure_collection(client: QdrantClient, dim: int) -> bool:
+    """
+    컬렉션이 없으면 생성 (설정은 app.rag.collection의 QDRANT_* 환경 변수)
+    - dense: LangChain QdrantVectorStore와 같은 unnamed/cosine 벡터
+    - sparse: BM25 희소 벡터 (named, IDF는 Qdrant가 계산)
+    - HNSW m/ef_construct, 양자화, on-disk 저장
+    """
+    if client.collection_exists(COLLECTION):
+        return False
+    client.create_collection(
+        collection_name=COLLECTION,
+        vectors_config=collection.vectors_config(dim),
+        sparse_vectors_config=collection.sparse_vectors_config(),
+        hnsw_config=collection.hnsw_config(),
+        quantization_config=collection.quantization_config(),
+    )
+    print(f"[RAG] Created collection '{COLLECTION}' (dim={dim}, sparse={sparse.SPARSE_ENABLED}, {collection.describe()})")
+    ensure_payload_indexes(client)
+    return True
+
+
+def collection_has_sparse(client: QdrantClient) -> bool:
+    """
+    BM25 희소 벡터를 쓸 수 있는지
+    - 희소 벡터 설정이 없는 기존 컬렉션은 dense만 색인 (컬렉션을 지우고 다시 색인하면 활성화)
+    """
+    if not sparse.SPARSE_ENABLED:
+        return False
+    params = client.get_collection(COLLECTION).config.params
+    if sparse.SPARSE_VECTOR_NAME in (params.sparse_vectors or {}):
+        return True
+    print(
+        f"[RAG] Collection '{COLLECTION}' has no sparse vector '{sparse.SPARSE_VECTOR_NAME}'. "
+        "Indexing dense vectors only (recreate the collection to enable hybrid search)."
+    )
+    return False
+
+
+# 문서 단위 삭제/갱신에 쓰는 payload 필드
+#    - metadata.source_id: 현재 형식
+#    - metadata.source: 이전 버전에서 색인한 포인트(파일 경로)
+#    - 인덱스가 없으면 필터 삭제가 컬렉션 전체를 훑음 → keyword 인덱스 생성
+SOURCE_FIELDS = ("metadata.source_id", "metadata.source")
+
+
+def ensure_payload_indexes(client: QdrantClient):
+    """source 필드 keyword 인덱스가 없으면 생성 (이미 있으면 아무것도 하지 않음)"""
+    schema = client.get_collection(COLLECTION).payload_schema or {}
+    for field in SOURCE_FIELDS:
+        if field in schema:
+            continue
+        client.create_payload_index(
+            collection_name=COLLECTION,
+            field_name=field,
+            field_schema=models.PayloadSchemaType.KEYWORD,
+            wait=True,
+        )
+        print(f"[RAG] Created payload index '{field}' on '{COLLECTION}'")
+
+
+def _to_point(chunk, vector, use_sparse: bool = False) -> models.PointStruct:
+    if use_sparse:
+        indices, values = sparse.doc_vector(chunk.page_content)
+        # ""는 unnamed(기본) dense 벡터
+        vector = {"": vector, sparse.SPARSE_VECTOR_NAME: models.SparseVector(indices=indices, values=values)}
+
+    # LangChain QdrantVectorStore가 읽을 수 있는 payload 형식 유지
+    return models.PointStruct(
+        id=point_id(chunk.metadata["chunk_hash"]),
+        vector=vector,
+        payload={"page_content": chunk.page_content, "metadata": chunk.metadata},
+    )
+
+
+def _upsert(client: QdrantClient, chunks: List, vectors: List, progress: Progress, use_sparse: bool = False):
+    for sid in dict.fromkeys(c.metadata["source_id"] for c in chunks):
+        progress.stage(sid, "upsert")
+    client.upsert(
+        collection_name=COLLECTION,
+        points=[_to_point(c, v, use_sparse) for c, v in zip(chunks, vectors)],
+        wait=True,
+    )
+    invalidate_ready()
+    metrics.INDEXER_POINTS.inc(len(chunks))
+    for sid, n in Counter(c.metadata["source_id"] for c in chunks).items():
+        progress.add_chunks(sid, n)
+
+
+def embed_and_upsert(client: QdrantClient, chunks: Iterable, progress: Progress, use_sparse: bool = False) -> int:
+    total = 0
+    started = time.perf_counter()
+    with Encoder() as encoder, ThreadPoolExecutor(max_workers=1, thread_name_prefix="rag-upsert") as uploader:
+        pending = None
+        for batch in _batched(chunks, encoder.step):
+            for sid in dict.fromkeys(c.metadata["source_id"] for c in batch):
+                progress.stage(sid, "embed")
+            vectors = encoder.encode([c.page_content for c in batch])
+
+            # 이전 배치 업로드가 끝나야 다음 배치를 넘김
+            if pending is not None:
+                pending.result()
+            pending = uploader.submit(_upsert, client, batch, vectors, progress, use_sparse)
+
+            total += len(batch)
+            elapsed = time.perf_counter() - started
+            print(f"[RAG] Embedded {total} chunks ({total / elapsed:.1f} chunks/sec)")
+
+        if pending is not None:
+            pending.result()
+
+    elapsed = time.perf_counter() - started
+    if total:
+        metrics.INDEXER_POINTS_PER_SEC.set(total / elapsed)
+        print(f"[RAG] Embed+upsert finished: {total} chunks in {elapsed:.1f}s ({total / elapsed:.1f} chunks/sec)")
+    return total
+
+
+# ----------------------------------------------------------
+# 4. 스트리밍 청크 생성
+#    - 파일 1개 → 문서(페이지/행) 1개씩 → 청크 순서로 generator 처리
+#    - 파싱은 loaders.parse_files (RAG_LOAD_WORKERS >= 2면 프로세스 풀)
+#    - 메모리에는 현재 파일의 문서와 파일별 청크 해시 목록만 유지
+#    - 파일 1개 분할이 끝나면 그 파일의 오래된 포인트 삭제
+#      (새 포인트 ID는 keep 목록에 있으므로 업로드 순서와 무관하게 안전)
+#    - 처리가 끝난 파일은 completed에 (source_id, path, file_hash, 청크 해시 목록),
+#      실패한 파일은 failures에 실패 보고서 항목 추가
+# ----------------------------------------------------------
+def iter_chunks(files: List[Path], manifest: Manifest, client: QdrantClient, collection_exists: bool,
+                progress: Progress, completed: List, failures: List, force: bool = False) -> Iterator:
+    # start_index: 검색 시 이웃/겹치는 청크를 위치 기준으로 병합하는 데 사용
+    splitter = RecursiveCharacterTextSplitter(chunk_size=800, chunk_overlap=120, add_start_index=True)
+
+    def fail(sid: str, entry: dict):
+        entry["file"] = sid
+        failures.append(entry)
+        progress.fail_file(sid, entry["error"])
+        catalog.mark_failed(sid, entry["error"])
+
+    # 파일 해시 비교 (변경 없는 파일은 파싱하지 않음)
+    to_parse = {}
+    for path in files:
+        sid = source_id_of(path)
+        progress.stage(sid, "load")
+
+        fhash = file_hash(path)
+        if not force and manifest.is_unchanged(sid, fhash):
+            progress.stage(sid, "done")
+            completed.append((sid, path, None, None))
+            continue
+        to_parse[path] = fhash
+        catalog.mark_indexing(sid, fhash, path.stat().st_size)
+
+    for path, docs, fail_entry in parse_files(to_parse):
+        sid = source_id_of(path)
+        if fail_entry is not None:
+            fail(sid, fail_entry)
+            continue
+
+        old = set() if force else manifest.chunk_hashes(sid)
+        hashes = {}   # 삽입 순서 유지용 dict (청크 해시 → None)
+        started = time.perf_counter()
         try:
-            if lower.endswith((".txt", ".md")):
-                docs += TextLoader(p, encoding="utf-8").load()
-            elif lower.endswith(".pdf"):
-                docs += PDFPlumberLoader(p).load()
-            elif lower.endswith((".docx", ".doc")):
-                docs += UnstructuredWordDocumentLoader(p).load()
-            elif lower.endswith(".csv"):
-                docs += CSVLoader(p).load()
+            for doc in docs:
+                progress.stage(sid, "split")
+                metrics.INDEXER_DOCS.inc()
+                for c in splitter.split_documents([doc]):
+                    h = chunk_hash(sid, c.page_content, c.metadata)
+                    if h in hashes:
+                        continue
+                    hashes[h] = None
+                    if h in old:
+                        continue  # 이미 색인된 청크
+                    c.metadata["source_id"] = sid
+                    c.metadata["chunk_hash"] = h
+                    metrics.INDEXER_CHUNKS.inc()
+                    yield c
         except Exception as e:
-            print(f"[RAG] Failed to load {p}: {e}")
-    return docs
+            fail(sid, failure(path, "error", f"{type(e).__name__}: {e}", time.perf_counter() - started))
+            continue
+
+        if collection_exists:
+            delete_stale_points(client, sid, [point_id(h) for h in hashes], legacy_source=str(path))
+        completed.append((sid, path, to_parse[path], list(hashes)))
 
 
 # ----------------------------------------------------------
-# 2. 색인 실행 함수
+# 5. 색인 실행 함수
 # ----------------------------------------------------------
-def run():
+def run(progress: Progress | None = None, source_ids: List[str] | None = None, force: bool = False) -> dict:
     """
-    - data/uploads 안의 문서들만 로드
-    - 청크 분할
-    - 임베딩 생성
-    - Qdrant 컬렉션에 업로드(색인)
+    - data/uploads 안의 문서들을 파일 → 페이지/행 → 청크 순서로 스트리밍 처리
+    - 매니페스트의 파일 해시와 같으면(변경 없음) 건너뜀
+    - 청크 해시 기준으로 새로 생긴 청크만 배치 단위로 임베딩/업로드
+    - 변경된 파일의 오래된 포인트는 source_id 기준으로 삭제
+    - 포인트 ID는 청크 해시에서 결정적으로 생성하므로 재실행해도 중복되지 않음
     - 성공 시, 원본 파일을 data/embedded로 이동
+    - 문서별 상태(indexing/indexed/failed), 청크 수, 포인트 ID를 카탈로그에 기록
+    - progress가 주어지면 파일별 단계(load/split/embed/upsert)와 청크 수를 보고
+    - source_ids가 주어지면 해당 문서만 처리, force면 변경 여부와 상관없이 다시 임베딩
+    - 반환값: 처리 결과 보고서 (파일 수, 건너뛴 파일 수, 청크 수, 파싱 실패 목록)
     """
-    docs = load_docs()
+    progress = progress or Progress()
+    files = list_upload_files()
+    if source_ids is not None:
+        wanted = set(source_ids)
+        files = [p for p in files if source_id_of(p) in wanted]
+    report = {"files": len(files), "skipped": 0, "indexed": 0, "chunks": 0, "failures": []}
 
-    if not docs:
+    if not files:
         print(f"[RAG] No documents found in '{UPLOAD_DIR}'. 색인할 파일이 없습니다.")
-        return
+        return report
 
-    splitter = RecursiveCharacterTextSplitter(chunk_size=800, chunk_overlap=120)
-    chunks = splitter.split_documents(docs)
-    print(f"[RAG] {len(chunks)} chunks generated from {len(docs)} docs.")
+    manifest = Manifest()
+    client = collection.client()
+    try:
+        collection_exists = client.collection_exists(COLLECTION)
+        if not collection_exists and manifest.entries:
+            # 컬렉션이 지워졌다면 매니페스트도 더 이상 유효하지 않음
+            print(f"[RAG] Collection '{COLLECTION}' not found. Resetting manifest.")
+            manifest.clear()
+        if collection_exists:
+            ensure_payload_indexes(client)
 
-    print(f"[RAG] Embedding model: {EMB_MODEL}")
-    embeddings = HuggingFaceEmbeddings(model_name=EMB_MODEL)
+        completed = []
+        chunks = iter_chunks(files, manifest, client, collection_exists, progress, completed, report["failures"], force)
 
-    client = QdrantClient(url=QDRANT_URL)
+        try:
+            # 새 청크가 하나라도 있을 때만 모델 로드 및 컬렉션 생성
+            first = next(chunks, None)
+            if first is not None:
+                print(f"[RAG] Embedding model: {EMB_MODEL}")
+                ensure_collection(client, dimension())
+                use_sparse = collection_has_sparse(client)
 
-    print(f"[RAG] Indexing into collection '{COLLECTION}' at {QDRANT_URL} ...")
-    QdrantVectorStore.from_documents(
-        documents=chunks,
-        embedding=embeddings,
-        url=QDRANT_URL,
-        collection_name=COLLECTION,
-        prefer_grpc=False,
-    )
+                print(f"[RAG] Indexing into collection '{COLLECTION}' at {collection.location()} (sparse={use_sparse}) ...")
+                report["chunks"] = embed_and_upsert(client, chain([first], chunks), progress, use_sparse)
+        except Exception as e:
+            # 작업 전체 실패: "색인 중"으로 남은 문서를 실패로 표시
+            catalog.fail_indexing(e)
+            raise
 
-    print(f"[RAG] Successfully indexed {len(chunks)} chunks into '{COLLECTION}'.")
+        for sid, path, fhash, hashes in completed:
+            if fhash is None:
+                catalog.mark_indexed(sid)
+                report["skipped"] += 1
+                continue
+            manifest.set(sid, fhash, hashes)
+            catalog.mark_indexed(sid, [point_id(h) for h in hashes])
+            progress.stage(sid, "done")
+            report["indexed"] += 1
+        manifest.save()
 
-    # 임베딩 성공 후, uploads 안에 있던 파일들을 embedded로 이동
-    move_uploaded_files()
+        print(
+            f"[RAG] Indexed {report['chunks']} new chunks into '{COLLECTION}' "
+            f"(files: {report['indexed']} indexed, {report['skipped']} unchanged, {len(report['failures'])} failed)."
+        )
 
+        # 임베딩 성공 후, 처리된 파일들을 embedded로 이동 (실패한 파일은 uploads에 남겨 재시도)
+        move_uploaded_files([path for _, path, _, _ in completed])
+        return report
+    finally:
+        client.close()
 
-def move_uploaded_files():
-    for p in UPLOAD_DIR.glob("**/*.*"):
+
+def move_uploaded_files(paths: List[Path] | None = None):
+    for p in (paths if paths is not None else UPLOAD_DIR.glob("**/*.*")):
         src = Path(p)
         if not src.is_file():
             continue
 
-        dst = EMBEDDED_DIR / src.name
-        # 이름 충돌 처리
+        # 하위 디렉토리 구조 유지 (source_id와 동일한 상대 경로)
+        dst = EMBEDDED_DIR / src.relative_to(UPLOAD_DIR)
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        # 같은 source_id의 이전 버전은 매니페스트/포인트/카탈로그가 이미 갱신되었으므로 교체
         if dst.exists():
-            dst.unlink()  # 단순히 덮어쓰기
+            print(f"[RAG] Replacing previous version '{dst}'")
+            dst.unlink()
         shutil.move(str(src), str(dst))
         print(f"[RAG] Moved '{src}' -> '{dst}'")
 
 
+# ----------------------------------------------------------
+# 6. 문서 단위 삭제 / 재색인
+#    - 포인트는 source_id(payload 인덱스) 필터로 삭제 → 컬렉션 재생성/전체 재임베딩 불필요
+#    - 매니페스트를 함께 고치므로 색인 작업이 도는 중에는 호출하지 않음 (API에서 확인)
+# ----------------------------------------------------------
+def delete_document(source_id: str) -> dict:
+    """문서의 포인트, 매니페스트 항목, 업로드/임베딩 완료 파일, 카탈로그 항목을 모두 삭제"""
+    client = collection.client()
+    try:
+        if client.collection_exists(COLLECTION):
+            ensure_payload_indexes(client)
+            delete_stale_points(client, source_id, [], legacy_source=str(UPLOAD_DIR / source_id))
+    finally:
+        client.close()
+
+    manifest = Manifest()
+    manifest.remove(source_id)
+    manifest.save()
+
+    removed = []
+    for base in (UPLOAD_DIR, EMBEDDED_DIR):
+        path = base / source_id
+        if path.is_file():
+            path.unlink()
+            removed.append(str(path))
+
+    catalog.remove(source_id)
+    print(f"[RAG] Deleted document '{source_id}' (files: {removed or 'none'})")
+    return {"source_id": source_id, "files": removed}
+
+
+def prepare_reindex(source_id: str) -> bool:
+    """
+    재색인 준비: 임베딩 완료 파일을 data/uploads로 되돌림
+    (이후 run(source_ids=[source_id], force=True)가 같은 포인트 ID로 덮어쓰고 남은 포인트를 정리)
+    - 원본 파일이 없으면 False
+    """
+    src = UPLOAD_DIR / source_id
+    if src.is_file():
+        return True
+
+    embedded = EMBEDDED_DIR / source_id
+    if not embedded.is_file():
+        return False
+
+    src.parent.mkdir(parents=True, exist_ok=True)
+    shutil.move(str(embedded), str(src))
+    print(f"[RAG] Moved '{embedded}' -> '{src}' for reindex")
+    return True
+
+
 if __name__ == "__main__":
     run()
@@ -0,0 +1,181 @@
+# app/rag/jobs.py
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+# === 환경 변수 설정 ===
+JOB_HISTORY = int(os.getenv("RAG_JOB_HISTORY", "50"))       # 메모리에 보관할 작업 기록 수
+
+# 파일별 진행 단계
+STAGES = ("queued", "load", "split", "embed", "upsert", "done", "failed")
+
+
+# ----------------------------------------------------------
+# 진행 상황 보고용 기본 클래스 (아무 것도 하지 않음)
+#    - indexer.run()을 CLI로 직접 실행할 때 사용
+# ----------------------------------------------------------
+class Progress:
+    def stage(self, file: str, stage: str):
+        pass
+
+    def add_chunks(self, file: str, n: int):
+        pass
+
+    def fail_file(self, file: str, error):
+        pass
+
+
+# ----------------------------------------------------------
+# 색인 작업 1건의 상태
+#    - 워커 스레드가 갱신하고, API 요청 스레드가 to_dict()로 읽음
+# ----------------------------------------------------------
+class IndexJob(Progress):
+    def __init__(self, source_ids: list | None = None, force: bool = False):
+        self.id = uuid.uuid4().hex
+        self.source_ids = source_ids   # None이면 data/uploads 전체
+        self.force = force
+        self.status = "queued"   # queued / running / succeeded / failed
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.chunks_done = 0
+        self.files = {}
+        self.report = None
+        self._lock = threading.Lock()
+
+    def _file(self, file: str) -> dict:
+        f = self.files.get(file)
+        if f is None:
+            f = {"stage": "queued", "chunks": 0, "error": None}
+            self.files[file] = f
+        return f
+
+    def stage(self, file: str, stage: str):
+        with self._lock:
+            f = self._file(file)
+            if f["stage"] != "failed":
+                f["stage"] = stage
+
+    def add_chunks(self, file: str, n: int):
+        with self._lock:
+            self._file(file)["chunks"] += n
+            self.chunks_done += n
+
+    def fail_file(self, file: str, error):
+        with self._lock:
+            f = self._file(file)
+            f["stage"] = "failed"
+            f["error"] = str(error)
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            end = self.finished_at or time.time()
+            elapsed = (end - self.started_at) if self.started_at else 0.0
+            return {
+                "job_id": self.id,
+                "status": self.status,
+                "error": self.error,
+                "source_ids": self.source_ids,
+                "force": self.force,
+                "created_at": self.created_at,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+                "elapsed_sec": round(elapsed, 2),
+                "chunks_done": self.chunks_done,
+                "chunks_per_sec": round(self.chunks_done / elapsed, 2) if elapsed > 0 else 0.0,
+                "files": {name: dict(f) for name, f in self.files.items()},
+                "report": self.report,
+            }
+
+
+# === 전역 객체 ===
+# 색인 작업은 항상 1개씩 실행 (매니페스트 / 업로드 디렉토리를 공유하고, submit()의 중복 등록 방지도 이를 전제로 함)
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rag-index")
+_jobs: "OrderedDict[str, IndexJob]" = OrderedDict()
+_lock = threading.Lock()
+
+# 색인 데이터(매니페스트 / Qdrant 포인트 / 업로드·완료 디렉토리) 쓰기 잠금
+#    - 색인 작업과 문서 삭제/재색인 준비가 동시에 같은 데이터를 고치지 않도록 직렬화
+_index_lock = threading.Lock()
+
+
+class IndexBusy(RuntimeError):
+    """색인 작업이 대기/실행 중이라 문서 변경을 할 수 없음"""
+
+
+def _run_job(job: IndexJob):
+    # 무거운 색인 모듈은 실제 작업 시점에만 로드
+    from app.rag.indexer import run as run_indexer
+
+    with _index_lock:
+        job.status = "running"
+        job.started_at = time.time()
+        try:
+            job.report = run_indexer(progress=job, source_ids=job.source_ids, force=job.force)
+            job.status = "succeeded"
+        except Exception as e:
+            print(f"[RAG] Index job {job.id} failed: {e}")
+            job.error = str(e)
+            job.status = "failed"
+        finally:
+            job.finished_at = time.time()
+
+
+def run_exclusive(fn, *args):
+    """
+    색인 작업과 겹치지 않게 fn(*args) 실행 (문서 삭제 / 재색인 준비 / 파일 삭제)
+    - 대기/실행 중인 작업이 있으면 기다리지 않고 IndexBusy
+    - 실행 중 새로 등록된 작업은 fn이 끝난 뒤에 시작
+    """
+    if active() or not _index_lock.acquire(blocking=False):
+        raise IndexBusy("색인 작업이 진행 중입니다. 완료 후 다시 시도해 주세요.")
+    try:
+        return fn(*args)
+    finally:
+        _index_lock.release()
+
+
+# ----------------------------------------------------------
+# 색인 작업 등록
+#    - 아직 시작하지 않은 같은 범위의 작업이 있으면 그 작업을 그대로 반환
+#      (시작 시점에 data/uploads를 읽으므로 중복 등록이 불필요)
+#    - source_ids: 특정 문서만 처리 (재색인), force: 변경 여부와 상관없이 다시 임베딩
+# ----------------------------------------------------------
+def submit(source_ids: list | None = None, force: bool = False) -> IndexJob:
+    with _lock:
+        for job in _jobs.values():
+            if job.status == "queued" and job.source_ids == source_ids and job.force == force:
+                return job
+
+        job = IndexJob(source_ids, force)
+        _jobs[job.id] = job
+
+        # 오래된 완료 작업 기록 정리
+        while len(_jobs) > JOB_HISTORY:
+            oldest_id, oldest = next(iter(_jobs.items()))
+            if oldest.status in ("queued", "running"):
+                break
+            _jobs.pop(oldest_id)
+
+    _executor.submit(_run_job, job)
+    return job
+
+
+def active() -> bool:
+    """대기/실행 중인 색인 작업이 있는지"""
+    with _lock:
+        return any(job.status in ("queued", "running") for job in _jobs.values())
+
+
+def get(job_id: str) -> IndexJob | None:
+    with _lock:
+        return _jobs.get(job_id)
+
+
+def list_jobs() -> list:
+    with _lock:
+        return [job.to_dict() for job in reversed(_jobs.values())]
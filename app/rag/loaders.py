@@ -0,0 +1,126 @@
+# app/rag/loaders.py
+import os
+import signal
+import time
+from collections import deque
+from multiprocessing import TimeoutError as PoolTimeoutError, get_context
+from pathlib import Path
+from typing import Iterable, Iterator, List
+
+from langchain_community.document_loaders import (
+    TextLoader, PDFPlumberLoader, UnstructuredWordDocumentLoader, CSVLoader
+)
+
+# === 환경 변수 설정 ===
+LOAD_WORKERS = int(os.getenv("RAG_LOAD_WORKERS", "1"))           # 2 이상이면 프로세스 풀에서 파일 파싱
+LOAD_TIMEOUT = float(os.getenv("RAG_LOAD_TIMEOUT", "300"))       # 파일 1개 파싱 제한 시간(초), 0이면 무제한
+LOAD_TIMEOUT_GRACE = 10.0                                        # 워커가 응답하지 않을 때 추가로 기다릴 시간(초)
+
+
+# ----------------------------------------------------------
+# 확장자별 LangChain 로더
+# ----------------------------------------------------------
+def _loader_for(p: str):
+    lower = p.lower()
+    if lower.endswith((".txt", ".md")):
+        return TextLoader(p, encoding="utf-8")
+    elif lower.endswith(".pdf"):
+        return PDFPlumberLoader(p)
+    elif lower.endswith((".docx", ".doc")):
+        return UnstructuredWordDocumentLoader(p)
+    elif lower.endswith(".csv"):
+        return CSVLoader(p)
+    return None
+
+
+def iter_file_docs(path) -> Iterator:
+    """파일 1개를 페이지(PDF)/행(CSV) 단위로 하나씩 읽어서 반환"""
+    loader = _loader_for(str(path))
+    if loader is not None:
+        yield from loader.lazy_load()
+
+
+def load_file(path) -> List:
+    return list(iter_file_docs(path))
+
+
+def failure(path, kind: str, error, elapsed: float) -> dict:
+    """파싱 실패 보고서 항목"""
+    return {
+        "file": str(path),
+        "type": kind,   # error / timeout
+        "error": str(error),
+        "elapsed_sec": round(elapsed, 2),
+    }
+
+
+# ----------------------------------------------------------
+# 프로세스 풀 워커
+#    - SIGALRM으로 파일별 제한 시간을 걸어 문제 있는 PDF가 워커를 붙잡지 않도록 함
+#    - 예외는 워커 안에서 잡아서 실패 보고서 항목으로 반환
+# ----------------------------------------------------------
+class ParseTimeout(Exception):
+    pass
+
+
+def _on_alarm(signum, frame):
+    raise ParseTimeout("parse timed out")
+
+
+def _parse_worker(path: str, timeout: float):
+    started = time.perf_counter()
+    use_alarm = timeout > 0 and hasattr(signal, "SIGALRM")
+    if use_alarm:
+        signal.signal(signal.SIGALRM, _on_alarm)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return load_file(path), None
+    except ParseTimeout:
+        return None, failure(path, "timeout", f"exceeded {timeout:.0f}s", time.perf_counter() - started)
+    except Exception as e:
+        return None, failure(path, "error", f"{type(e).__name__}: {e}", time.perf_counter() - started)
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+
+# ----------------------------------------------------------
+# 파일 파싱
+#    - (path, 문서 iterable 또는 None, 실패 항목 또는 None)을 파일 순서대로 반환
+#    - workers <= 1: 현재 프로세스에서 페이지/행 단위로 lazy 로드
+#      (이 경우 로드 중 예외는 문서를 순회하는 쪽에서 발생)
+#    - workers >= 2: spawn 프로세스 풀에서 파일 단위로 파싱
+#      동시에 진행 중인 파일은 workers * 2개로 제한 (메모리 상한)
+# ----------------------------------------------------------
+def parse_files(paths: Iterable[Path], workers: int = LOAD_WORKERS, timeout: float = LOAD_TIMEOUT) -> Iterator:
+    if workers <= 1:
+        for path in paths:
+            yield path, iter_file_docs(path), None
+        return
+
+    # 웹 프로세스(스레드 + torch)에서 fork하면 교착 위험이 있으므로 spawn 사용
+    pool = get_context("spawn").Pool(processes=workers, maxtasksperchild=50)
+    try:
+        it = iter(paths)
+        inflight = deque()
+
+        def submit_next():
+            path = next(it, None)
+            if path is not None:
+                inflight.append((path, time.perf_counter(), pool.apply_async(_parse_worker, (str(path), timeout))))
+
+        for _ in range(workers * 2):
+            submit_next()
+
+        while inflight:
+            path, started, res = inflight.popleft()
+            try:
+                docs, fail = res.get(timeout=timeout + LOAD_TIMEOUT_GRACE if timeout > 0 else None)
+            except PoolTimeoutError:
+                # 시그널도 통하지 않는 상태(C 확장 내부 등): 결과를 포기하고 풀 종료 시 정리
+                docs, fail = None, failure(path, "timeout", "worker did not respond", time.perf_counter() - started)
+            submit_next()
+            yield path, docs, fail
+    finally:
+        pool.terminate()
+        pool.join()
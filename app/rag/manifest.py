@@ -0,0 +1,82 @@
+# app/rag/manifest.py
+import hashlib
+import json
+import os
+import uuid
+from pathlib import Path
+
+# === 환경 변수 설정 ===
+MANIFEST_PATH = Path(os.getenv("RAG_MANIFEST_PATH", "data/manifest.json"))
+
+# 청크 해시 → Qdrant 포인트 ID 변환용 고정 네임스페이스 (변경 금지)
+POINT_NAMESPACE = uuid.UUID("6f1c8e52-3b7a-4d0e-9a51-2c4f7d9b8e10")
+
+
+# ----------------------------------------------------------
+# 해시 / ID 유틸
+# ----------------------------------------------------------
+def file_hash(path, block_size: int = 1024 * 1024) -> str:
+    """파일 내용을 블록 단위로 읽어 sha256 해시 계산"""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def chunk_hash(source_id: str, text: str, metadata: dict | None = None) -> str:
+    """
+    청크 해시 = sha256(source_id + 청크 본문 + 메타데이터)
+    - 다른 파일에 같은 문장이 있어도 포인트가 서로 덮어쓰지 않도록 source_id 포함
+    - 메타데이터(start_index, 페이지 등) 포함: 본문이 같아도 위치가 바뀐 청크는
+      건너뛰지 않고 다시 올려서 payload의 위치 정보가 항상 현재 문서와 일치하도록 함
+    """
+    meta = json.dumps(metadata or {}, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(f"{source_id}\0{text}\0{meta}".encode("utf-8")).hexdigest()
+
+
+def point_id(chunk_hash: str) -> str:
+    """청크 해시로부터 항상 같은 Qdrant 포인트 ID(UUID) 생성"""
+    return str(uuid.uuid5(POINT_NAMESPACE, chunk_hash))
+
+
+# ----------------------------------------------------------
+# 색인 매니페스트
+#    - source_id(업로드 디렉토리 기준 상대 경로)별로
+#      파일 해시와 색인된 청크 해시 목록을 JSON 파일에 보관
+# ----------------------------------------------------------
+class Manifest:
+    def __init__(self, path: Path = MANIFEST_PATH):
+        self.path = Path(path)
+        self.entries = {}
+        if self.path.exists():
+            try:
+                self.entries = json.loads(self.path.read_text(encoding="utf-8"))
+            except Exception as e:
+                print(f"[RAG] Failed to read manifest '{self.path}': {e}")
+
+    def get(self, source_id: str) -> dict | None:
+        return self.entries.get(source_id)
+
+    def is_unchanged(self, source_id: str, fhash: str) -> bool:
+        entry = self.entries.get(source_id)
+        return bool(entry) and entry.get("file_hash") == fhash
+
+    def chunk_hashes(self, source_id: str) -> set:
+        return set((self.entries.get(source_id) or {}).get("chunks", []))
+
+    def set(self, source_id: str, fhash: str, chunks: list):
+        self.entries[source_id] = {"file_hash": fhash, "chunks": list(chunks)}
+
+    def remove(self, source_id: str):
+        self.entries.pop(source_id, None)
+
+    def clear(self):
+        self.entries = {}
+
+    def save(self):
+        """임시 파일에 쓴 뒤 교체 (중간에 죽어도 매니페스트가 깨지지 않도록)"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp.write_text(json.dumps(self.entries, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, self.path)
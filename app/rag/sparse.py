@@ -0,0 +1,84 @@
+# app/rag/sparse.py
+import os
+import re
+import unicodedata
+import zlib
+from collections import Counter
+from typing import List, Tuple
+
+# === 환경 변수 설정 ===
+SPARSE_ENABLED = os.getenv("RAG_SPARSE_ENABLED", "true").lower() == "true"   # BM25 희소 벡터 색인/검색
+SPARSE_VECTOR_NAME = os.getenv("RAG_SPARSE_VECTOR_NAME", "bm25")              # Qdrant named sparse vector 이름
+BM25_K1 = float(os.getenv("RAG_BM25_K1", "1.2"))
+BM25_B = float(os.getenv("RAG_BM25_B", "0.75"))
+BM25_AVGDL = float(os.getenv("RAG_BM25_AVGDL", "256"))   # 청크 1개의 평균 토큰 수 (800자 청크 기준 추정치)
+
+
+# ----------------------------------------------------------
+# 토크나이저 (형태소 분석기 없이 한국어 처리)
+#    - 영문/숫자 식별자: 제품 코드, 에러 코드(ERR-1042, AB12_X.3 등)는 통째로 1개 토큰
+#      + 구분자(-_./)로 나눈 조각도 토큰으로 추가 → "1042"만 검색해도 일치
+#    - 한글: 어절 전체 + 글자 2-gram
+#      (조사/어미가 붙은 "제품코드는" 도 "제품", "코드" 2-gram으로 "제품 코드"와 일치)
+#    - 그 밖의 문자(한자/일본어 등)는 어절 단위
+# ----------------------------------------------------------
+_TOKEN = re.compile(
+    r"(?P<ident>[0-9a-z]+(?:[-_./][0-9a-z]+)*)"
+    r"|(?P<hangul>[가-힣]+)"
+    r"|(?P<other>[^\W\d_a-z가-힣]+)"
+)
+_IDENT_SPLIT = re.compile(r"[-_./]")
+
+
+def tokenize(text: str) -> List[str]:
+    text = unicodedata.normalize("NFKC", text or "").lower()
+    tokens = []
+    for m in _TOKEN.finditer(text):
+        tok = m.group()
+        if m.lastgroup == "ident":
+            tokens.append(tok)
+            parts = _IDENT_SPLIT.split(tok)
+            if len(parts) > 1:
+                tokens.extend(p for p in parts if p)
+        elif m.lastgroup == "hangul":
+            tokens.append(tok)
+            if len(tok) > 2:
+                tokens.extend(tok[i:i + 2] for i in range(len(tok) - 1))
+        else:
+            tokens.append(tok)
+    return tokens
+
+
+def token_id(token: str) -> int:
+    """토큰 → 희소 벡터 인덱스 (uint32, 프로세스가 달라도 항상 같은 값)"""
+    return zlib.crc32(token.encode("utf-8"))
+
+
+def _to_sparse(weights: dict) -> Tuple[List[int], List[float]]:
+    # 해시 충돌로 같은 인덱스가 된 토큰은 합산
+    merged = {}
+    for tok, w in weights.items():
+        idx = token_id(tok)
+        merged[idx] = merged.get(idx, 0.0) + w
+    indices = sorted(merged)
+    return indices, [merged[i] for i in indices]
+
+
+# ----------------------------------------------------------
+# BM25 희소 벡터
+#    - 문서: BM25의 TF 부분만 계산 (k1, b, 평균 문서 길이 기준 정규화)
+#    - 질의: 토큰마다 1.0
+#    - IDF는 Qdrant 컬렉션의 sparse vector modifier=IDF가 검색 시 계산
+#      → 문서가 추가/삭제되어도 전체 재색인 불필요
+# ----------------------------------------------------------
+def doc_vector(text: str) -> Tuple[List[int], List[float]]:
+    tokens = tokenize(text)
+    if not tokens:
+        return [], []
+    norm = BM25_K1 * (1 - BM25_B + BM25_B * len(tokens) / BM25_AVGDL)
+    tf = Counter(tokens)
+    return _to_sparse({tok: n * (BM25_K1 + 1) / (n + norm) for tok, n in tf.items()})
+
+
+def query_vector(text: str) -> Tuple[List[int], List[float]]:
+    return _to_sparse({tok: 1.0 for tok in set(tokenize(text))})
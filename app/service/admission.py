@@ -0,0 +1,198 @@
+import asyncio
+import hashlib
+import json
+import math
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+
+from fastapi import HTTPException
+
+from app.service import metrics
+
+# === 환경 변수 설정 ===
+MAX_IN_FLIGHT = int(os.getenv("UPSTREAM_MAX_IN_FLIGHT", "16"))        # vLLM 동시 요청 수 상한
+MAX_QUEUE = int(os.getenv("UPSTREAM_MAX_QUEUE", "64"))                # 대기열 최대 길이 (넘으면 429)
+MAX_QUEUE_PER_CLIENT = int(os.getenv("UPSTREAM_MAX_QUEUE_PER_CLIENT", "16"))  # 클라이언트 1명의 대기 수 상한 (넘으면 429)
+QUEUE_TIMEOUT = float(os.getenv("UPSTREAM_QUEUE_TIMEOUT", "30"))      # 대기열 최대 대기 시간(초, 넘으면 503)
+
+
+class AdmissionRejected(HTTPException):
+    """대기열이 가득 찼거나(429) 대기 시간이 초과된(503) 요청 → Retry-After 헤더 포함"""
+
+    def __init__(self, status_code: int, detail: str, retry_after: int):
+        super().__init__(status_code=status_code, detail=detail, headers={"Retry-After": str(retry_after)})
+        self.retry_after = retry_after
+
+
+# ---------------------------------------------------------
+# vLLM 동시 요청 제한 + 공정 대기열
+#    - 실행 중인 요청이 MAX_IN_FLIGHT 개면 나머지는 대기열로
+#    - 대기열은 클라이언트별 FIFO를 라운드 로빈으로 꺼냄
+#      → 한 사용자가 요청을 몰아 보내도 다른 사용자가 뒤로 밀리지 않음
+#    - 대기열이 MAX_QUEUE 이상이거나 해당 클라이언트의 대기가 MAX_QUEUE_PER_CLIENT 이상이면 즉시 429
+#      (한 클라이언트가 대기열 전체를 채워 다른 클라이언트가 줄도 못 서는 일 방지)
+#    - QUEUE_TIMEOUT 안에 차례가 오지 않으면 503
+#    - Retry-After: 최근 요청 처리 시간(EWMA) x 앞선 대기 수 / 동시 실행 수로 추정
+#    - 이벤트 루프 1개에서만 사용 (lock 불필요)
+# ---------------------------------------------------------
+class Admission:
+    def __init__(self, max_in_flight: int = MAX_IN_FLIGHT, max_queue: int = MAX_QUEUE,
+                 queue_timeout: float = QUEUE_TIMEOUT, max_queue_per_client: int = MAX_QUEUE_PER_CLIENT):
+        self.max_in_flight = max(1, max_in_flight)
+        self.max_queue = max(0, max_queue)
+        self.max_queue_per_client = max(0, max_queue_per_client)
+        self.queue_timeout = queue_timeout
+        self.in_flight = 0
+        self._queues = {}        # client → deque[Future]
+        self._rotation = deque() # 대기 중인 클라이언트 순서 (라운드 로빈)
+        self._waiting = 0
+        self._avg_service = 1.0  # 요청 1건 처리 시간 EWMA(초)
+
+    def _retry_after(self) -> int:
+        return max(1, math.ceil(self._avg_service * (self._waiting + 1) / self.max_in_flight))
+
+    def _gauges(self):
+        metrics.ADMISSION_IN_FLIGHT.set(self.in_flight)
+        metrics.ADMISSION_QUEUE_DEPTH.set(self._waiting)
+
+    def check(self, client: str = ""):
+        """대기열(전체 또는 해당 클라이언트 몫)이 가득 찼으면 바로 429 (스트리밍 응답 시작 전 빠른 거절용)"""
+        if self.in_flight < self.max_in_flight:
+            return
+        if self._waiting >= self.max_queue:
+            metrics.ADMISSION_REJECTIONS.inc(reason="queue_full")
+            raise AdmissionRejected(429, "요청이 많아 대기열이 가득 찼습니다. 잠시 후 다시 시도해 주세요.",
+                                    self._retry_after())
+        if len(self._queues.get(client, ())) >= self.max_queue_per_client:
+            metrics.ADMISSION_REJECTIONS.inc(reason="client_queue_full")
+            raise AdmissionRejected(429, "대기 중인 요청이 너무 많습니다. 이전 요청이 끝난 뒤 다시 시도해 주세요.",
+                                    self._retry_after())
+
+    async def _acquire(self, client: str) -> float:
+        if self.in_flight < self.max_in_flight and not self._waiting:
+            self.in_flight += 1
+            self._gauges()
+            return 0.0
+
+        self.check(client)
+
+        started = time.perf_counter()
+        fut = asyncio.get_running_loop().create_future()
+        queue = self._queues.get(client)
+        if queue is None:
+            queue = self._queues[client] = deque()
+            self._rotation.append(client)
+        queue.append(fut)
+        self._waiting += 1
+        self._gauges()
+
+        try:
+            await asyncio.wait_for(asyncio.shield(fut), self.queue_timeout)
+        except BaseException as e:
+            if fut.done() and not fut.cancelled():
+                # 차례를 받은 직후 취소/타임아웃 → 받은 슬롯 반납
+                self._release()
+            else:
+                fut.cancel()
+                self._discard(client, fut)
+            if isinstance(e, asyncio.TimeoutError):
+                metrics.ADMISSION_REJECTIONS.inc(reason="queue_timeout")
+                raise AdmissionRejected(503, "대기 시간이 초과되었습니다. 잠시 후 다시 시도해 주세요.",
+                                        self._retry_after())
+            raise
+
+        wait = time.perf_counter() - started
+        metrics.ADMISSION_QUEUE_WAIT_SECONDS.observe(wait)
+        return wait
+
+    def _discard(self, client: str, fut: asyncio.Future):
+        queue = self._queues.get(client)
+        if queue is not None and fut in queue:
+            queue.remove(fut)
+            self._waiting -= 1
+            if not queue:
+                del self._queues[client]
+                self._rotation.remove(client)
+        self._gauges()
+
+    def _release(self):
+        # 슬롯을 다음 클라이언트의 첫 대기 요청에 바로 넘김 (in_flight 유지)
+        while self._rotation:
+            client = self._rotation.popleft()
+            queue = self._queues[client]
+            fut = queue.popleft()
+            self._waiting -= 1
+            if queue:
+                self._rotation.append(client)
+            else:
+                del self._queues[client]
+            if not fut.done():
+                fut.set_result(None)
+                self._gauges()
+                return
+        self.in_flight -= 1
+        self._gauges()
+
+    @asynccontextmanager
+    async def slot(self, client: str = ""):
+        """with 블록 동안 vLLM 요청 1개 슬롯을 점유, 대기 시간(초)을 info["wait"]로 전달"""
+        info = {"wait": await self._acquire(client)}
+        started = time.perf_counter()
+        try:
+            yield info
+        finally:
+            self._avg_service = 0.8 * self._avg_service + 0.2 * (time.perf_counter() - started)
+            self._release()
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "queued": self._waiting,
+            "max_queue": self.max_queue,
+            "max_queue_per_client": self.max_queue_per_client,
+            "clients_waiting": len(self._queues),
+            "avg_service_sec": round(self._avg_service, 3),
+        }
+
+
+# ---------------------------------------------------------
+# 동일 요청 합치기 (coalescing)
+#    - 같은 프롬프트 + 같은 생성 파라미터 요청이 처리 중이면 새로 보내지 않고 결과를 공유
+#    - 먼저 온 요청(leader)만 슬롯을 잡고 vLLM을 호출
+#    - 뒤에 온 요청이 끊겨도(취소) leader 호출은 계속됨 (shield)
+# ---------------------------------------------------------
+_inflight = {}   # key → asyncio.Task
+
+
+def request_key(**upstream) -> str:
+    return hashlib.sha256(json.dumps(upstream, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+async def coalesce(key: str, call):
+    """
+    call: 인자 없는 코루틴 함수 (결과 dict 반환)
+    반환: (결과, 합쳐진 요청 여부)
+    """
+    task = _inflight.get(key)
+    if task is not None:
+        metrics.ADMISSION_COALESCED.inc()
+        return await asyncio.shield(task), True
+
+    task = asyncio.ensure_future(call())
+    _inflight[key] = task
+    task.add_done_callback(lambda t: _done(key, t))
+    return await asyncio.shield(task), False
+
+
+def _done(key: str, task: asyncio.Task):
+    _inflight.pop(key, None)
+    # 기다리던 요청이 모두 끊긴 경우에도 "exception was never retrieved" 경고가 나지 않도록
+    if not task.cancelled():
+        task.exception()
+
+
+# === 전역 객체 ===
+admission = Admission()
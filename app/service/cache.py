@@ -0,0 +1,117 @@
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+
+# ---------------------------------------------------------
+# LRU 캐시 (선택적 TTL, 적중/실패 카운터)
+#    - 여러 스레드(임베딩 executor 등)에서 접근하므로 lock 사용
+#    - ttl이 None이거나 0이면 만료 없음
+# ---------------------------------------------------------
+class LRUCache:
+    def __init__(self, maxsize: int, ttl: float | None = None):
+        self.maxsize = maxsize
+        self.ttl = ttl or None
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()   # key → (저장 시각, 값)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None and self.ttl and time.monotonic() - item[0] > self.ttl:
+                del self._data[key]
+                item = None
+
+            if item is None:
+                self.misses += 1
+                return None
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[1]
+
+    def put(self, key, value):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def items(self) -> list:
+        """만료되지 않은 (key, 값) 목록 (적중/실패 카운터에는 반영하지 않음)"""
+        with self._lock:
+            now = time.monotonic()
+            return [
+                (key, value) for key, (saved_at, value) in self._data.items()
+                if not self.ttl or now - saved_at <= self.ttl
+            ]
+
+    def record_miss(self):
+        with self._lock:
+            self.misses += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            }
+
+
+# ---------------------------------------------------------
+# 의미 기반 답변 캐시
+#    - 새 질의 벡터와 캐시된 질의 벡터의 코사인 거리가 max_distance 이하이고
+#      같은 생성 조건(params) + 같은 컬렉션 버전(version)이면 저장된 답변 반환
+#    - 항목 수가 작게 제한되므로 조회는 numpy 행렬곱 1회
+# ---------------------------------------------------------
+class SemanticCache:
+    def __init__(self, maxsize: int, max_distance: float, ttl: float | None = None):
+        self.max_distance = max_distance
+        self._lru = LRUCache(maxsize, ttl)
+
+    @staticmethod
+    def _unit(vector) -> np.ndarray:
+        v = np.asarray(vector, dtype=np.float32)
+        n = np.linalg.norm(v)
+        return v / n if n else v
+
+    def lookup(self, vector, params, version):
+        keys, mats = [], []
+        for key, (v, p, ver, _) in self._lru.items():
+            if p == params and ver == version:
+                keys.append(key)
+                mats.append(v)
+
+        if keys:
+            sims = np.stack(mats) @ self._unit(vector)
+            best = int(np.argmax(sims))
+            if 1.0 - float(sims[best]) <= self.max_distance:
+                item = self._lru.get(keys[best])
+                if item is not None:
+                    return item[3]
+
+        self._lru.record_miss()
+        return None
+
+    def put(self, key, vector, params, version, value):
+        self._lru.put(key, (self._unit(vector), params, version, value))
+
+    def clear(self):
+        self._lru.clear()
+
+    def stats(self) -> dict:
+        return {**self._lru.stats(), "max_distance": self.max_distance}
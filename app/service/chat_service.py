@@ -1,19 +1,108 @@
+import json
 import os
+import time
 import httpx
 from fastapi import HTTPException
 
+from app.service import metrics
+
 # === 환경 변수 설정 ===
 BASE_URL = os.getenv("OPENAI_COMPAT_BASE_URL") or ""  # 예: http://192.168.0.164:8999/v1
 API_KEY = os.getenv("OPENAI_API_KEY") or ""            # 필요 시 Bearer 인증
+LLM_MODEL = os.getenv("LLM_MODEL", "openai/gpt-oss-20b")  # vLLM에서 지정된 모델 alias
 TIMEOUT = httpx.Timeout(60.0, connect=10.0)            # 요청 타임아웃 (초)
 
-# === vLLM(OpenAI 호환 API) 호출 ===
-async def ask_upstream(message: str, *, system, temperature, max_tokens) -> dict:
-    """
-    사용자의 입력(message)을 vLLM(OpenAI 호환 서버)에 전달하고,
-    모델의 응답을 받아 반환합니다.
-    """
+# 커넥션 풀 설정 (앱 전체에서 클라이언트 1개를 공유)
+MAX_CONNECTIONS = int(os.getenv("UPSTREAM_MAX_CONNECTIONS", "100"))
+MAX_KEEPALIVE = int(os.getenv("UPSTREAM_MAX_KEEPALIVE", "20"))
+KEEPALIVE_EXPIRY = float(os.getenv("UPSTREAM_KEEPALIVE_EXPIRY", "30"))
+# HTTP/2는 https(ALPN) 업스트림에서만 협상됨. http:// 는 HTTP/1.1 keep-alive로 동작
+HTTP2 = os.getenv("UPSTREAM_HTTP2", "true").lower() == "true"
+
+
+# === 전역 객체 (FastAPI lifespan에서 생성/종료) ===
+_client: httpx.AsyncClient | None = None
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401  (httpx[http2] 설치 여부 확인)
+        return True
+    except ImportError:
+        return False
+
+
+async def init_client() -> httpx.AsyncClient:
+    global _client
+    if _client is None:
+        http2 = HTTP2 and _http2_available()
+        if HTTP2 and not http2:
+            print("[LLM] h2 package not installed. HTTP/2 disabled (pip install 'httpx[http2]').")
+        _client = httpx.AsyncClient(
+            timeout=TIMEOUT,
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=MAX_CONNECTIONS,
+                max_keepalive_connections=MAX_KEEPALIVE,
+                keepalive_expiry=KEEPALIVE_EXPIRY,
+            ),
+        )
+    return _client
+
+
+async def close_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+async def get_client() -> httpx.AsyncClient:
+    # lifespan 밖(스크립트 등)에서 호출돼도 동작하도록 필요 시 생성
+    return _client or await init_client()
+
+
+# ---------------------------------------------------------
+# 요청 구간별 지연 시간 측정
+#    - httpcore trace 이벤트로 connect(TCP+TLS) / TTFB(응답 헤더 수신) 시점 기록
+#    - keep-alive로 기존 연결을 재사용하면 connect_ms는 0
+# ---------------------------------------------------------
+class _Timing:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.connect_started = None
+        self.connected = None
+        self.headers_received = None
+
+    async def trace(self, event_name: str, info: dict):
+        now = time.perf_counter()
+        if event_name == "connection.connect_tcp.started":
+            self.connect_started = now
+        elif event_name in ("connection.connect_tcp.complete", "connection.start_tls.complete"):
+            self.connected = now
+        elif event_name.endswith("receive_response_headers.complete"):
+            self.headers_received = now
+
+    def record(self):
+        """TTFB / total 지연 시간을 /metrics 히스토그램에 기록"""
+        if self.headers_received is not None:
+            metrics.UPSTREAM_TTFB_SECONDS.observe(self.headers_received - self.started)
+        metrics.UPSTREAM_TOTAL_SECONDS.observe(time.perf_counter() - self.started)
 
+    def to_dict(self) -> dict:
+        end = time.perf_counter()
+        ms = lambda a, b: round((b - a) * 1000, 1) if a is not None and b is not None else None
+        return {
+            "connect_ms": ms(self.connect_started, self.connected) or 0.0,
+            "ttfb_ms": ms(self.started, self.headers_received),
+            "total_ms": ms(self.started, end),
+            "reused_connection": self.connect_started is None,
+        }
+
+# ---------------------------------------------------------
+# 요청 URL / 헤더 / 본문 구성 (일반 호출과 스트리밍 호출 공통)
+# ---------------------------------------------------------
+def _build_request(message: str, *, system, temperature, max_tokens, stream: bool = False):
     # 환경 변수 누락 시 예외
     if not BASE_URL:
         raise RuntimeError("OPENAI_COMPAT_BASE_URL is not set")
@@ -28,7 +117,7 @@ async def ask_upstream(message: str, *, system, temperature, max_tokens) -> dict
 
     # 요청 본문
     body = {
-        "model": "openai/gpt-oss-20b",  # 사용할 모델 이름 (vLLM에서 지정된 alias)
+        "model": LLM_MODEL,  # 사용할 모델 이름 (vLLM에서 지정된 alias)
         "messages": [
             {"role": "system", "content": system or "You are a helpful assistant."},
             {"role": "user", "content": message},
@@ -36,16 +125,38 @@ async def ask_upstream(message: str, *, system, temperature, max_tokens) -> dict
         "temperature": temperature,  # 창의성 정도 (0.0~1.0)
         "max_tokens": max_tokens,    # 응답 최대 길이
     }
+    if stream:
+        body["stream"] = True
+
+    return url, headers, body
+
+
+# === vLLM(OpenAI 호환 API) 호출 ===
+async def ask_upstream(message: str, *, system, temperature, max_tokens) -> dict:
+    """
+    사용자의 입력(message)을 vLLM(OpenAI 호환 서버)에 전달하고,
+    모델의 응답을 받아 반환합니다.
+    """
+    url, headers, body = _build_request(
+        message, system=system, temperature=temperature, max_tokens=max_tokens
+    )
 
-    # === 실제 HTTP 요청 수행 ===
-    async with httpx.AsyncClient(timeout=TIMEOUT) as client:
-        r = await client.post(url, headers=headers, json=body)
+    # === 실제 HTTP 요청 수행 (공유 커넥션 풀 사용) ===
+    client = await get_client()
+    timing = _Timing()
+    try:
+        r = await client.post(url, headers=headers, json=body, extensions={"trace": timing.trace})
+    except httpx.HTTPError as e:
+        metrics.UPSTREAM_ERRORS.inc(code=type(e).__name__)
+        raise
 
-        # vLLM에서 오류 코드 반환 시 예외 발생
-        if r.status_code >= 400:
-            raise HTTPException(status_code=r.status_code, detail=r.text)
+    # vLLM에서 오류 코드 반환 시 예외 발생
+    if r.status_code >= 400:
+        metrics.UPSTREAM_ERRORS.inc(code=r.status_code)
+        raise HTTPException(status_code=r.status_code, detail=r.text)
 
-        data = r.json()
+    data = r.json()
+    timing.record()
 
     # === 응답 파싱 ===
     # OpenAI 포맷 기준으로 choices[0].message.content 추출
@@ -55,4 +166,55 @@ async def ask_upstream(message: str, *, system, temperature, max_tokens) -> dict
     return {
         "answer": answer,  # 실제 모델의 응답 텍스트
         "raw": data,       # 전체 응답(JSON)을 함께 전달 (디버깅용)
+        "timing": timing.to_dict(),  # connect / TTFB / total 지연 시간(ms)
     }
+
+
+# === vLLM 스트리밍 호출 (stream: true) ===
+async def stream_upstream(message: str, *, system, temperature, max_tokens):
+    """
+    vLLM에 stream 모드로 질의하고, 응답 SSE(data: {...})를 파싱하여
+    이벤트 dict를 순서대로 yield 합니다.
+
+    - {"type": "token", "text": "..."}  : 모델이 생성한 텍스트 조각
+    - {"type": "done", "finish_reason": ..., "timing": {...}} : 종료 (ttft_ms 포함)
+    """
+    url, headers, body = _build_request(
+        message, system=system, temperature=temperature, max_tokens=max_tokens, stream=True
+    )
+
+    client = await get_client()
+    timing = _Timing()
+    first_token_at = None
+    finish_reason = None
+
+    try:
+        async with client.stream("POST", url, headers=headers, json=body, extensions={"trace": timing.trace}) as r:
+            # 스트림 시작 전 오류 응답은 본문을 모두 읽어서 예외로 전달
+            if r.status_code >= 400:
+                metrics.UPSTREAM_ERRORS.inc(code=r.status_code)
+                detail = (await r.aread()).decode("utf-8", errors="replace")
+                raise HTTPException(status_code=r.status_code, detail=detail)
+
+            async for line in r.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    break
+
+                choice = (json.loads(data).get("choices") or [{}])[0]
+                finish_reason = choice.get("finish_reason") or finish_reason
+                text = (choice.get("delta") or {}).get("content")
+                if text:
+                    if first_token_at is None:
+                        first_token_at = time.perf_counter()
+                    yield {"type": "token", "text": text}
+    except httpx.HTTPError as e:
+        metrics.UPSTREAM_ERRORS.inc(code=type(e).__name__)
+        raise
+
+    timing.record()
+    result = timing.to_dict()
+    result["ttft_ms"] = round((first_token_at - timing.started) * 1000, 1) if first_token_at else None
+    yield {"type": "done", "finish_reason": finish_reason, "timing": result}
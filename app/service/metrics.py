@@ -0,0 +1,189 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+# 지연 시간 히스토그램 기본 구간 (초)
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+# ---------------------------------------------------------
+# 스레드별 샤드
+#    - 기록(hot path)은 자기 스레드의 샤드만 수정 → lock 없음
+#    - lock은 스레드가 처음 기록할 때(샤드 생성)와 /metrics 수집 시에만 사용
+#    - asyncio 요청은 모두 이벤트 루프 스레드 1개에서 기록되므로 샤드도 1개
+# ---------------------------------------------------------
+class _Sharded:
+    def __init__(self):
+        self._shards = {}   # thread id → 샤드
+        self._lock = threading.Lock()
+
+    def _new_shard(self):
+        raise NotImplementedError
+
+    def _shard(self):
+        tid = threading.get_ident()
+        shard = self._shards.get(tid)
+        if shard is None:
+            with self._lock:
+                shard = self._shards.setdefault(tid, self._new_shard())
+        return shard
+
+    def _all_shards(self) -> list:
+        with self._lock:
+            return list(self._shards.values())
+
+
+class Counter(_Sharded):
+    """단조 증가 카운터 (라벨 1개 조합당 값 1개)"""
+
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: tuple = ()):
+        super().__init__()
+        self.name, self.help, self.labelnames = name, help, labelnames
+
+    def _new_shard(self):
+        return {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = tuple(str(labels.get(n, "")) for n in self.labelnames)
+        shard = self._shard()
+        shard[key] = shard.get(key, 0.0) + amount
+
+    def samples(self):
+        totals = {}
+        for shard in self._all_shards():
+            for key, v in list(shard.items()):
+                totals[key] = totals.get(key, 0.0) + v
+        for key, v in sorted(totals.items()):
+            yield self.name, dict(zip(self.labelnames, key)), v
+
+
+class Gauge:
+    """마지막 값만 보관 (쓰기가 드물어서 샤드 불필요)"""
+
+    type = "gauge"
+
+    def __init__(self, name: str, help: str):
+        self.name, self.help = name, help
+        self._value = 0.0
+
+    def set(self, value: float):
+        self._value = float(value)
+
+    def samples(self):
+        yield self.name, {}, self._value
+
+
+class Histogram(_Sharded):
+    """누적 구간(le) 히스토그램 + 합계/개수"""
+
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, buckets: tuple = LATENCY_BUCKETS):
+        super().__init__()
+        self.name, self.help = name, help
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_shard(self):
+        # [구간별 개수..., +Inf 개수, 합계]
+        return [0] * (len(self.buckets) + 1) + [0.0]
+
+    def observe(self, value: float):
+        shard = self._shard()
+        shard[bisect_left(self.buckets, value)] += 1
+        shard[-1] += value
+
+    @contextmanager
+    def time(self):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started)
+
+    def samples(self):
+        n = len(self.buckets) + 1
+        counts, total = [0] * n, 0.0
+        for shard in self._all_shards():
+            snap = list(shard)
+            for i in range(n):
+                counts[i] += snap[i]
+            total += snap[-1]
+
+        cumulative = 0
+        for le, c in zip(self.buckets + (float("inf"),), counts):
+            cumulative += c
+            yield f"{self.name}_bucket", {"le": "+Inf" if le == float("inf") else f"{le:g}"}, cumulative
+        yield f"{self.name}_sum", {}, total
+        yield f"{self.name}_count", {}, cumulative
+
+
+# ---------------------------------------------------------
+# Prometheus 텍스트 포맷(0.0.4) 출력
+# ---------------------------------------------------------
+_registry = []
+
+
+def register(metric):
+    _registry.append(metric)
+    return metric
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+def render() -> str:
+    lines = []
+    for m in _registry:
+        lines.append(f"# HELP {m.name} {m.help}")
+        lines.append(f"# TYPE {m.name} {m.type}")
+        for name, labels, value in m.samples():
+            lines.append(f"{name}{_format_labels(labels)} {value:g}")
+    return "\n".join(lines) + "\n"
+
+
+# === 시작 ===
+STARTUP_SECONDS = register(Gauge("app_startup_seconds", "Process start to lifespan start (imports + app setup)"))
+WARMUP_SECONDS = register(Gauge("app_warmup_seconds", "Embedding model / tokenizer / Qdrant warm-up duration"))
+
+# === 채팅 hot path ===
+READINESS_SECONDS = register(Histogram("rag_readiness_check_seconds", "Qdrant collection readiness check"))
+QUERY_EMBED_SECONDS = register(Histogram("rag_query_embedding_seconds", "Query embedding (including cache hits)"))
+SEARCH_SECONDS = register(Histogram("rag_search_seconds", "Qdrant vector search"))
+PROMPT_BUILD_SECONDS = register(Histogram("rag_prompt_build_seconds", "Packing retrieved chunks into the prompt context"))
+UPSTREAM_TTFB_SECONDS = register(Histogram("llm_upstream_ttfb_seconds", "vLLM time to response headers"))
+UPSTREAM_TOTAL_SECONDS = register(Histogram("llm_upstream_total_seconds", "vLLM request total time"))
+
+BATCH_ITEMS = register(Counter("chat_batch_items_total", "Questions answered through /api/chat/ask-batch", ("outcome",)))
+STRICT_RAG_SHORT_CIRCUITS = register(Counter(
+    "chat_strict_rag_short_circuits_total", "Requests answered without LLM because STRICT_RAG found no context"
+))
+UPSTREAM_ERRORS = register(Counter(
+    "llm_upstream_errors_total", "vLLM errors by HTTP status code or exception type", ("code",)
+))
+
+# === vLLM 동시 요청 제한 ===
+ADMISSION_IN_FLIGHT = register(Gauge("llm_admission_in_flight", "vLLM requests currently holding a slot"))
+ADMISSION_QUEUE_DEPTH = register(Gauge("llm_admission_queue_depth", "Requests waiting for a vLLM slot"))
+ADMISSION_QUEUE_WAIT_SECONDS = register(Histogram("llm_admission_queue_wait_seconds", "Time spent waiting for a vLLM slot"))
+ADMISSION_REJECTIONS = register(Counter(
+    "llm_admission_rejections_total", "Requests rejected by admission control", ("reason",)
+))
+ADMISSION_COALESCED = register(Counter(
+    "llm_admission_coalesced_total", "Requests served by joining an identical in-flight vLLM call"
+))
+
+# === 인덱서 ===
+INDEXER_DOCS = register(Counter("indexer_documents_total", "Documents (pages/rows) loaded by the indexer"))
+INDEXER_CHUNKS = register(Counter("indexer_chunks_total", "New chunks produced by the indexer"))
+INDEXER_POINTS = register(Counter("indexer_points_total", "Points upserted into Qdrant"))
+INDEXER_POINTS_PER_SEC = register(Gauge("indexer_points_per_second", "Embed+upsert throughput of the last index run"))
@@ -1,99 +1,484 @@
+import asyncio
+import math
 import os
+import re
+import threading
+import time
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
 from typing import Tuple, List
-from langchain_community.embeddings import HuggingFaceEmbeddings
-from langchain_qdrant import QdrantVectorStore
-from qdrant_client import QdrantClient
+from qdrant_client import AsyncQdrantClient, models
+
+from app.rag import collection, sparse
+from app.rag.collection import COLLECTION
+from app.rag.embedding import EMB_BATCH_SIZE, EMB_MODEL, EMB_NORMALIZE, get_model
+from app.service import metrics
+from app.service.cache import LRUCache, SemanticCache
 
 
 # === 환경 변수 설정 ===
-QDRANT_URL = os.getenv("QDRANT_URL", "http://localhost:6333")     # Qdrant 서버 주소
-COLLECTION = os.getenv("QDRANT_COLLECTION", "kb")                  # 기본 컬렉션 이름
-EMB_MODEL = os.getenv("EMB_MODEL", "intfloat/multilingual-e5-base")  # 임베딩 모델 이름
 TOP_K = int(os.getenv("RAG_TOP_K", "5"))                           # 검색할 문서 개수 (상위 K개)
-MAX_CTX = int(os.getenv("RAG_MAX_CONTEXT_CHARS", "6000"))          # LLM에 전달할 컨텍스트 최대 길이 제한
+MAX_CTX_TOKENS = int(os.getenv("RAG_MAX_CONTEXT_TOKENS", "3000"))  # LLM에 전달할 컨텍스트 최대 토큰 수
+CONTEXT_TOKENIZER = os.getenv("RAG_CONTEXT_TOKENIZER") or os.getenv("LLM_MODEL", "openai/gpt-oss-20b")  # 토큰 수 계산용 (업스트림 모델)
+READY_TTL = float(os.getenv("RAG_READY_TTL", "30"))                # 색인 여부 확인 결과 캐시 시간(초)
+EMBED_THREADS = int(os.getenv("RAG_EMBED_THREADS", "2"))           # 질의 임베딩을 동시에 실행할 스레드 수
+HYBRID_PREFETCH = int(os.getenv("RAG_HYBRID_PREFETCH", "20"))      # 하이브리드 검색 시 dense/sparse 각각의 후보 수
+
+# 질의 벡터 캐시 (정규화된 질문 + 모델 이름 기준 LRU, TTL 0이면 만료 없음)
+QUERY_CACHE_SIZE = int(os.getenv("RAG_QUERY_CACHE_SIZE", "1024"))
+QUERY_CACHE_TTL = float(os.getenv("RAG_QUERY_CACHE_TTL", "0"))
+
+# 의미 기반 답변 캐시 (유사한 질문이면 검색/LLM 호출 생략)
+ANSWER_CACHE_ENABLED = os.getenv("ANSWER_CACHE_ENABLED", "false").lower() == "true"
+ANSWER_CACHE_SIZE = int(os.getenv("ANSWER_CACHE_SIZE", "256"))
+ANSWER_CACHE_TTL = float(os.getenv("ANSWER_CACHE_TTL", "3600"))
+ANSWER_CACHE_MAX_DISTANCE = float(os.getenv("ANSWER_CACHE_MAX_DISTANCE", "0.05"))  # 코사인 거리
 
 
 # === 전역 객체 (lazy load: 한 번만 로딩 후 재사용) ===
-_embeddings = None
-_vectorstore = None
+_client = None
+_tokenizer_future = None   # tokenizer 로딩 Future (결과가 None이면 로딩 실패 → 추정치 사용)
+_tokenizer_lock = threading.Lock()
+
+# 질의 임베딩(CPU 연산)은 이벤트 루프 밖의 제한된 스레드 풀에서 실행
+_embed_executor = ThreadPoolExecutor(max_workers=EMBED_THREADS, thread_name_prefix="rag-embed")
+# tokenizer 로딩(네트워크 다운로드 가능)도 이벤트 루프 밖에서 실행
+_tokenizer_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rag-tokenizer")
+
+# 색인 여부 캐시 (checked_at이 READY_TTL 이내면 Qdrant에 다시 묻지 않음)
+#    - generation: 인덱서가 쓸 때마다 증가, points: 마지막으로 확인한 포인트 수
+#      → 둘을 합쳐 "컬렉션 버전"으로 사용 (답변 캐시 무효화 기준)
+#    - sparse: 컬렉션에 BM25 희소 벡터가 있는지 (있으면 하이브리드 검색)
+_ready = {"value": False, "checked_at": None, "generation": 0, "points": 0, "sparse": False}
+_ready_lock = threading.Lock()
+
+_query_cache = LRUCache(QUERY_CACHE_SIZE, QUERY_CACHE_TTL)
+_answer_cache = SemanticCache(ANSWER_CACHE_SIZE, ANSWER_CACHE_MAX_DISTANCE, ANSWER_CACHE_TTL)
+
+
+def _get_client() -> AsyncQdrantClient:
+    global _client
+    if _client is None:
+        _client = collection.async_client()
+    return _client
+
+
+# ---------------------------------------------------------
+# 색인 여부 캐시 무효화
+#    - 인덱서가 컬렉션에 쓰기/삭제를 한 직후 호출
+#    - 인덱서를 별도 프로세스(CLI)로 실행한 경우에는 READY_TTL 이후 반영
+# ---------------------------------------------------------
+def invalidate_ready():
+    with _ready_lock:
+        _ready["checked_at"] = None
+        _ready["generation"] += 1
+
+
+def collection_version() -> tuple:
+    return _ready["generation"], _ready["points"]
 
 
 # ---------------------------------------------------------
 # Qdrant 컬렉션이 준비되어 있는지 확인
 #    - 컬렉션이 없거나, 벡터 데이터가 0개면 False 반환
 #    - RAG 동작 전에 색인 여부를 점검하는 역할
+#    - 결과는 READY_TTL 동안 캐시 (요청마다 Qdrant 왕복 없음)
+#    - 개수는 exact count 대신 컬렉션 정보의 points_count 사용
 # ---------------------------------------------------------
-def _collection_ready() -> bool:
-    client = QdrantClient(url=QDRANT_URL)
+async def _collection_ready() -> bool:
+    with metrics.READINESS_SECONDS.time():
+        return await _check_ready()
+
+
+async def _check_ready() -> bool:
+    now = time.monotonic()
+    checked_at = _ready["checked_at"]
+    if checked_at is not None and now - checked_at < READY_TTL:
+        return _ready["value"]
+
     try:
-        # 컬렉션 존재/접속 여부를 먼저 확인
-        client.get_collection(COLLECTION)
-        # 정확한 포인트(벡터) 개수로 체크
-        cnt = client.count(COLLECTION, exact=True)
-        return (getattr(cnt, "count", 0) or 0) > 0
+        # 컬렉션 존재/접속 여부 및 포인트(벡터) 개수 확인
+        info = await _get_client().get_collection(COLLECTION)
+        points = info.points_count or 0
+        has_sparse = sparse.SPARSE_VECTOR_NAME in (info.config.params.sparse_vectors or {})
     except Exception as e:
         # 디버깅에 도움되도록 로그 남기기
         print(f"[RAG] _collection_ready error: {e}")
-        return False
+        points, has_sparse = 0, False
+
+    with _ready_lock:
+        _ready["value"] = points > 0
+        _ready["points"] = points
+        _ready["sparse"] = sparse.SPARSE_ENABLED and has_sparse
+        _ready["checked_at"] = now
+    return points > 0
+
+
+# ---------------------------------------------------------
+# 질의 임베딩
+#    - 색인과 같은 sentence-transformers 모델(app.rag.embedding) 사용
+#    - 모델 forward는 _embed_executor 스레드에서 실행 → 이벤트 루프를 막지 않음
+#    - 같은 질문(정규화 기준)은 LRU 캐시에서 바로 반환
+# ---------------------------------------------------------
+def normalize_query(query: str) -> str:
+    """유니코드 정규화(NFKC) + 소문자 + 공백 정리"""
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFKC", query)).strip().lower()
+
+
+def _encode_query(query: str) -> List[float]:
+    return get_model().encode(query, normalize_embeddings=EMB_NORMALIZE, show_progress_bar=False).tolist()
+
+
+async def embed_query(query: str) -> List[float]:
+    with metrics.QUERY_EMBED_SECONDS.time():
+        key = (EMB_MODEL, normalize_query(query))
+        vector = _query_cache.get(key)
+        if vector is None:
+            loop = asyncio.get_running_loop()
+            vector = await loop.run_in_executor(_embed_executor, _encode_query, query)
+            _query_cache.put(key, vector)
+        return vector
+
+
+def _encode_queries(queries: List[str]) -> List[List[float]]:
+    return get_model().encode(
+        queries, batch_size=EMB_BATCH_SIZE, normalize_embeddings=EMB_NORMALIZE, show_progress_bar=False
+    ).tolist()
+
+
+async def embed_queries(queries: List[str]) -> List[List[float]]:
+    """
+    여러 질문을 한 번에 임베딩 (일괄 질의용)
+    - 캐시에 없는 질문만 모아서 EMB_BATCH_SIZE 단위 forward로 처리
+    - 반환 순서는 입력 순서와 같음
+    """
+    with metrics.QUERY_EMBED_SECONDS.time():
+        keys = [(EMB_MODEL, normalize_query(q)) for q in queries]
+        vectors = [_query_cache.get(key) for key in keys]
+
+        # 같은 질문이 여러 번 있으면 한 번만 인코딩
+        missing = {}
+        for key, query, vector in zip(keys, queries, vectors):
+            if vector is None:
+                missing.setdefault(key, query)
+
+        if missing:
+            loop = asyncio.get_running_loop()
+            encoded = await loop.run_in_executor(_embed_executor, _encode_queries, list(missing.values()))
+            for key, vector in zip(missing, encoded):
+                _query_cache.put(key, vector)
+            found = dict(zip(missing, encoded))
+            vectors = [v if v is not None else found[key] for key, v in zip(keys, vectors)]
+        return vectors
+
+
+# ---------------------------------------------------------
+# 워밍업 (앱 시작 시 1회, app.service.startup에서 호출)
+#    - 임베딩 모델 로딩 + 첫 forward (CUDA/커널 초기화까지 끝내 둠)
+#    - 토큰 계산용 tokenizer 로딩
+#    - Qdrant 클라이언트 연결 + 색인 여부 확인
+#    - 단계별 소요 시간(초) 반환, 임베딩 모델 로딩 실패는 예외로 전달
+# ---------------------------------------------------------
+async def warm_up() -> dict:
+    loop = asyncio.get_running_loop()
+    steps = {}
+
+    started = time.perf_counter()
+    await loop.run_in_executor(_embed_executor, _encode_query, "warm-up")
+    steps["embedding"] = round(time.perf_counter() - started, 3)
+
+    started = time.perf_counter()
+    await asyncio.wrap_future(_load_tokenizer())
+    steps["tokenizer"] = round(time.perf_counter() - started, 3)
+
+    started = time.perf_counter()
+    await _collection_ready()
+    steps["qdrant"] = round(time.perf_counter() - started, 3)
+    return steps
+
+
+# ---------------------------------------------------------
+# 의미 기반 답변 캐시
+#    - params: 답변에 영향을 주는 생성 조건 (system prompt, temperature 등)
+#    - 컬렉션 버전이 바뀌면(색인 갱신) 이전 답변은 조회되지 않음
+#      (조회 전에 색인 여부 확인으로 points 값을 최신 상태로 유지)
+# ---------------------------------------------------------
+async def lookup_answer(vector: List[float], params: tuple) -> dict | None:
+    if not ANSWER_CACHE_ENABLED or not await _collection_ready():
+        return None
+    return _answer_cache.lookup(vector, params, collection_version())
+
+
+def store_answer(query: str, vector: List[float], params: tuple, answer: str, sources: List[str]):
+    if not ANSWER_CACHE_ENABLED or not answer:
+        return
+    _answer_cache.put(
+        (normalize_query(query), params), vector, params, collection_version(),
+        {"answer": answer, "sources": sources},
+    )
+
+
+def cache_stats() -> dict:
+    return {
+        "query_vectors": _query_cache.stats(),
+        "answers": {"enabled": ANSWER_CACHE_ENABLED, **_answer_cache.stats()},
+    }
 
 
 # ---------------------------------------------------------
-# Qdrant 벡터스토어 및 임베딩 초기화
-#    - 최초 1회 HuggingFace 임베딩 모델을 로드하고
-#      QdrantVectorStore 인스턴스를 생성하여 재사용
+# 벡터 검색 (AsyncQdrantClient)
+#    - 인덱서가 저장한 LangChain 호환 payload(page_content, metadata)를 그대로 읽음
+#    - 컬렉션에 BM25 희소 벡터가 있고 query 문자열이 주어지면 하이브리드 검색:
+#      dense/sparse 후보를 prefetch로 각각 HYBRID_PREFETCH개 뽑아 서버에서 RRF로 합침
+#      → 요청 1번 (추가 왕복/리랭커 없음), score는 RRF 점수
+#    - dense 검색에는 QDRANT_SEARCH_* 설정(hnsw_ef, 양자화 재채점) 적용
+#    - 반환: [{"text", "metadata", "score"}, ...] (점수 높은 순)
 # ---------------------------------------------------------
-def _get_vs() -> QdrantVectorStore:
-    global _embeddings, _vectorstore
-    if _embeddings is None:
-        _embeddings = HuggingFaceEmbeddings(model_name=EMB_MODEL)
-    if _vectorstore is None:
-        _vectorstore = QdrantVectorStore(
-            client=QdrantClient(url=QDRANT_URL),
+def _hybrid_query(vector: List[float], query: str, k: int) -> dict:
+    indices, values = sparse.query_vector(query)
+    if not indices:
+        return {"query": vector, "params": collection.search_params(), "limit": k}
+
+    prefetch_limit = max(k, HYBRID_PREFETCH)
+    return {
+        "prefetch": [
+            models.Prefetch(query=vector, params=collection.search_params(), limit=prefetch_limit),
+            models.Prefetch(
+                query=models.SparseVector(indices=indices, values=values),
+                using=sparse.SPARSE_VECTOR_NAME,
+                limit=prefetch_limit,
+            ),
+        ],
+        "query": models.FusionQuery(fusion=models.Fusion.RRF),
+        "limit": k,
+    }
+
+
+def _query_request(vector: List[float], k: int, query: str | None) -> dict:
+    """query_points / QueryRequest 공통 인자 (검색 파라미터는 "params")"""
+    if query and _ready["sparse"]:
+        return _hybrid_query(vector, query, k)
+    return {"query": vector, "params": collection.search_params(), "limit": k}
+
+
+def _to_docs(points) -> List[dict]:
+    return [
+        {
+            "text": (p.payload or {}).get("page_content", ""),
+            "metadata": (p.payload or {}).get("metadata") or {},
+            "score": p.score,
+        }
+        for p in points
+    ]
+
+
+async def search(vector: List[float], k: int = TOP_K, query: str | None = None) -> List[dict]:
+    request = _query_request(vector, k, query)
+
+    with metrics.SEARCH_SECONDS.time():
+        res = await _get_client().query_points(
             collection_name=COLLECTION,
-            embedding=_embeddings,
+            with_payload=True,
+            search_params=request.pop("params", None),
+            **request,
         )
-    return _vectorstore
+    return _to_docs(res.points)
+
+
+async def search_batch(vectors: List[List[float]], queries: List[str], k: int = TOP_K) -> List[List[dict]]:
+    """여러 질의를 query_batch_points 요청 1번으로 검색 (입력 순서대로 결과 반환)"""
+    requests = [
+        models.QueryRequest(with_payload=True, **_query_request(v, k, q))
+        for v, q in zip(vectors, queries)
+    ]
+    with metrics.SEARCH_SECONDS.time():
+        responses = await _get_client().query_batch_points(collection_name=COLLECTION, requests=requests)
+    return [_to_docs(r.points) for r in responses]
 
 
 # ---------------------------------------------------------
 # 질문(query)에 맞는 문맥(context) 생성
-#    - Qdrant에서 질문과 유사한 문서를 TOP_K개 검색
+#    - Qdrant에서 질문과 유사한 문서를 TOP_K개 검색 (dense + BM25 하이브리드)
 #    - 문서 내용을 연결해 LLM에 전달할 컨텍스트 구성
 #    - 색인 없음 → ("", [], False) 반환
 #      색인 있음 → (context, sources, True) 반환
+#    - vector를 넘기면 질의 임베딩을 다시 하지 않음
 # ---------------------------------------------------------
-def build_context(query: str) -> Tuple[str, List[str], bool]:
-    if not _collection_ready():
+async def build_context(query: str, vector: List[float] | None = None) -> Tuple[str, List[str], bool]:
+    if not await _collection_ready():
         return "", [], False  # 색인 데이터 없음 → LLM 호출 생략
 
-    vs = _get_vs()
-    retriever = vs.as_retriever(search_kwargs={"k": TOP_K})
+    docs = await search(vector if vector is not None else await embed_query(query), query=query)
+
+    with metrics.PROMPT_BUILD_SECONDS.time():
+        context, sources = pack_context(docs)
+
+    # context(문맥), sources(문서 출처 목록), ready(색인 여부)
+    return context, sources, True
+
+
+async def build_contexts(
+    queries: List[str], vectors: List[List[float]] | None = None
+) -> List[Tuple[str, List[str], bool]]:
+    """
+    build_context의 일괄 버전 (일괄 질의용)
+    - 색인 여부 확인 1번 + 임베딩 일괄 forward + Qdrant 배치 검색 1번
+    - 반환 순서는 입력 순서와 같음
+    """
+    if not queries:
+        return []
+    if not await _collection_ready():
+        return [("", [], False)] * len(queries)
+
+    if vectors is None:
+        vectors = await embed_queries(queries)
+    results = await search_batch(vectors, queries)
+
+    contexts = []
+    with metrics.PROMPT_BUILD_SECONDS.time():
+        for docs in results:
+            context, sources = pack_context(docs)
+            contexts.append((context, sources, True))
+    return contexts
+
+
+# ---------------------------------------------------------
+# 토큰 수 계산
+#    - 업스트림 모델(LLM_MODEL)의 tokenizer로 실제 토큰 수 계산
+#    - tokenizer는 _tokenizer_executor 스레드에서 한 번만 로딩 (from_pretrained는 다운로드할 수 있음)
+#      → 로딩이 끝나기 전이나 불러올 수 없으면(오프라인 등) 문자 종류별 추정치 사용
+#      (ASCII 4자 ≈ 1토큰, 한글 등 그 외 1.5자 ≈ 1토큰)
+# ---------------------------------------------------------
+def _get_tokenizer():
+    try:
+        from transformers import AutoTokenizer
+        tokenizer = AutoTokenizer.from_pretrained(CONTEXT_TOKENIZER)
+        print(f"[RAG] Loaded context tokenizer: {CONTEXT_TOKENIZER}")
+        return tokenizer
+    except Exception as e:
+        print(f"[RAG] Failed to load tokenizer '{CONTEXT_TOKENIZER}', using estimate: {e}")
+        return None
+
+
+def _load_tokenizer():
+    """tokenizer 로딩 시작 (이미 시작했으면 같은 Future 반환)"""
+    global _tokenizer_future
+    with _tokenizer_lock:
+        if _tokenizer_future is None:
+            _tokenizer_future = _tokenizer_executor.submit(_get_tokenizer)
+        return _tokenizer_future
+
+
+def count_tokens(text: str) -> int:
+    future = _load_tokenizer()
+    tokenizer = future.result() if future.done() else None
+    if tokenizer is not None:
+        return len(tokenizer.encode(text, add_special_tokens=False))
+    ascii_chars = sum(1 for ch in text if ch.isascii())
+    return math.ceil(ascii_chars / 4 + (len(text) - ascii_chars) / 1.5)
+
+
+# ---------------------------------------------------------
+# 같은 문서의 인접/겹치는 청크 병합
+#    - 스플리터의 chunk_overlap 때문에 이웃 청크는 앞뒤 텍스트가 겹침
+#    - start_index(색인 시 add_start_index)가 있으면 위치로 병합,
+#      없거나(이전에 색인한 포인트) 위치와 텍스트가 맞지 않으면 앞 청크 끝 = 뒤 청크 시작인 겹침을 찾아 병합
+#    - 병합된 조각의 점수는 구성 청크 중 최고 점수
+# ---------------------------------------------------------
+MIN_TEXT_OVERLAP = 20
+MAX_TEXT_OVERLAP = 400
+
+
+def _doc_key(metadata: dict) -> tuple:
+    # start_index는 로더가 나눈 문서(PDF 페이지, CSV 행) 기준이므로 페이지/행까지 같아야 병합
+    return (
+        metadata.get("source_id") or metadata.get("source") or metadata.get("path"),
+        metadata.get("page"),
+        metadata.get("row"),
+    )
+
 
-    # LangChain 0.2+ 호환 (우선 사용)
-    if hasattr(retriever, "invoke"):
-        docs = retriever.invoke(query)
-    else:
-        # 구버전 호환
-        docs = retriever.get_relevant_documents(query)
+def _text_overlap(a: str, b: str) -> int:
+    """a의 끝과 b의 시작이 겹치는 길이 (없으면 0)"""
+    for n in range(min(len(a), len(b), MAX_TEXT_OVERLAP), MIN_TEXT_OVERLAP - 1, -1):
+        if a.endswith(b[:n]):
+            return n
+    return 0
 
+
+def _merge_text(piece: dict, d: dict) -> bool:
+    """겹치는 텍스트를 찾아 d를 piece에 병합 (겹침이 없으면 False)"""
+    if n := _text_overlap(piece["text"], d["text"]):
+        piece["text"] += d["text"][n:]
+    elif n := _text_overlap(d["text"], piece["text"]):
+        piece["text"] = d["text"] + piece["text"][n:]
+    elif d["text"] not in piece["text"]:
+        return False
+    piece["score"] = max(piece["score"], d["score"])
+    return True
+
+
+def _merge_group(docs: List[dict]) -> List[dict]:
+    positioned = sorted((d for d in docs if d["metadata"].get("start_index") is not None),
+                        key=lambda d: d["metadata"]["start_index"])
+    pieces = []
+    for d in positioned:
+        start = d["metadata"]["start_index"]
+        last = pieces[-1] if pieces else None
+        if last is not None and last["start"] is not None and start <= last["end"]:
+            # 위치상 겹치는 부분의 텍스트가 실제로 같을 때만 위치로 병합
+            # (문서 수정 전에 색인된 포인트는 start_index가 현재 문서와 다를 수 있음)
+            tail = last["text"][start - last["start"]:]
+            if d["text"].startswith(tail) or tail.startswith(d["text"]):
+                last["text"] += d["text"][len(tail):]
+                last["end"] = max(last["end"], start + len(d["text"]))
+                last["score"] = max(last["score"], d["score"])
+                continue
+            if _merge_text(last, d):
+                # 위치를 더 이상 믿을 수 없으므로 이후 청크는 위치로 병합하지 않음
+                last["start"] = last["end"] = None
+                continue
+        pieces.append({**d, "start": start, "end": start + len(d["text"])})
+
+    for d in (d for d in docs if d["metadata"].get("start_index") is None):
+        if not any(_merge_text(piece, d) for piece in pieces):
+            pieces.append({**d, "start": None, "end": None})
+    return pieces
+
+
+def merge_chunks(docs: List[dict]) -> List[dict]:
+    groups = {}
+    for d in docs:
+        groups.setdefault(_doc_key(d["metadata"]), []).append(d)
+    merged = [p for group in groups.values() for p in _merge_group(group)]
+    merged.sort(key=lambda d: d["score"] or 0.0, reverse=True)
+    return merged
+
+
+# ---------------------------------------------------------
+# 검색 결과 → 컨텍스트 문자열
+#    - 겹치는 청크를 병합한 뒤 점수 높은 순으로 MAX_CTX_TOKENS 안에 채움
+#    - 넘치는 조각은 건너뛰고 다음(더 작은) 조각을 계속 시도
+# ---------------------------------------------------------
+def pack_context(docs: List[dict], max_tokens: int = MAX_CTX_TOKENS) -> Tuple[str, List[str]]:
     buff, used = [], 0
     sources = []
 
-    for i, d in enumerate(docs, 1):
+    for d in merge_chunks(docs):
         # 문서 원본 경로나 파일명 표시
-        path = (d.metadata or {}).get("source") or (d.metadata or {}).get("path") or "unknown"
-        piece = f"[Doc {i}] {path}\n{d.page_content}\n\n"
+        path = d["metadata"].get("source") or d["metadata"].get("path") or "unknown"
+        piece = f"[Doc {len(buff) + 1}] {path}\n{d['text']}\n\n"
 
-        # 컨텍스트 길이 제한 초과 시 중단
-        if used + len(piece) > MAX_CTX:
-            break
+        tokens = count_tokens(piece)
+        if used + tokens > max_tokens:
+            continue
 
         buff.append(piece)
-        sources.append(path)
-        used += len(piece)
+        if path not in sources:
+            sources.append(path)
+        used += tokens
 
-    # context(문맥), sources(문서 출처 목록), ready(색인 여부)
-    return "".join(buff), sources, True
+    return "".join(buff), sources
 
 
 # ---------------------------------------------------------
@@ -0,0 +1,105 @@
+import asyncio
+import os
+import time
+
+import psutil
+
+from app.service import metrics
+
+# === 환경 변수 설정 ===
+WARMUP_ENABLED = os.getenv("WARMUP_ENABLED", "true").lower() == "true"   # false면 모델은 첫 요청 때 로딩
+# 첫 요청 지연 시간을 기록할 경로 (모델/검색을 실제로 거치는 답변 엔드포인트만)
+FIRST_REQUEST_PATHS = ("/api/chat/ask", "/api/chat/ask-stream", "/api/chat/ask-batch")
+
+
+# ---------------------------------------------------------
+# 시작/워밍업 상태
+#    - import_seconds: 프로세스 생성 → lifespan 시작 (모듈 import + 앱 구성)
+#    - 워밍업은 lifespan에서 백그라운드 태스크로 실행
+#      → 서버는 바로 요청을 받고, /readyz 는 워밍업이 끝날 때까지 503
+# ---------------------------------------------------------
+state = {
+    "ready": False,
+    "warming": False,
+    "error": None,
+    "import_seconds": None,
+    "warmup_seconds": None,
+    "steps": {},
+    "first_request_ms": None,
+}
+_task = None
+
+
+async def _warm_up():
+    # rag_service는 qdrant_client / 임베딩 설정을 불러오므로 워밍업 시점에 import
+    from app.service import rag_service
+
+    started = time.perf_counter()
+    state["warming"] = True
+    try:
+        state["steps"] = await rag_service.warm_up()
+        state["ready"] = True
+    except Exception as e:
+        state["error"] = str(e)
+        print(f"[SYSTEM] Warm-up failed: {e}")
+    finally:
+        state["warming"] = False
+        state["warmup_seconds"] = round(time.perf_counter() - started, 3)
+        metrics.WARMUP_SECONDS.set(state["warmup_seconds"])
+
+    if state["ready"]:
+        print(f"[SYSTEM] Warm-up done in {state['warmup_seconds']:.2f}s {state['steps']}")
+
+
+def start():
+    """lifespan 시작 시 호출: 시작 시간 기록 + 워밍업 태스크 시작"""
+    global _task
+    state["import_seconds"] = round(time.time() - psutil.Process().create_time(), 3)
+    metrics.STARTUP_SECONDS.set(state["import_seconds"])
+    print(f"[SYSTEM] App started in {state['import_seconds']:.2f}s (process start → lifespan)")
+
+    if not WARMUP_ENABLED:
+        state["ready"] = True
+        return
+    _task = asyncio.create_task(_warm_up())
+
+
+async def stop():
+    global _task
+    if _task is not None and not _task.done():
+        _task.cancel()
+        try:
+            await _task
+        except asyncio.CancelledError:
+            pass
+    _task = None
+
+
+# ---------------------------------------------------------
+# 첫 답변 요청 지연 시간 기록 (ASGI 미들웨어)
+#    - FIRST_REQUEST_PATHS 중 첫 요청 1건만 측정하고 이후에는 그대로 통과
+#      (/api/chat/cache 같은 가벼운 조회는 제외)
+#    - 스트리밍 응답은 스트림이 끝날 때까지의 시간
+# ---------------------------------------------------------
+class FirstRequestLogger:
+    def __init__(self, app, paths: tuple = FIRST_REQUEST_PATHS):
+        self.app = app
+        self.paths = frozenset(paths)
+        self.logged = False
+
+    async def __call__(self, scope, receive, send):
+        if self.logged or scope["type"] != "http" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        self.logged = True
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+            state["first_request_ms"] = elapsed_ms
+            print(
+                f"[SYSTEM] First request {scope['method']} {scope['path']} took {elapsed_ms}ms "
+                f"(warm-up {'done' if state['ready'] else 'not done'})"
+            )
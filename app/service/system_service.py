@@ -0,0 +1,220 @@
+import asyncio
+import os
+import platform
+import shutil
+import threading
+import time
+from datetime import datetime
+
+import psutil
+import GPUtil
+
+from app.service.timeseries import TieredHistory, snapshot_values
+
+# === 환경 변수 설정 ===
+SAMPLE_INTERVAL = float(os.getenv("SYSTEM_SAMPLE_INTERVAL", "1.0"))        # CPU/메모리/디스크 수집 주기(초)
+SLOW_SAMPLE_INTERVAL = float(os.getenv("SYSTEM_SLOW_SAMPLE_INTERVAL", "5.0"))  # 프로세스 목록/GPU 수집 주기(초)
+TOP_PROCESSES = 10
+
+
+def get_gpu_info():
+    """첫 번째 GPU 정보만 반환 (GPUtil은 nvidia-smi를 실행하므로 느린 주기에서만 호출)"""
+    try:
+        gpus = GPUtil.getGPUs()
+        if not gpus:
+            return None
+
+        g = gpus[0]
+        return {
+            "name": g.name,
+            "load_percent": round(g.load * 100, 1),
+            "mem_used": g.memoryUsed,      # MB
+            "mem_total": g.memoryTotal,    # MB
+            "mem_percent": round(g.memoryUtil * 100, 1),
+            "temperature": g.temperature,  # °C
+        }
+    except Exception:
+        return None
+
+
+def get_disk_info() -> dict:
+    """디스크 (루트 기준, Windows는 C: 드라이브)"""
+    try:
+        disk = shutil.disk_usage("C:\\" if platform.system() == "Windows" else "/")
+    except Exception:
+        return {"total": 0, "used": 0, "percent": 0.0}
+
+    return {
+        "total": disk.total,
+        "used": disk.used,
+        "percent": round(disk.used / disk.total * 100, 1) if disk.total else 0.0,
+    }
+
+
+# ---------------------------------------------------------
+# 시스템 정보 백그라운드 수집기
+#    - 요청마다 수집하지 않고, 스레드 1개가 주기적으로 수집한 스냅샷을 모든 요청이 공유
+#    - CPU/메모리/디스크: SAMPLE_INTERVAL 마다
+#    - 프로세스 목록/GPU: SLOW_SAMPLE_INTERVAL 마다 (비용이 큰 항목)
+#    - psutil.Process 객체를 PID별로 유지해서 cpu_percent가
+#      "직전 수집 이후 사용률"이 되도록 함 (첫 수집에서는 0으로 기준점만 잡음)
+#    - 수집할 때마다 단계별 시계열(history)에 기록하고,
+#      WebSocket 구독자(대시보드)에게 같은 스냅샷을 전달 → 뷰어 N명이어도 수집은 1번
+# ---------------------------------------------------------
+class SystemSampler:
+    def __init__(self, interval: float = SAMPLE_INTERVAL, slow_interval: float = SLOW_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.slow_interval = slow_interval
+        self._snapshot = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._procs = {}   # pid → psutil.Process
+        self._slow = {"gpu": None, "processes": [], "sampled_at": None}
+        self._slow_at = 0.0
+        self._subscribers = set()   # (event loop, asyncio.Queue)
+        self.history = TieredHistory(min_step=interval)   # 첫 단계 간격 = max(설정값, 수집 주기)
+        self._static = {
+            "os": platform.system(),
+            "release": platform.release(),
+            "boot_time": datetime.fromtimestamp(psutil.boot_time()).isoformat(timespec="seconds"),
+        }
+
+    # --- 수집 ---
+    def _top_processes(self, limit: int = TOP_PROCESSES) -> list:
+        """CPU 사용률 기준 상위 프로세스 반환"""
+        processes = []
+        alive = set()
+        for proc in psutil.process_iter(["pid", "name"]):
+            pid = proc.info["pid"]
+            alive.add(pid)
+            cached = self._procs.get(pid)
+            if cached is None:
+                # 새 프로세스: 기준점만 잡고 다음 수집부터 사용률 계산
+                self._procs[pid] = proc
+                try:
+                    proc.cpu_percent(None)
+                except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                    pass
+                continue
+            try:
+                with cached.oneshot():
+                    cpu = cached.cpu_percent(None) or 0
+                    mem = cached.memory_percent() or 0
+                # 0보다 큰 것만 추가
+                if cpu > 0 or mem > 0:
+                    processes.append({
+                        "pid": pid,
+                        "name": proc.info["name"],
+                        "cpu_percent": cpu,
+                        "memory_percent": mem,
+                    })
+            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                pass
+
+        # 종료된 프로세스 정리
+        for pid in list(self._procs):
+            if pid not in alive:
+                del self._procs[pid]
+
+        # CPU 사용률 기준 정렬
+        processes.sort(key=lambda x: x["cpu_percent"], reverse=True)
+        return processes[:limit]
+
+    def sample(self) -> dict:
+        now = time.time()
+        if self._slow["sampled_at"] is None or time.monotonic() - self._slow_at >= self.slow_interval:
+            try:
+                processes = self._top_processes()
+            except Exception as e:
+                print(f"Error getting processes: {e}")
+                processes = []
+            self._slow = {"gpu": get_gpu_info(), "processes": processes, "sampled_at": now}
+            self._slow_at = time.monotonic()
+
+        mem = psutil.virtual_memory()
+        snapshot = {
+            "cpu_percent": psutil.cpu_percent(interval=None),
+            "memory": {
+                "total": mem.total,
+                "used": mem.used,
+                "percent": mem.percent,
+            },
+            "disk": get_disk_info(),
+            "gpu": self._slow["gpu"],
+            "system": self._static,
+            "processes": self._slow["processes"],
+            "sampled_at": now,
+        }
+        with self._lock:
+            self._snapshot = snapshot
+        return snapshot
+
+    # --- 구독 (WebSocket 전달용) ---
+    def subscribe(self) -> asyncio.Queue:
+        """현재 이벤트 루프에서 새 스냅샷을 받을 큐 등록 (느린 구독자는 최신 것만 받음)"""
+        queue = asyncio.Queue(maxsize=1)
+        with self._lock:
+            self._subscribers.add((asyncio.get_running_loop(), queue))
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        with self._lock:
+            self._subscribers = {(loop, q) for loop, q in self._subscribers if q is not queue}
+
+    @staticmethod
+    def _offer(queue: asyncio.Queue, snapshot: dict):
+        # 이벤트 루프 스레드에서 실행됨: 밀린 스냅샷은 버리고 최신 것으로 교체
+        if queue.full():
+            queue.get_nowait()
+        queue.put_nowait(snapshot)
+
+    def _publish(self, snapshot: dict):
+        self.history.add(snapshot["sampled_at"], snapshot_values(snapshot))
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(self._offer, queue, snapshot)
+            except RuntimeError:
+                # 루프가 이미 닫힘
+                self.unsubscribe(queue)
+
+    # --- 스레드 제어 ---
+    def _loop(self):
+        while not self._stop.is_set():
+            started = time.monotonic()
+            try:
+                self._publish(self.sample())
+            except Exception as e:
+                print(f"[SYSTEM] sampler error: {e}")
+            self._stop.wait(max(0.0, self.interval - (time.monotonic() - started)))
+
+    def start(self):
+        if self._thread is not None:
+            return
+        psutil.cpu_percent(interval=None)  # 전체 CPU 사용률 기준점
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="system-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def snapshot(self) -> dict:
+        """가장 최근 스냅샷 (수집기가 아직 돌지 않았으면 즉시 1회 수집)"""
+        with self._lock:
+            snapshot = self._snapshot
+        return snapshot if snapshot is not None else self.sample()
+
+
+# === 전역 객체 (FastAPI lifespan에서 시작/종료) ===
+sampler = SystemSampler()
+
+
+def get_system_info() -> dict:
+    """psutil + GPUtil로 수집한 최신 시스템 정보 스냅샷 반환"""
+    return sampler.snapshot()
@@ -0,0 +1,126 @@
+import math
+import os
+import threading
+from array import array
+
+# 시계열로 보관할 항목 (시스템 스냅샷에서 추출)
+FIELDS = ("cpu", "mem", "disk", "gpu_load", "gpu_mem", "gpu_temp")
+
+# 보관 단계 "간격초:개수,..." (기본: 1초 x 10분, 1분 x 24시간)
+HISTORY_TIERS = os.getenv("SYSTEM_HISTORY_TIERS", "1:600,60:1440")
+
+
+def snapshot_values(snapshot: dict) -> tuple:
+    """시스템 스냅샷 → FIELDS 순서의 값 (GPU 없으면 NaN)"""
+    gpu = snapshot.get("gpu") or {}
+    nan = math.nan
+    return (
+        float(snapshot.get("cpu_percent") or 0.0),
+        float((snapshot.get("memory") or {}).get("percent") or 0.0),
+        float((snapshot.get("disk") or {}).get("percent") or 0.0),
+        float(gpu["load_percent"]) if gpu.get("load_percent") is not None else nan,
+        float(gpu["mem_percent"]) if gpu.get("mem_percent") is not None else nan,
+        float(gpu["temperature"]) if gpu.get("temperature") is not None else nan,
+    )
+
+
+# ---------------------------------------------------------
+# 고정 크기 링 버퍼 (array('d') 기반)
+#    - 항목별 배열 + 타임스탬프 배열을 미리 할당하고 인덱스만 순환
+#    - append는 O(1), 메모리는 capacity x (항목 수 + 1) x 8 bytes로 고정
+# ---------------------------------------------------------
+class RingBuffer:
+    def __init__(self, capacity: int, fields: tuple = FIELDS):
+        self.capacity = capacity
+        self.fields = fields
+        self._ts = array("d", [0.0]) * capacity
+        self._cols = [array("d", [math.nan]) * capacity for _ in fields]
+        self._head = 0    # 다음에 쓸 위치
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def append(self, ts: float, values: tuple):
+        i = self._head
+        self._ts[i] = ts
+        for col, v in zip(self._cols, values):
+            col[i] = v
+        self._head = (i + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+    def range(self, start: float | None = None, end: float | None = None) -> dict:
+        """[start, end] 구간 데이터 (오래된 순, 열 단위 리스트, NaN은 None)"""
+        first = (self._head - self._size) % self.capacity
+        ts, cols = [], [[] for _ in self.fields]
+        for k in range(self._size):
+            i = (first + k) % self.capacity
+            t = self._ts[i]
+            if (start is not None and t < start) or (end is not None and t > end):
+                continue
+            ts.append(t)
+            for out, col in zip(cols, self._cols):
+                v = col[i]
+                out.append(None if math.isnan(v) else round(v, 2))
+        return {"ts": ts, **dict(zip(self.fields, cols))}
+
+
+# ---------------------------------------------------------
+# 단계별 다운샘플링 기록
+#    - 모든 단계가 타임스탬프 기준 step초 구간 평균으로 저장 (구간이 바뀔 때 이전 구간 기록)
+#    - min_step: 수집 주기. 단계 간격은 수집 주기보다 짧을 수 없음
+#      (예: 수집 5초에 "1:600" → 5초 x 600개, 이름도 "5s")
+#    - 수집기 스레드가 add, API 요청이 query → lock으로 보호
+# ---------------------------------------------------------
+class TieredHistory:
+    def __init__(self, tiers: str = HISTORY_TIERS, fields: tuple = FIELDS, min_step: float = 0.0):
+        self.fields = fields
+        self.tiers = []
+        for spec in tiers.split(","):
+            step, capacity = spec.split(":")
+            step = max(float(step), min_step)
+            self.tiers.append({
+                "name": _tier_name(step),
+                "step": step,
+                "buffer": RingBuffer(int(capacity), fields),
+                "bucket": None,           # 현재 집계 중인 구간 번호
+                "sums": [0.0] * len(fields),
+                "counts": [0] * len(fields),
+            })
+        self._lock = threading.Lock()
+
+    def add(self, ts: float, values: tuple):
+        with self._lock:
+            for tier in self.tiers:
+                bucket = int(ts // tier["step"])
+                if tier["bucket"] is not None and bucket != tier["bucket"]:
+                    self._flush(tier)
+                tier["bucket"] = bucket
+                for k, v in enumerate(values):
+                    if not math.isnan(v):
+                        tier["sums"][k] += v
+                        tier["counts"][k] += 1
+
+    def _flush(self, tier: dict):
+        avg = tuple(s / c if c else math.nan for s, c in zip(tier["sums"], tier["counts"]))
+        tier["buffer"].append(tier["bucket"] * tier["step"], avg)
+        tier["sums"] = [0.0] * len(self.fields)
+        tier["counts"] = [0] * len(self.fields)
+
+    def tier_names(self) -> list:
+        return [t["name"] for t in self.tiers]
+
+    def query(self, tier: str | None = None, start: float | None = None, end: float | None = None) -> dict | None:
+        with self._lock:
+            for t in self.tiers:
+                if tier is None or t["name"] == tier:
+                    return {"tier": t["name"], "step": t["step"], **t["buffer"].range(start, end)}
+        return None
+
+
+def _tier_name(step: float) -> str:
+    if step >= 3600 and step % 3600 == 0:
+        return f"{int(step // 3600)}h"
+    if step >= 60 and step % 60 == 0:
+        return f"{int(step // 60)}m"
+    return f"{step:g}s"
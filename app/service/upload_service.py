@@ -0,0 +1,238 @@
+import asyncio
+import hashlib
+import json
+import math
+import os
+import re
+import shutil
+import time
+import uuid
+from pathlib import Path
+from typing import AsyncIterator
+
+import aiofiles
+import aiofiles.os
+from fastapi import HTTPException
+
+from app.rag import catalog
+
+# === 환경 변수 설정 ===
+UPLOAD_DIR = Path("data/uploads")                                        # 임베딩 대기 파일
+UPLOAD_TMP_DIR = Path(os.getenv("UPLOAD_TMP_DIR", "data/tmp"))           # 업로드 중 임시 파일 (uploads 밖에 둠)
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", str(1024 ** 3)))    # 파일 1개 최대 크기 (기본 1GB)
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", str(1024 ** 2)))  # 한 번에 읽고 쓸 크기 (기본 1MB)
+
+UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+UPLOAD_TMP_DIR.mkdir(parents=True, exist_ok=True)
+
+
+def safe_filename(filename: str | None) -> str:
+    """경로 조작(../ 등)을 막기 위해 파일명 부분만 사용"""
+    name = Path((filename or "").replace("\\", "/")).name
+    if not name or name in (".", ".."):
+        raise HTTPException(status_code=400, detail="파일명이 올바르지 않습니다.")
+    return name
+
+
+# ---------------------------------------------------------
+# 스트림 → 임시 파일 → data/uploads 로 이동
+#    - 고정 크기 청크 단위로 비동기 쓰기 (파일 전체를 메모리에 올리지 않음)
+#    - 쓰는 동안 sha256 계산, 최대 크기 초과 시 즉시 중단(413)
+#    - 완료 후 rename 하므로 인덱서가 쓰다 만 파일을 읽는 일이 없음
+#    - 완료되면 문서 카탈로그에 "uploaded" 상태로 기록
+#    - 실패 시 임시 파일 삭제
+# ---------------------------------------------------------
+async def save_stream(chunks: AsyncIterator[bytes], filename: str, max_bytes: int = UPLOAD_MAX_BYTES) -> dict:
+    name = safe_filename(filename)
+    tmp_path = UPLOAD_TMP_DIR / f"{uuid.uuid4().hex}.part"
+    digest = hashlib.sha256()
+    size = 0
+
+    try:
+        async with aiofiles.open(tmp_path, "wb") as out:
+            async for chunk in chunks:
+                size += len(chunk)
+                if size > max_bytes:
+                    raise HTTPException(
+                        status_code=413,
+                        detail=f"파일 크기가 제한({max_bytes} bytes)을 초과했습니다: {name}",
+                    )
+                digest.update(chunk)
+                await out.write(chunk)
+
+        await aiofiles.os.replace(tmp_path, UPLOAD_DIR / name)
+    except BaseException:
+        try:
+            await aiofiles.os.remove(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+    sha256 = digest.hexdigest()
+    await asyncio.to_thread(catalog.record_upload, name, sha256, size)
+    return {"filename": name, "size": size, "sha256": sha256}
+
+
+async def iter_upload_file(file, chunk_size: int = UPLOAD_CHUNK_SIZE) -> AsyncIterator[bytes]:
+    """FastAPI UploadFile을 chunk_size 단위로 읽기"""
+    while chunk := await file.read(chunk_size):
+        yield chunk
+
+
+async def save_upload(file) -> dict:
+    return await save_stream(iter_upload_file(file), file.filename)
+
+
+# ---------------------------------------------------------
+# 분할(재개 가능) 업로드 세션
+#    - data/tmp/sessions/{session_id}/ 에 meta.json + 파트별 파일 저장
+#    - 파트는 순서와 상관없이, 동시에 올려도 됨 (파트마다 별도 파일)
+#    - 연결이 끊기면 status로 받은 파트를 확인하고 나머지만 다시 전송
+#    - complete: 파트를 순서대로 읽어 save_stream으로 조립
+#      (전체 파일을 메모리에 올리지 않음, 크기 제한/sha256도 동일하게 적용)
+#    - UPLOAD_SESSION_TTL 동안 갱신이 없는 세션은 새 세션 생성 시 정리
+# ---------------------------------------------------------
+UPLOAD_SESSION_DIR = UPLOAD_TMP_DIR / "sessions"
+UPLOAD_PART_SIZE = int(os.getenv("UPLOAD_PART_SIZE", str(8 * 1024 ** 2)))        # 기본 파트 크기 (8MB)
+UPLOAD_SESSION_TTL = float(os.getenv("UPLOAD_SESSION_TTL", str(24 * 3600)))      # 세션 보관 시간(초)
+
+UPLOAD_SESSION_DIR.mkdir(parents=True, exist_ok=True)
+
+_SESSION_ID = re.compile(r"^[0-9a-f]{32}$")
+
+
+def _session_dir(session_id: str) -> Path:
+    if not _SESSION_ID.match(session_id or ""):
+        raise HTTPException(status_code=404, detail="업로드 세션이 존재하지 않습니다.")
+    path = UPLOAD_SESSION_DIR / session_id
+    if not (path / "meta.json").exists():
+        raise HTTPException(status_code=404, detail="업로드 세션이 존재하지 않습니다.")
+    return path
+
+
+def _part_path(session: Path, number: int) -> Path:
+    return session / f"{number:06d}.part"
+
+
+async def _read_meta(session: Path) -> dict:
+    async with aiofiles.open(session / "meta.json", "r", encoding="utf-8") as f:
+        return json.loads(await f.read())
+
+
+def _received_parts(session: Path, total_parts: int) -> list:
+    return [n for n in range(1, total_parts + 1) if _part_path(session, n).exists()]
+
+
+def _expected_part_size(meta: dict, number: int) -> int:
+    if number < meta["total_parts"]:
+        return meta["part_size"]
+    return meta["size"] - meta["part_size"] * (meta["total_parts"] - 1)
+
+
+def _purge_expired_sessions():
+    now = time.time()
+    for path in UPLOAD_SESSION_DIR.iterdir():
+        try:
+            if path.is_dir() and now - path.stat().st_mtime > UPLOAD_SESSION_TTL:
+                shutil.rmtree(path, ignore_errors=True)
+        except FileNotFoundError:
+            pass
+
+
+async def create_session(filename: str, size: int, part_size: int | None = None) -> dict:
+    name = safe_filename(filename)
+    part_size = part_size or UPLOAD_PART_SIZE
+    if size <= 0:
+        raise HTTPException(status_code=400, detail="파일 크기가 올바르지 않습니다.")
+    if size > UPLOAD_MAX_BYTES:
+        raise HTTPException(
+            status_code=413,
+            detail=f"파일 크기가 제한({UPLOAD_MAX_BYTES} bytes)을 초과했습니다: {name}",
+        )
+    if part_size <= 0 or part_size > UPLOAD_MAX_BYTES:
+        raise HTTPException(status_code=400, detail="파트 크기가 올바르지 않습니다.")
+
+    await asyncio.to_thread(_purge_expired_sessions)
+
+    meta = {
+        "session_id": uuid.uuid4().hex,
+        "filename": name,
+        "size": size,
+        "part_size": part_size,
+        "total_parts": math.ceil(size / part_size),
+        "created_at": time.time(),
+    }
+    session = UPLOAD_SESSION_DIR / meta["session_id"]
+    await aiofiles.os.makedirs(session, exist_ok=True)
+    async with aiofiles.open(session / "meta.json", "w", encoding="utf-8") as f:
+        await f.write(json.dumps(meta, ensure_ascii=False))
+    return meta
+
+
+async def session_status(session_id: str) -> dict:
+    session = _session_dir(session_id)
+    meta = await _read_meta(session)
+    received = _received_parts(session, meta["total_parts"])
+    return {**meta, "received": received, "complete": len(received) == meta["total_parts"]}
+
+
+async def put_part(session_id: str, number: int, chunks: AsyncIterator[bytes]) -> dict:
+    session = _session_dir(session_id)
+    meta = await _read_meta(session)
+    if not 1 <= number <= meta["total_parts"]:
+        raise HTTPException(status_code=400, detail=f"파트 번호가 범위를 벗어났습니다: {number}")
+
+    expected = _expected_part_size(meta, number)
+    tmp_path = session / f"{number:06d}.{uuid.uuid4().hex}.tmp"
+    digest = hashlib.sha256()
+    size = 0
+
+    # 같은 파트를 다시 보내도(재시도) 완성된 파일만 교체되도록 임시 파일 → rename
+    try:
+        async with aiofiles.open(tmp_path, "wb") as out:
+            async for chunk in chunks:
+                size += len(chunk)
+                if size > expected:
+                    raise HTTPException(status_code=400, detail=f"파트 {number} 크기가 {expected} bytes를 초과했습니다.")
+                digest.update(chunk)
+                await out.write(chunk)
+        if size != expected:
+            raise HTTPException(status_code=400, detail=f"파트 {number} 크기 불일치: {size} / {expected} bytes")
+        await aiofiles.os.replace(tmp_path, _part_path(session, number))
+    except BaseException:
+        try:
+            await aiofiles.os.remove(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+    os.utime(session)  # 만료 기준 시간 갱신
+    return {"part": number, "size": size, "sha256": digest.hexdigest()}
+
+
+async def _iter_parts(session: Path, total_parts: int, chunk_size: int = UPLOAD_CHUNK_SIZE) -> AsyncIterator[bytes]:
+    for n in range(1, total_parts + 1):
+        async with aiofiles.open(_part_path(session, n), "rb") as f:
+            while chunk := await f.read(chunk_size):
+                yield chunk
+
+
+async def complete_session(session_id: str) -> dict:
+    session = _session_dir(session_id)
+    meta = await _read_meta(session)
+    received = _received_parts(session, meta["total_parts"])
+    if len(received) != meta["total_parts"]:
+        missing = sorted(set(range(1, meta["total_parts"] + 1)) - set(received))
+        raise HTTPException(
+            status_code=409,
+            detail={"message": "아직 도착하지 않은 파트가 있습니다.", "missing": missing},
+        )
+
+    saved = await save_stream(_iter_parts(session, meta["total_parts"]), meta["filename"])
+    await asyncio.to_thread(shutil.rmtree, session, True)
+    return saved
+
+
+async def abort_session(session_id: str):
+    session = _session_dir(session_id)
+    await asyncio.to_thread(shutil.rmtree, session, True)
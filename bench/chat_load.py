@@ -0,0 +1,93 @@
+# bench/chat_load.py
+"""
+/api/chat/ask 부하 테스트
+
+동시 사용자 수(1, 8, 32)별로 고정 개수의 요청을 보내고
+requests/sec 와 지연 시간(p50/p99)을 출력합니다.
+
+    python -m bench.chat_load --url http://localhost:8000 --requests 64
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+import httpx
+
+DEFAULT_QUESTIONS = [
+    "제품 보증 기간은 얼마인가요?",
+    "How do I reset the admin password?",
+    "에러 코드 E-1042 는 무엇을 의미하나요?",
+    "What file formats can be uploaded?",
+]
+
+
+def percentile(values, q: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    idx = min(len(values) - 1, max(0, round(q / 100 * (len(values) - 1))))
+    return values[idx]
+
+
+async def run_level(client: httpx.AsyncClient, url: str, concurrency: int, total: int, questions) -> dict:
+    latencies, errors = [], 0
+    counter = iter(range(total))
+
+    async def worker():
+        nonlocal errors
+        for i in counter:
+            started = time.perf_counter()
+            try:
+                r = await client.post(url, json={"message": questions[i % len(questions)]})
+                if r.status_code >= 400:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "concurrency": concurrency,
+        "requests": total,
+        "errors": errors,
+        "rps": round(total / elapsed, 2),
+        "p50_ms": round(statistics.median(latencies), 1) if latencies else 0.0,
+        "p99_ms": round(percentile(latencies, 99), 1),
+    }
+
+
+async def main(args):
+    url = args.url.rstrip("/") + args.path
+    levels = [int(c) for c in args.concurrency.split(",")]
+    limits = httpx.Limits(max_connections=max(levels), max_keepalive_connections=max(levels))
+
+    results = []
+    async with httpx.AsyncClient(timeout=args.timeout, limits=limits) as client:
+        for c in levels:
+            res = await run_level(client, url, c, max(args.requests, c), DEFAULT_QUESTIONS)
+            print(
+                f"[BENCH] concurrency={c:>3}  rps={res['rps']:>8}  "
+                f"p50={res['p50_ms']:>8}ms  p99={res['p99_ms']:>8}ms  errors={res['errors']}"
+            )
+            results.append(res)
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="/api/chat/ask load test")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--path", default="/api/chat/ask")
+    parser.add_argument("--concurrency", default="1,8,32")
+    parser.add_argument("--requests", type=int, default=64, help="동시성 레벨별 요청 수")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--out", default=None, help="결과 JSON 저장 경로")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,109 @@
+# bench/corpus.py
+"""
+벤치마크용 합성 문서 생성
+
+한국어/영어 혼합 매뉴얼 형식의 .txt / .md / .csv 파일을 만들고,
+문서 안의 제품 코드 / 에러 코드를 묻는 질문 목록을 함께 반환합니다.
+같은 seed면 항상 같은 내용이 생성됩니다.
+
+    python -m bench.corpus --out /tmp/corpus --docs 200
+"""
+import argparse
+import csv
+import random
+from pathlib import Path
+
+KO_SENTENCES = [
+    "이 장치는 전원을 켠 후 약 30초 동안 자가 진단을 수행합니다.",
+    "관리자 비밀번호를 분실한 경우 초기화 버튼을 5초 이상 누르십시오.",
+    "펌웨어 업데이트 중에는 전원을 끄지 마십시오.",
+    "네트워크 설정은 웹 관리 화면의 고급 메뉴에서 변경할 수 있습니다.",
+    "보증 기간은 구입일로부터 2년이며 소모품은 제외됩니다.",
+    "온도가 40도를 넘으면 팬 속도가 자동으로 증가합니다.",
+    "로그 파일은 최대 7일간 보관된 후 자동으로 삭제됩니다.",
+    "정기 점검 시 필터 상태를 확인하고 필요하면 교체하십시오.",
+    "사용자 계정은 최대 32개까지 등록할 수 있습니다.",
+    "백업 파일은 암호화되어 외부 저장소에 업로드됩니다.",
+]
+EN_SENTENCES = [
+    "The device performs a self-test for about thirty seconds after power on.",
+    "Do not disconnect power while a firmware update is in progress.",
+    "Network settings can be changed from the advanced menu of the web console.",
+    "The warranty period is two years from the date of purchase.",
+    "Fan speed increases automatically when the temperature exceeds 40 degrees.",
+    "Log files are kept for seven days and then removed automatically.",
+    "Up to thirty-two user accounts can be registered.",
+    "Backups are encrypted before being uploaded to external storage.",
+    "Replace the filter if it shows signs of wear during inspection.",
+    "The admin password can be reset by holding the reset button for five seconds.",
+]
+KO_QUESTIONS = [
+    "에러 코드 {err} 는 무엇을 의미하나요?",
+    "{product} 제품의 보증 기간은?",
+    "{product} 펌웨어 업데이트 방법을 알려주세요.",
+]
+EN_QUESTIONS = [
+    "What does error code {err} mean?",
+    "How do I reset the admin password on {product}?",
+]
+
+
+def _code(rng: random.Random, prefix: str) -> str:
+    return f"{prefix}-{rng.randint(1000, 9999)}"
+
+
+def _paragraph(rng: random.Random, product: str, err: str) -> str:
+    lines = rng.sample(KO_SENTENCES, 3) + rng.sample(EN_SENTENCES, 2)
+    lines.append(f"{product} 모델에서 에러 코드 {err} 가 표시되면 전원을 재시작한 후 케이블 연결을 확인하십시오.")
+    lines.append(f"If {product} reports error {err}, restart the unit and check the cable connection.")
+    rng.shuffle(lines)
+    return " ".join(lines)
+
+
+def generate(out_dir, docs: int = 100, paragraphs: int = 8, seed: int = 42) -> dict:
+    """
+    out_dir에 문서 docs개 생성
+    반환: {"files": [경로...], "questions": [질문...], "bytes": 총 크기}
+    """
+    rng = random.Random(seed)
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+
+    files, questions, total = [], [], 0
+    for i in range(docs):
+        product = _code(rng, rng.choice(["AX", "BK", "CM", "DT"]))
+        errors = [_code(rng, "E") for _ in range(paragraphs)]
+        kind = ("txt", "md", "csv")[i % 3]
+        path = out / f"manual_{i:05d}.{kind}"
+
+        if kind == "csv":
+            with open(path, "w", encoding="utf-8", newline="") as f:
+                w = csv.writer(f)
+                w.writerow(["product", "error_code", "description"])
+                for err in errors:
+                    w.writerow([product, err, _paragraph(rng, product, err)])
+        else:
+            title = f"# {product} 사용자 매뉴얼\n\n" if kind == "md" else f"{product} 사용자 매뉴얼\n\n"
+            body = "\n\n".join(
+                (f"## {n + 1}. 문제 해결 {err}\n\n" if kind == "md" else "") + _paragraph(rng, product, err)
+                for n, err in enumerate(errors)
+            )
+            path.write_text(title + body + "\n", encoding="utf-8")
+
+        total += path.stat().st_size
+        files.append(str(path))
+        template = rng.choice(KO_QUESTIONS + EN_QUESTIONS)
+        questions.append(template.format(product=product, err=rng.choice(errors)))
+
+    return {"files": files, "questions": questions, "bytes": total}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic Korean/English corpus")
+    parser.add_argument("--out", required=True)
+    parser.add_argument("--docs", type=int, default=100)
+    parser.add_argument("--paragraphs", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    res = generate(args.out, docs=args.docs, paragraphs=args.paragraphs, seed=args.seed)
+    print(f"[BENCH] Generated {len(res['files'])} files ({res['bytes']} bytes)")
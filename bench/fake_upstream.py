@@ -0,0 +1,117 @@
+# bench/fake_upstream.py
+"""
+벤치마크용 가짜 OpenAI 호환 업스트림 (vLLM 대체)
+
+POST /v1/chat/completions 에 대해 설정한 지연 시간과 토큰 생성 속도로 응답합니다.
+- ttft-ms        : 첫 토큰까지 지연 시간
+- tokens-per-sec : 토큰 생성 속도 (요청마다 독립, 동시 요청 수와 무관)
+- tokens         : 응답 토큰 수 (max_tokens가 더 작으면 max_tokens)
+- max-concurrency: 동시에 생성하는 요청 수 상한 (0이면 무제한, 넘으면 대기)
+
+    python -m bench.fake_upstream --port 8999 --ttft-ms 200 --tokens-per-sec 50 --tokens 64
+"""
+import argparse
+import asyncio
+import json
+import time
+import uuid
+
+import uvicorn
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+
+WORDS = ["안내", "드립니다", "the", "device", "에러", "코드", "restart", "확인", "하십시오", "cable"]
+
+
+def create_app(ttft_ms: float = 200.0, tokens_per_sec: float = 50.0, tokens: int = 64,
+               max_concurrency: int = 0) -> FastAPI:
+    app = FastAPI(title="Fake OpenAI-compatible upstream")
+    gate = asyncio.Semaphore(max_concurrency) if max_concurrency > 0 else None
+    stats = {"requests": 0, "in_flight": 0, "max_in_flight": 0}
+
+    def _tokens(n: int):
+        return [WORDS[i % len(WORDS)] + " " for i in range(n)]
+
+    def _chunk(cid: str, model: str, text: str | None, finish_reason: str | None = None) -> str:
+        delta = {"content": text} if text is not None else {}
+        body = {
+            "id": cid, "object": "chat.completion.chunk", "created": int(time.time()), "model": model,
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+        }
+        return f"data: {json.dumps(body, ensure_ascii=False)}\n\n"
+
+    async def _generate(n: int):
+        # 첫 토큰 지연 → 토큰 간격마다 1개씩
+        await asyncio.sleep(ttft_ms / 1000)
+        interval = 1.0 / tokens_per_sec if tokens_per_sec > 0 else 0.0
+        for i, tok in enumerate(_tokens(n)):
+            if i:
+                await asyncio.sleep(interval)
+            yield tok
+
+    class _Slot:
+        async def __aenter__(self):
+            if gate is not None:
+                await gate.acquire()
+            stats["requests"] += 1
+            stats["in_flight"] += 1
+            stats["max_in_flight"] = max(stats["max_in_flight"], stats["in_flight"])
+
+        async def __aexit__(self, *exc):
+            stats["in_flight"] -= 1
+            if gate is not None:
+                gate.release()
+
+    @app.get("/v1/models")
+    async def models():
+        return {"object": "list", "data": [{"id": "fake", "object": "model"}]}
+
+    @app.get("/stats")
+    async def get_stats():
+        return stats
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(body: dict):
+        model = body.get("model") or "fake"
+        n = min(tokens, int(body.get("max_tokens") or tokens))
+        prompt_tokens = sum(len((m.get("content") or "").split()) for m in body.get("messages") or [])
+        cid = f"chatcmpl-{uuid.uuid4().hex}"
+
+        if body.get("stream"):
+            async def events():
+                async with _Slot():
+                    async for tok in _generate(n):
+                        yield _chunk(cid, model, tok)
+                    yield _chunk(cid, model, None, "length" if n < tokens else "stop")
+                    yield "data: [DONE]\n\n"
+
+            return StreamingResponse(events(), media_type="text/event-stream")
+
+        async with _Slot():
+            text = "".join([tok async for tok in _generate(n)])
+        return {
+            "id": cid, "object": "chat.completion", "created": int(time.time()), "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": text},
+                "finish_reason": "length" if n < tokens else "stop",
+            }],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": n, "total_tokens": prompt_tokens + n},
+        }
+
+    return app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fake OpenAI-compatible upstream for benchmarks")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8999)
+    parser.add_argument("--ttft-ms", type=float, default=200.0)
+    parser.add_argument("--tokens-per-sec", type=float, default=50.0)
+    parser.add_argument("--tokens", type=int, default=64)
+    parser.add_argument("--max-concurrency", type=int, default=0)
+    args = parser.parse_args()
+    uvicorn.run(
+        create_app(args.ttft_ms, args.tokens_per_sec, args.tokens, args.max_concurrency),
+        host=args.host, port=args.port, log_level="warning",
+    )
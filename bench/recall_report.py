@@ -0,0 +1,120 @@
+# bench/recall_report.py
+"""
+Qdrant 검색 설정별 recall / 지연 시간 리포트
+
+현재 컬렉션 설정(QDRANT_HNSW_*, QDRANT_QUANTIZATION 등)과 검색 설정
+(QDRANT_SEARCH_EF, 재채점)으로 검색한 결과를 exact search(전체 비교) 결과와 비교해
+recall@k 와 지연 시간(p50/p99)을 출력합니다.
+
+    python -m bench.recall_report --sample 200 --k 5 --ef 32,64,128,256
+    python -m bench.recall_report --queries questions.txt --out recall.json
+
+질의 벡터는 --queries(한 줄에 질문 1개, 색인과 같은 모델로 임베딩)를 주지 않으면
+컬렉션에서 무작위로 뽑은 포인트의 벡터를 사용합니다.
+포인트 수가 Qdrant indexing_threshold보다 적으면 HNSW가 만들어지지 않아 recall은 항상 1.0입니다.
+"""
+import argparse
+import json
+import statistics
+import time
+
+from qdrant_client import QdrantClient, models
+
+from app.rag import collection
+from app.rag.collection import COLLECTION
+from bench.chat_load import percentile
+
+
+def sample_vectors(client: QdrantClient, n: int) -> list:
+    res = client.query_points(
+        collection_name=COLLECTION,
+        query=models.SampleQuery(sample=models.Sample.RANDOM),
+        limit=n,
+        with_vectors=True,
+    )
+    vectors = []
+    for p in res.points:
+        # sparse 벡터가 있는 컬렉션은 {"": dense, "bm25": sparse} 형식
+        v = p.vector.get("") if isinstance(p.vector, dict) else p.vector
+        if v:
+            vectors.append(v)
+    return vectors
+
+
+def embed_queries(path: str) -> list:
+    from app.rag.embedding import EMB_NORMALIZE, get_model
+
+    with open(path, encoding="utf-8") as f:
+        questions = [line.strip() for line in f if line.strip()]
+    return get_model().encode(questions, normalize_embeddings=EMB_NORMALIZE, show_progress_bar=False).tolist()
+
+
+def run_setting(client: QdrantClient, vectors: list, k: int, params, baseline: list | None = None) -> dict:
+    latencies, recalls, results = [], [], []
+    for i, v in enumerate(vectors):
+        started = time.perf_counter()
+        res = client.query_points(collection_name=COLLECTION, query=v, limit=k, search_params=params)
+        latencies.append((time.perf_counter() - started) * 1000)
+
+        ids = [p.id for p in res.points]
+        results.append(ids)
+        if baseline is not None and baseline[i]:
+            recalls.append(len(set(ids) & set(baseline[i])) / len(baseline[i]))
+
+    return {
+        "recall": round(statistics.mean(recalls), 4) if recalls else 1.0,
+        "p50_ms": round(statistics.median(latencies), 2) if latencies else 0.0,
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "results": results,
+    }
+
+
+def main(args) -> dict:
+    client = collection.client()
+    info = client.get_collection(COLLECTION)
+    vectors = embed_queries(args.queries) if args.queries else sample_vectors(client, args.sample)
+    if not vectors:
+        raise SystemExit(f"[BENCH] No query vectors (collection '{COLLECTION}' is empty?)")
+
+    # 첫 요청의 연결/캐시 비용 제외
+    client.query_points(collection_name=COLLECTION, query=vectors[0], limit=args.k)
+
+    exact = run_setting(client, vectors, args.k, collection.search_params(exact=True))
+    rows = [{"setting": "exact", "ef": None, **{k: v for k, v in exact.items() if k != "results"}}]
+
+    efs = [None] + [int(e) for e in args.ef.split(",") if e] if args.ef else [None]
+    for ef in efs:
+        res = run_setting(client, vectors, args.k, collection.search_params(ef=ef), exact["results"])
+        rows.append({
+            "setting": "configured" if ef is None else f"ef={ef}",
+            "ef": ef if ef is not None else (collection.SEARCH_EF or None),
+            **{k: v for k, v in res.items() if k != "results"},
+        })
+
+    print(f"[BENCH] collection='{COLLECTION}' points={info.points_count} queries={len(vectors)} k={args.k}")
+    print(f"[BENCH] config={collection.describe()}")
+    for r in rows:
+        print(f"[BENCH] {r['setting']:>12}  recall@{args.k}={r['recall']:<7} p50={r['p50_ms']:>8}ms  p99={r['p99_ms']:>8}ms")
+
+    report = {
+        "collection": COLLECTION,
+        "points": info.points_count,
+        "queries": len(vectors),
+        "k": args.k,
+        "config": collection.describe(),
+        "rows": rows,
+    }
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Qdrant recall vs latency report")
+    parser.add_argument("--queries", default=None, help="질문 파일 (한 줄에 1개), 없으면 --sample 사용")
+    parser.add_argument("--sample", type=int, default=200, help="컬렉션에서 무작위로 뽑을 질의 벡터 수")
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--ef", default="32,64,128,256", help="추가로 비교할 hnsw_ef 값 (쉼표 구분)")
+    parser.add_argument("--out", default=None, help="결과 JSON 저장 경로")
+    main(parser.parse_args())
@@ -0,0 +1,293 @@
+# bench/run.py
+"""
+서비스 전체 벤치마크 (Qdrant 서버 / vLLM 없이 실행)
+
+임시 작업 디렉토리에서 아래 순서로 측정하고 결과를 JSON으로 저장합니다.
+1) 합성 문서 생성 (bench.corpus)
+2) 색인: indexer.run() 문서/초, 청크/초, 최대 RSS (자식 프로세스 포함)
+3) 검색: rag_service.build_context() p50/p99 (질의 임베딩 캐시를 비운 cold / 같은 질문 반복 warm)
+4) 채팅: 가짜 업스트림(bench.fake_upstream)을 띄우고 앱(main:app)을 같은 프로세스에서 실행한 뒤
+        /api/chat/ask 처리량을 동시성 레벨별로 측정 (bench.chat_load)
+
+Qdrant는 로컬 모드(QDRANT_PATH, 작업 디렉토리 안)로 실행합니다.
+임베딩 모델은 EMB_MODEL 환경 변수를 따르므로, 빠르게 돌리려면 작은 모델을 지정하세요.
+
+    python -m bench.run --docs 200 --queries 100 --concurrency 1,8,32 --out bench_results.json
+
+결과 JSON에는 git 커밋이 함께 기록되므로 커밋 사이의 회귀를 diff로 비교할 수 있습니다.
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except Exception:
+        return None
+
+
+# ---------------------------------------------------------
+# 최대 RSS 측정 (현재 프로세스 + 자식 프로세스 합계, 주기적 샘플링)
+# ---------------------------------------------------------
+class PeakRSS:
+    def __init__(self, interval: float = 0.05):
+        import psutil
+
+        self.proc = psutil.Process()
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+
+    def _sample(self) -> int:
+        total = self.proc.memory_info().rss
+        for child in self.proc.children(recursive=True):
+            try:
+                total += child.memory_info().rss
+            except Exception:
+                pass
+        return total
+
+    def _loop(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, self._sample())
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, self._sample())
+
+
+def _summary(latencies: list) -> dict:
+    from bench.chat_load import percentile
+
+    return {
+        "n": len(latencies),
+        "p50_ms": round(statistics.median(latencies), 2) if latencies else 0.0,
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "mean_ms": round(statistics.mean(latencies), 2) if latencies else 0.0,
+    }
+
+
+# ---------------------------------------------------------
+# 2) 색인
+# ---------------------------------------------------------
+def bench_ingest() -> dict:
+    from app.rag import indexer
+    from app.service import metrics
+
+    def docs_loaded() -> float:
+        return sum(v for _, _, v in metrics.INDEXER_DOCS.samples())
+
+    with PeakRSS() as rss:
+        started = time.perf_counter()
+        report = indexer.run()
+        elapsed = time.perf_counter() - started
+
+    docs = docs_loaded()
+    return {
+        "files": report["files"],
+        "documents": int(docs),
+        "chunks": report["chunks"],
+        "failures": len(report["failures"]),
+        "elapsed_sec": round(elapsed, 2),
+        "files_per_sec": round(report["files"] / elapsed, 2) if elapsed else 0.0,
+        "docs_per_sec": round(docs / elapsed, 2) if elapsed else 0.0,
+        "chunks_per_sec": round(report["chunks"] / elapsed, 2) if elapsed else 0.0,
+        "peak_rss_mb": round(rss.peak / 1024 ** 2, 1),
+    }
+
+
+# ---------------------------------------------------------
+# 3) 검색 + 컨텍스트 구성
+# ---------------------------------------------------------
+async def bench_build_context(questions: list) -> dict:
+    from app.service import rag_service
+
+    # 모델/클라이언트 준비 비용은 제외
+    await rag_service.build_context(questions[0])
+
+    cold = []
+    for q in questions:
+        rag_service._query_cache.clear()
+        started = time.perf_counter()
+        await rag_service.build_context(q)
+        cold.append((time.perf_counter() - started) * 1000)
+
+    warm = []
+    for q in questions:
+        started = time.perf_counter()
+        await rag_service.build_context(q)
+        warm.append((time.perf_counter() - started) * 1000)
+
+    return {"cold": _summary(cold), "warm": _summary(warm)}
+
+
+# ---------------------------------------------------------
+# 4) 채팅 처리량 (앱 + 가짜 업스트림)
+# ---------------------------------------------------------
+async def _wait_http(url: str, timeout: float = 30.0, ready_below: int = 500):
+    import httpx
+
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while True:
+            try:
+                if (await client.get(url)).status_code < ready_below:
+                    return
+            except httpx.HTTPError:
+                pass
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"{url} did not become ready")
+            await asyncio.sleep(0.1)
+
+
+async def bench_chat(app_port: int, levels: list, requests: int, questions: list) -> list:
+    import httpx
+    import uvicorn
+
+    from bench.chat_load import run_level
+    from main import app
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=app_port, log_level="warning"))
+    task = asyncio.create_task(server.serve())
+    try:
+        await _wait_http(f"http://127.0.0.1:{app_port}/readyz", ready_below=300)
+
+        results = []
+        limits = httpx.Limits(max_connections=max(levels), max_keepalive_connections=max(levels))
+        async with httpx.AsyncClient(timeout=120.0, limits=limits) as client:
+            url = f"http://127.0.0.1:{app_port}/api/chat/ask"
+            for c in levels:
+                res = await run_level(client, url, c, max(requests, c), questions)
+                print(
+                    f"[BENCH] chat concurrency={c:>3}  rps={res['rps']:>8}  "
+                    f"p50={res['p50_ms']:>8}ms  p99={res['p99_ms']:>8}ms  errors={res['errors']}"
+                )
+                results.append(res)
+        return results
+    finally:
+        server.should_exit = True
+        await task
+
+
+async def chat_phase(args, questions: list, upstream_port: int) -> list:
+    """가짜 업스트림을 띄운 뒤 앱 처리량 측정 (OPENAI_COMPAT_BASE_URL이 upstream_port를 가리켜야 함)"""
+    upstream = subprocess.Popen(
+        [
+            sys.executable, "-m", "bench.fake_upstream", "--port", str(upstream_port),
+            "--ttft-ms", str(args.ttft_ms), "--tokens-per-sec", str(args.tokens_per_sec),
+            "--tokens", str(args.tokens),
+        ],
+        cwd=REPO_ROOT,
+    )
+    try:
+        await _wait_http(f"http://127.0.0.1:{upstream_port}/v1/models")
+        levels = [int(c) for c in args.concurrency.split(",")]
+        return await bench_chat(_free_port(), levels, args.requests, questions)
+    finally:
+        upstream.terminate()
+        upstream.wait(timeout=10)
+
+
+async def _serve_phase(args, questions: list, upstream_port: int) -> dict:
+    result = {"build_context": await bench_build_context(questions[: args.queries])}
+    print(f"[BENCH] build_context {result['build_context']}")
+
+    if not args.skip_chat:
+        result["chat"] = await chat_phase(args, questions, upstream_port)
+    return result
+
+
+def setup_workdir(workdir: Path, upstream_port: int):
+    """
+    앱 모듈은 import 시점에 환경 변수를 읽고 data/ 디렉토리를 만들기 때문에
+    반드시 app / main import 전에 호출 (환경 변수 설정 + 작업 디렉토리로 이동)
+    정적 파일/템플릿은 main.py 기준 경로라 작업 디렉토리와 무관
+    """
+    workdir.mkdir(parents=True, exist_ok=True)
+    os.environ.setdefault("QDRANT_PATH", str(workdir / "qdrant"))
+    os.environ.setdefault("QDRANT_COLLECTION", "bench")
+    os.environ["OPENAI_COMPAT_BASE_URL"] = f"http://127.0.0.1:{upstream_port}/v1"
+    os.environ.setdefault("ANSWER_CACHE_ENABLED", "false")
+    os.environ.setdefault("STRICT_RAG", "false")
+    if str(REPO_ROOT) not in sys.path:
+        sys.path.insert(0, str(REPO_ROOT))
+    os.chdir(workdir)
+
+
+def main(args) -> dict:
+    workdir = Path(args.workdir or tempfile.mkdtemp(prefix="chat-bridge-bench-")).resolve()
+    upstream_port = _free_port()
+    setup_workdir(workdir, upstream_port)
+
+    from bench import corpus
+
+    generated = corpus.generate(workdir / "data" / "uploads", docs=args.docs, seed=args.seed)
+    print(f"[BENCH] workdir={workdir} corpus={len(generated['files'])} files ({generated['bytes']} bytes)")
+
+    results = {
+        "commit": _git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "params": vars(args),
+        "env": {k: os.environ.get(k) for k in (
+            "EMB_MODEL", "EMB_BATCH_SIZE", "EMB_WORKERS", "RAG_LOAD_WORKERS",
+            "RAG_SPARSE_ENABLED", "QDRANT_QUANTIZATION", "UPSTREAM_MAX_IN_FLIGHT",
+        )},
+        "corpus": {"files": len(generated["files"]), "bytes": generated["bytes"]},
+    }
+
+    results["ingest"] = bench_ingest()
+    print(f"[BENCH] ingest {results['ingest']}")
+
+    results.update(asyncio.run(_serve_phase(args, generated["questions"], upstream_port)))
+
+    if args.out:
+        out = Path(args.out)
+        if not out.is_absolute():
+            out = REPO_ROOT / out
+        out.write_text(json.dumps(results, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"[BENCH] Results written to {out}")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="End-to-end service benchmark (local Qdrant + fake upstream)")
+    parser.add_argument("--docs", type=int, default=100, help="합성 문서 수")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--queries", type=int, default=100, help="build_context 측정 질문 수")
+    parser.add_argument("--concurrency", default="1,8,32")
+    parser.add_argument("--requests", type=int, default=64, help="동시성 레벨별 /api/chat/ask 요청 수")
+    parser.add_argument("--ttft-ms", type=float, default=200.0, help="가짜 업스트림 첫 토큰 지연")
+    parser.add_argument("--tokens-per-sec", type=float, default=50.0, help="가짜 업스트림 토큰 생성 속도")
+    parser.add_argument("--tokens", type=int, default=64, help="가짜 업스트림 응답 토큰 수")
+    parser.add_argument("--skip-chat", action="store_true", help="채팅 처리량 측정 생략")
+    parser.add_argument("--workdir", default=None, help="작업 디렉토리 (기본: 임시 디렉토리)")
+    parser.add_argument("--out", default=None, help="결과 JSON 저장 경로 (상대 경로는 저장소 기준)")
+    main(parser.parse_args())
@@ -1,8 +1,10 @@
 from dotenv import load_dotenv
 load_dotenv()
 
-from pathlib import Path
+import asyncio
+from contextlib import asynccontextmanager
 from datetime import datetime
+from pathlib import Path
 
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
@@ -10,12 +12,32 @@ from fastapi.responses import HTMLResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 
+from app.api.health import router as health_router
 from app.api.system import router as system_router
 from app.api.routes import router as chat_router
 from app.api.upload import router as upload_router
+from app.api.metrics import router as metrics_router
+from app.rag import catalog
+from app.service import startup
+from app.service.chat_service import init_client, close_client
+from app.service.system_service import sampler
+
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # vLLM 업스트림 HTTP 클라이언트 (앱 수명 동안 커넥션 재사용)
+    await init_client()
+    # 시스템 정보 백그라운드 수집기 (/api/system/info는 스냅샷만 읽음)
+    sampler.start()
+    # 임베딩 모델 / tokenizer / Qdrant 워밍업 (백그라운드, 끝나면 /readyz 200)
+    startup.start()
+    yield
+    await startup.stop()
+    sampler.stop()
+    await close_client()
 
-app = FastAPI(title="Chat Bridge Admin")
+
+app = FastAPI(title="Chat Bridge Admin", lifespan=lifespan)
 
 # CORS 설정
 app.add_middleware(
@@ -24,15 +46,13 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# 첫 답변 요청(ask / ask-stream / ask-batch) 지연 시간 로그
+app.add_middleware(startup.FirstRequestLogger)
 
-# 정적 리소스 및 템플릿 경로
-app.mount("/static", StaticFiles(directory="static"), name="static")
-templates = Jinja2Templates(directory="templates")
-
-# 업로드 디렉토리 설정
-UPLOAD_DIR = Path("data/uploads")
-UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
-
+# 정적 리소스 및 템플릿 경로 (실행 위치와 무관하게 main.py 기준)
+BASE_DIR = Path(__file__).resolve().parent
+app.mount("/static", StaticFiles(directory=BASE_DIR / "static"), name="static")
+templates = Jinja2Templates(directory=BASE_DIR / "templates")
 
 @app.get("/", response_class=HTMLResponse)
 async def dashboard(request: Request):
@@ -51,20 +71,31 @@ async def chat_page(request: Request):
 
 
 @app.get("/upload", response_class=HTMLResponse)
-async def upload_page(request: Request):
-    # 파일 목록 읽기
-    files = []
-    for file_path in UPLOAD_DIR.glob("*"):
-        if file_path.is_file():
-            files.append(
-                {
-                    "name": file_path.name,
-                    "uploaded_at": datetime.fromtimestamp(
-                        file_path.stat().st_mtime
-                    ).strftime("%Y-%m-%d %H:%M:%S"),
-                    "status": "업로드됨",
-                }
-            )
+async def upload_page(
+    request: Request,
+    page: int = 1,
+    page_size: int = 50,
+    sort: str = "uploaded_at",
+    order: str = "desc",
+):
+    # 문서 카탈로그에서 현재 페이지만 조회 (디렉토리를 훑지 않음)
+    if sort not in catalog.SORT_COLUMNS:
+        sort = "uploaded_at"
+    result = await asyncio.to_thread(
+        catalog.list_documents, page=page, page_size=page_size, sort=sort, order=order
+    )
+
+    files = [
+        {
+            "name": d["source_id"],
+            "uploaded_at": datetime.fromtimestamp(d["uploaded_at"]).strftime("%Y-%m-%d %H:%M:%S"),
+            "status": d["status_label"],
+            "status_code": d["status"],
+            "chunks": d["chunks"],
+            "error": d["error"],
+        }
+        for d in result["items"]
+    ]
 
     return templates.TemplateResponse(
         "upload.html",
@@ -72,12 +103,19 @@ async def upload_page(request: Request):
             "request": request,
             "title": "임베딩 파일 업로드",
             "files": files,
-            "count": len(files),
+            "count": result["total"],
+            "page": result["page"],
+            "pages": result["pages"],
+            "page_size": result["page_size"],
+            "sort": result["sort"],
+            "order": result["order"],
         },
     )
 
 
 # API 라우터 등록
+app.include_router(health_router)
 app.include_router(system_router)
 app.include_router(chat_router)
-app.include_router(upload_router)
\ No newline at end of file
+app.include_router(upload_router)
+app.include_router(metrics_router)
\ No newline at end of file
@@ -0,0 +1,114 @@
+# scripts/ask_batch.py
+"""
+JSONL 질문 파일 → /api/chat/ask-batch → JSONL 결과 파일
+
+입력: 한 줄에 질문 1개
+    {"id": "q-1", "message": "제품 보증 기간은?"}   (question 키도 허용, id 생략 시 줄 번호)
+    "제품 보증 기간은?"
+출력: 질문별 결과 1줄 (끝나는 순서대로, id/index는 입력 기준)
+    {"index": 0, "id": "q-1", "ok": true, "answer": "...", "sources": [...], ...}
+
+질문은 --chunk개씩 나눠 요청하며, 실패한 질문도 ok=false로 기록됩니다.
+
+    python -m scripts.ask_batch --url http://localhost:8000 --in questions.jsonl --out answers.jsonl
+    cat questions.jsonl | python -m scripts.ask_batch --in - --out - --concurrency 4
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+
+import httpx
+
+
+def read_items(path: str) -> list:
+    f = sys.stdin if path == "-" else open(path, encoding="utf-8")
+    try:
+        items = []
+        for n, line in enumerate(f):
+            line = line.strip()
+            if not line:
+                continue
+            row = json.loads(line)
+            if isinstance(row, dict):
+                items.append({"id": row.get("id", n), "message": row.get("message") or row.get("question") or ""})
+            else:
+                items.append({"id": n, "message": str(row)})
+        return items
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+async def run(url: str, items: list, out, chunk: int, concurrency: int | None, client_id: str | None) -> dict:
+    summary = {"total": len(items), "ok": 0, "errors": 0}
+    headers = {"X-Client-Id": client_id} if client_id else {}
+    body_extra = {"concurrency": concurrency} if concurrency else {}
+
+    async with httpx.AsyncClient(timeout=httpx.Timeout(None, connect=10.0)) as client:
+        for start in range(0, len(items), chunk):
+            part = items[start:start + chunk]
+            received = set()
+            try:
+                async with client.stream(
+                    "POST", url, json={"items": part, **body_extra}, headers=headers
+                ) as r:
+                    if r.status_code >= 400:
+                        raise httpx.HTTPStatusError(
+                            f"HTTP {r.status_code}: {(await r.aread()).decode(errors='replace')}",
+                            request=r.request, response=r,
+                        )
+                    async for line in r.aiter_lines():
+                        if not line:
+                            continue
+                        res = json.loads(line)
+                        if res.get("done"):
+                            continue
+                        # 서버의 index는 요청(chunk) 안의 위치 → 입력 파일 기준으로 변환
+                        received.add(res["index"])
+                        res["index"] += start
+                        summary["ok" if res["ok"] else "errors"] += 1
+                        out.write(json.dumps(res, ensure_ascii=False) + "\n")
+            except httpx.HTTPError as e:
+                # 요청 실패 (스트림 도중 끊김 포함) → 아직 결과를 받지 못한 질문만 실패로 기록
+                print(f"[BATCH] Request failed for items {start}-{start + len(part) - 1}: {e}", file=sys.stderr)
+                for i, item in enumerate(part):
+                    if i in received:
+                        continue
+                    summary["errors"] += 1
+                    out.write(json.dumps(
+                        {"index": start + i, "id": item["id"], "ok": False, "status": None, "error": str(e)},
+                        ensure_ascii=False,
+                    ) + "\n")
+            out.flush()
+            print(f"[BATCH] {min(start + chunk, len(items))}/{len(items)} done", file=sys.stderr)
+    return summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Answer a JSONL file of questions through /api/chat/ask-batch")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--in", dest="input", required=True, help="질문 JSONL 파일 (-: stdin)")
+    parser.add_argument("--out", default="-", help="결과 JSONL 파일 (-: stdout)")
+    parser.add_argument("--chunk", type=int, default=500, help="요청 1번에 보낼 질문 수")
+    parser.add_argument("--concurrency", type=int, default=None, help="동시 LLM 호출 수 (서버 상한 이하)")
+    parser.add_argument("--client-id", default="batch", help="X-Client-Id (대기열에서 대화형 사용자와 구분)")
+    args = parser.parse_args()
+
+    items = read_items(args.input)
+    out = sys.stdout if args.out == "-" else open(args.out, "w", encoding="utf-8")
+    started = time.perf_counter()
+    try:
+        summary = asyncio.run(run(
+            f"{args.url.rstrip('/')}/api/chat/ask-batch", items, out, args.chunk, args.concurrency, args.client_id
+        ))
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    elapsed = time.perf_counter() - started
+    print(
+        f"[BATCH] {summary['total']} questions: {summary['ok']} ok, {summary['errors']} errors "
+        f"in {elapsed:.1f}s ({summary['total'] / elapsed:.2f} q/s)",
+        file=sys.stderr,
+    )
@@ -90,23 +90,56 @@ document.addEventListener("DOMContentLoaded", () => {
         scrollToBottom();
     }
 
-    // 스트리밍(타자 효과)처럼 보이게 출력
-    function streamAssistantText(element, text, speed = 25) {
+    // 토큰 단위로 이어 붙이기 (첫 토큰에서 로딩 점 제거)
+    function appendAssistantText(element, text) {
         const body = element.querySelector(".chat-message-body");
         if (!body) return;
 
-        body.textContent = ""; // 로딩 점 제거
-        let index = 0;
+        if (!element.dataset.started) {
+            body.textContent = "";
+            element.dataset.started = "1";
+        }
+        body.textContent += text;
+        scrollToBottom();
+    }
 
-        const timer = setInterval(() => {
-            body.textContent += text.charAt(index);
-            index += 1;
-            scrollToBottom();
+    // 답변 아래에 출처 표시
+    function setAssistantSources(element, sources) {
+        if (!sources || !sources.length) return;
+        const bubble = element.querySelector(".chat-bubble");
+        if (!bubble) return;
+
+        const el = document.createElement("div");
+        el.classList.add("chat-message-sources");
+        el.textContent = "출처: " + [...new Set(sources)].join(", ");
+        bubble.appendChild(el);
+    }
 
-            if (index >= text.length) {
-                clearInterval(timer);
+    // SSE 응답 본문을 읽어서 이벤트(event, data) 단위로 콜백 호출
+    async function readEventStream(res, onEvent) {
+        const reader = res.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = "";
+
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+
+            let idx;
+            while ((idx = buffer.indexOf("\n\n")) >= 0) {
+                const raw = buffer.slice(0, idx);
+                buffer = buffer.slice(idx + 2);
+
+                let event = "message";
+                let data = "";
+                for (const line of raw.split("\n")) {
+                    if (line.startsWith("event:")) event = line.slice(6).trim();
+                    else if (line.startsWith("data:")) data += line.slice(5).trim();
+                }
+                if (data) onEvent(event, JSON.parse(data));
             }
-        }, speed);
+        }
     }
 
     async function send() {
@@ -125,23 +158,39 @@ document.addEventListener("DOMContentLoaded", () => {
         const loadingEl = addAssistantLoading();
 
         try {
-            const res = await fetch("/api/chat/ask", {
+            const res = await fetch("/api/chat/ask-stream", {
                 method: "POST",
                 headers: { "Content-Type": "application/json" },
                 body: JSON.stringify({ message }),
             });
 
-            const data = await res.json();
-
-            if (!res.ok || !data.ok) {
+            // 스트림 시작 전 오류는 일반 JSON 응답
+            if (!res.ok) {
+                const data = await res.json().catch(() => ({}));
                 const errorText = data.error || `요청 실패 (status ${res.status})`;
                 setAssistantText(loadingEl, errorText);
                 return;
             }
 
-            const answer = data.answer || "(응답이 없습니다.)";
-            // 여기서부터 스트리밍처럼 표시
-            streamAssistantText(loadingEl, answer);
+            let sources = [];
+            let received = false;
+
+            await readEventStream(res, (event, data) => {
+                if (event === "sources") {
+                    sources = data.sources || [];
+                } else if (event === "token") {
+                    received = true;
+                    appendAssistantText(loadingEl, data.text);
+                } else if (event === "error") {
+                    received = true;
+                    setAssistantText(loadingEl, data.error || `요청 실패 (status ${data.status})`);
+                }
+            });
+
+            if (!received) {
+                setAssistantText(loadingEl, "(응답이 없습니다.)");
+            }
+            setAssistantSources(loadingEl, sources);
         } catch (err) {
             console.error(err);
             setAssistantText(loadingEl, "요청 중 오류가 발생했습니다.");
@@ -1,14 +1,8 @@
 // static/js/system_chart.js
 
-async function fetchSystemInfo() {
+// 스냅샷 1개를 화면에 반영 (WebSocket push / 폴링 공통)
+function renderSystemInfo(data) {
     try {
-        const res = await fetch("/api/system/info");
-        if (!res.ok) {
-            console.error("Failed to fetch system info:", res.status);
-            return;
-        }
-        const data = await res.json();
-
         // ----- CPU -----
         const cpu = data.cpu_percent ?? 0;
         const cpuOverall = document.getElementById("cpu-overall");
@@ -104,11 +98,130 @@ async function fetchSystemInfo() {
             }
         }
 
+        // ----- 최근 기록 차트 -----
+        appendHistory(data);
+
+    } catch (err) {
+        console.error("system info error:", err);
+    }
+}
+
+async function fetchSystemInfo() {
+    try {
+        const res = await fetch("/api/system/info");
+        if (!res.ok) {
+            console.error("Failed to fetch system info:", res.status);
+            return;
+        }
+        renderSystemInfo(await res.json());
     } catch (err) {
         console.error("system info error:", err);
     }
 }
 
-// 첫 로드 + 2초마다 갱신 (너무 자주 호출하면 서버 부하)
-fetchSystemInfo();
-setInterval(fetchSystemInfo, 2000);
+// ---------------------------------------------------------
+// 최근 10분 CPU / 메모리 차트 (/api/system/history + push 샘플 누적)
+// ---------------------------------------------------------
+const HISTORY_WINDOW_SEC = 600;
+const history = { ts: [], cpu: [], mem: [] };
+
+function appendHistory(data) {
+    if (data.sampled_at == null) return;
+    const last = history.ts[history.ts.length - 1];
+    if (last != null && data.sampled_at <= last) return;
+
+    history.ts.push(data.sampled_at);
+    history.cpu.push(data.cpu_percent ?? null);
+    history.mem.push((data.memory || {}).percent ?? null);
+
+    const cutoff = data.sampled_at - HISTORY_WINDOW_SEC;
+    while (history.ts.length && history.ts[0] < cutoff) {
+        history.ts.shift();
+        history.cpu.shift();
+        history.mem.shift();
+    }
+    drawHistory();
+}
+
+function drawHistory() {
+    const canvas = document.getElementById("history-chart");
+    if (!canvas) return;
+
+    const ctx = canvas.getContext("2d");
+    const width = canvas.width = canvas.clientWidth;
+    const height = canvas.height = canvas.clientHeight;
+    ctx.clearRect(0, 0, width, height);
+
+    const n = history.ts.length;
+    if (n < 2) return;
+    const t0 = history.ts[n - 1] - HISTORY_WINDOW_SEC;
+
+    const line = (values, color) => {
+        ctx.beginPath();
+        ctx.strokeStyle = color;
+        ctx.lineWidth = 1.5;
+        let moved = false;
+        for (let i = 0; i < n; i++) {
+            if (values[i] == null) continue;
+            const x = (history.ts[i] - t0) / HISTORY_WINDOW_SEC * width;
+            const y = height - Math.min(values[i], 100) / 100 * height;
+            if (moved) ctx.lineTo(x, y); else ctx.moveTo(x, y);
+            moved = true;
+        }
+        ctx.stroke();
+    };
+    line(history.cpu, "#4f8cff");
+    line(history.mem, "#2ecc71");
+}
+
+async function loadHistory() {
+    try {
+        // 가장 촘촘한 단계 (간격은 수집 주기에 따라 다름)
+        const res = await fetch("/api/system/history");
+        if (!res.ok) return;
+        const data = await res.json();
+        history.ts = data.ts || [];
+        history.cpu = data.cpu || [];
+        history.mem = data.mem || [];
+        drawHistory();
+    } catch (err) {
+        console.error("system history error:", err);
+    }
+}
+
+// ---------------------------------------------------------
+// WebSocket으로 push 받기 (끊기면 2초 폴링으로 대체 후 재연결 시도)
+// ---------------------------------------------------------
+let pollTimer = null;
+
+function startPolling() {
+    if (pollTimer) return;
+    fetchSystemInfo();
+    pollTimer = setInterval(fetchSystemInfo, 2000);
+}
+
+function stopPolling() {
+    if (!pollTimer) return;
+    clearInterval(pollTimer);
+    pollTimer = null;
+}
+
+function connectSystemSocket() {
+    const proto = location.protocol === "https:" ? "wss" : "ws";
+    const ws = new WebSocket(`${proto}://${location.host}/api/system/ws`);
+
+    ws.onopen = () => stopPolling();
+    ws.onmessage = (e) => renderSystemInfo(JSON.parse(e.data));
+    ws.onclose = () => {
+        startPolling();
+        setTimeout(connectSystemSocket, 5000);
+    };
+}
+
+loadHistory().then(() => {
+    if ("WebSocket" in window) {
+        connectSystemSocket();
+    } else {
+        startPolling();
+    }
+});
@@ -12,33 +12,139 @@ document.addEventListener("DOMContentLoaded", () => {
         fileInput.click();
     });
 
-    // 2) 파일 선택되면 바로 업로드
-    fileInput.addEventListener("change", async () => {
-        const file = fileInput.files[0];
-        if (!file) return;
+    // 분할 업로드 설정 (파트 크기보다 큰 파일은 세션 업로드로 전송)
+    const PART_SIZE = 8 * 1024 * 1024;
+    const PART_CONCURRENCY = 4;
+    const PART_RETRIES = 3;
 
+    async function fetchJson(url, options) {
+        const res = await fetch(url, options);
+        const data = await res.json().catch(() => ({}));
+        if (!res.ok || !data.ok) {
+            const detail = data.detail && data.detail.message ? data.detail.message : data.detail;
+            throw new Error(detail || data.error || `요청 실패 (${res.status})`);
+        }
+        return data;
+    }
+
+    // 작은 파일: 한 번의 multipart 요청
+    // 일부 파일만 실패하면 207 (files: 저장됨, failed: 실패) → 저장된 파일은 그대로 두고 실패 목록 반환
+    async function uploadForm(files) {
         const formData = new FormData();
-        formData.append("file", file);
+        files.forEach(file => formData.append("files", file));
+        const res = await fetch("/api/rag/upload", {
+            method: "POST",
+            body: formData,
+        });
+        const data = await res.json().catch(() => ({}));
+        if (res.status === 207) {
+            return { saved: data.files || [], failed: data.failed || [] };
+        }
+        if (!res.ok || !data.ok) {
+            const detail = data.detail && data.detail.message ? data.detail.message : data.detail;
+            throw new Error(detail || data.error || `요청 실패 (${res.status})`);
+        }
+        return { saved: data.files || [], failed: [] };
+    }
+
+    // 재개용 세션 키 (같은 파일을 다시 고르면 이어서 전송)
+    function sessionKey(file) {
+        return `rag-upload:${file.name}:${file.size}:${file.lastModified}`;
+    }
+
+    async function openSession(file) {
+        const key = sessionKey(file);
+        const saved = localStorage.getItem(key);
+        if (saved) {
+            try {
+                return await fetchJson(`/api/rag/uploads/${encodeURIComponent(saved)}`);
+            } catch (e) {
+                localStorage.removeItem(key);   // 만료/삭제된 세션 → 새로 시작
+            }
+        }
+        const session = await fetchJson("/api/rag/uploads", {
+            method: "POST",
+            headers: { "Content-Type": "application/json" },
+            body: JSON.stringify({ filename: file.name, size: file.size, part_size: PART_SIZE }),
+        });
+        localStorage.setItem(key, session.session_id);
+        return { ...session, received: [] };
+    }
+
+    async function putPart(sessionId, file, partSize, n) {
+        const blob = file.slice((n - 1) * partSize, Math.min(n * partSize, file.size));
+        for (let attempt = 1; ; attempt++) {
+            try {
+                return await fetchJson(`/api/rag/uploads/${sessionId}/parts/${n}`, {
+                    method: "PUT",
+                    headers: { "Content-Type": "application/octet-stream" },
+                    body: blob,
+                });
+            } catch (e) {
+                if (attempt >= PART_RETRIES) throw e;
+                await new Promise(resolve => setTimeout(resolve, 1000 * attempt));
+            }
+        }
+    }
+
+    // 큰 파일: 파트로 잘라 동시에 전송 → 서버에서 조립
+    async function uploadInParts(file, onProgress) {
+        const session = await openSession(file);
+        const received = new Set(session.received || []);
+        const pending = [];
+        for (let n = 1; n <= session.total_parts; n++) {
+            if (!received.has(n)) pending.push(n);
+        }
+
+        let done = received.size;
+        onProgress(done, session.total_parts);
+
+        const worker = async () => {
+            while (pending.length) {
+                const n = pending.shift();
+                await putPart(session.session_id, file, session.part_size, n);
+                onProgress(++done, session.total_parts);
+            }
+        };
+        await Promise.all(Array.from({ length: PART_CONCURRENCY }, worker));
+
+        const saved = await fetchJson(`/api/rag/uploads/${session.session_id}/complete`, {
+            method: "POST",
+        });
+        localStorage.removeItem(sessionKey(file));
+        return saved;
+    }
+
+    // 2) 파일 선택되면 바로 업로드 (여러 개 선택 가능)
+    fileInput.addEventListener("change", async () => {
+        const files = Array.from(fileInput.files);
+        if (!files.length) return;
 
         addBtn.disabled = true;
         addBtn.textContent = "업로드 중...";
 
         try {
-            const res = await fetch("/api/rag/upload", {
-                method: "POST",
-                body: formData,
-            });
-            const data = await res.json();
-
-            if (res.ok && data.ok) {
-                alert(`업로드 완료: ${data.filename}`);
-                location.reload();
+            const small = files.filter(f => f.size <= PART_SIZE);
+            const large = files.filter(f => f.size > PART_SIZE);
+            const { saved, failed } = small.length ? await uploadForm(small) : { saved: [], failed: [] };
+
+            for (const file of large) {
+                saved.push(await uploadInParts(file, (done, total) => {
+                    addBtn.textContent = `${file.name} ${Math.floor(done / total * 100)}%`;
+                }));
+            }
+
+            const names = saved.map(f => f.filename);
+            if (failed.length) {
+                const errors = failed.map(f => `${f.filename}: ${f.error && f.error.message ? f.error.message : f.error}`);
+                alert(`업로드 완료 (${names.length}개)\n${names.join("\n")}\n\n실패 (${failed.length}개)\n${errors.join("\n")}`);
             } else {
-                alert(data.detail || data.error || "업로드 실패");
+                alert(`업로드 완료 (${names.length}개)\n${names.join("\n")}`);
             }
+            location.reload();
         } catch (e) {
             console.error(e);
-            alert("업로드 중 오류가 발생했습니다.");
+            alert(`업로드 중 오류가 발생했습니다.\n${e.message}\n같은 파일을 다시 선택하면 이어서 업로드합니다.`);
         } finally {
             addBtn.disabled = false;
             addBtn.textContent = "＋";
@@ -46,6 +152,36 @@ document.addEventListener("DOMContentLoaded", () => {
         }
     });
 
+    // 색인 작업 진행 상황 표시
+    function renderJobProgress(job) {
+        const text = overlay.querySelector("p");
+        if (!text) return;
+
+        const files = Object.values(job.files || {});
+        const done = files.filter(f => f.stage === "done" || f.stage === "failed").length;
+        text.textContent =
+            `임베딩 중입니다... (${done}/${files.length} 파일, ` +
+            `${job.chunks_done} 청크, ${job.chunks_per_sec} 청크/초)`;
+    }
+
+    // 완료될 때까지 작업 상태 폴링
+    async function waitForJob(jobId, interval = 1000) {
+        while (true) {
+            const res = await fetch(`/api/rag/jobs/${encodeURIComponent(jobId)}`);
+            const job = await res.json();
+
+            if (!res.ok || !job.ok) {
+                throw new Error(job.detail || job.error || "작업 상태 조회 실패");
+            }
+
+            renderJobProgress(job);
+            if (job.status === "succeeded" || job.status === "failed") {
+                return job;
+            }
+            await new Promise(resolve => setTimeout(resolve, interval));
+        }
+    }
+
     // 전체 임베딩 버튼
     if (embedAllBtn) {
         embedAllBtn.addEventListener("click", async () => {
@@ -61,12 +197,24 @@ document.addEventListener("DOMContentLoaded", () => {
                 });
                 const data = await res.json();
 
-                if (res.ok && data.ok) {
+                if (!res.ok || !data.ok) {
+                    alert(data.detail || data.error || "임베딩 실패");
+                    return;
+                }
+
+                const job = await waitForJob(data.job_id);
+                const failed = Object.entries(job.files || {})
+                    .filter(([, f]) => f.stage === "failed")
+                    .map(([name, f]) => `${name}: ${f.error}`);
+
+                if (job.status === "succeeded" && !failed.length) {
                     alert("임베딩이 완료되었습니다.");
-                    location.reload();
+                } else if (job.status === "succeeded") {
+                    alert(`임베딩이 완료되었습니다. 일부 파일은 실패했습니다.\n${failed.join("\n")}`);
                 } else {
-                    alert(data.detail || data.error || "임베딩 실패");
+                    alert(job.error || "임베딩 실패");
                 }
+                location.reload();
             } catch (err) {
                 console.error(err);
                 alert("임베딩 중 오류가 발생했습니다.");
@@ -78,7 +226,7 @@ document.addEventListener("DOMContentLoaded", () => {
         });
     }
 
-    // 삭제 버튼
+    // 삭제 / 재색인 버튼
     tableBody.addEventListener("click", async (e) => {
         const btn = e.target.closest("button[data-action]");
         if (!btn) return;
@@ -87,26 +235,38 @@ document.addEventListener("DOMContentLoaded", () => {
         const filename = btn.dataset.filename;
         if (!filename) return;
 
+        // source_id는 하위 경로를 포함할 수 있으므로 구간별로 인코딩
+        const docPath = filename.split("/").map(encodeURIComponent).join("/");
+
         if (action === "delete") {
-            const ok = confirm(`정말 삭제하시겠습니까?\n${filename}`);
+            const ok = confirm(`정말 삭제하시겠습니까?\n색인된 내용도 함께 삭제됩니다.\n${filename}`);
             if (!ok) return;
 
             try {
-                const res = await fetch(
-                    `/api/rag/file/${encodeURIComponent(filename)}`,
-                    { method: "DELETE" }
-                );
-                const data = await res.json();
+                await fetchJson(`/api/rag/documents/${docPath}`, { method: "DELETE" });
+                alert("삭제되었습니다.");
+                location.reload();
+            } catch (err) {
+                console.error(err);
+                alert(err.message || "삭제 중 오류가 발생했습니다.");
+            }
+        }
 
-                if (res.ok && data.ok) {
-                    alert("삭제되었습니다.");
-                    location.reload();
-                } else {
-                    alert(data.detail || data.error || "삭제 실패");
-                }
+        if (action === "reindex") {
+            const ok = confirm(`이 문서를 다시 임베딩하시겠습니까?\n${filename}`);
+            if (!ok) return;
+
+            overlay.style.display = "flex";
+            try {
+                const data = await fetchJson(`/api/rag/documents/${docPath}/reindex`, { method: "POST" });
+                const job = await waitForJob(data.job_id);
+                alert(job.status === "succeeded" ? "재색인이 완료되었습니다." : (job.error || "재색인 실패"));
+                location.reload();
             } catch (err) {
                 console.error(err);
-                alert("삭제 중 오류가 발생했습니다.");
+                alert(err.message || "재색인 중 오류가 발생했습니다.");
+            } finally {
+                overlay.style.display = "none";
             }
         }
     });
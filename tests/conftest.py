@@ -0,0 +1,7 @@
+import sys
+from pathlib import Path
+
+# 저장소 루트에서 app / bench / scripts / main 을 import 할 수 있도록
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
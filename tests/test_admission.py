@@ -0,0 +1,160 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+from app.service.admission import Admission, AdmissionRejected, coalesce, request_key
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+async def _hold(adm: Admission, client: str, release: asyncio.Event, order: list):
+    async with adm.slot(client):
+        order.append(client)
+        await release.wait()
+
+
+async def _settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_noisy_client_cannot_starve_quiet_client():
+    async def scenario():
+        adm = Admission(max_in_flight=1, max_queue=8, queue_timeout=5, max_queue_per_client=3)
+        release, order = asyncio.Event(), []
+
+        holder = asyncio.create_task(_hold(adm, "noisy", release, order))
+        await _settle()
+
+        # noisy는 자기 몫(3개)까지만 줄을 서고 나머지는 바로 429
+        noisy = [asyncio.create_task(_hold(adm, "noisy", release, order)) for _ in range(6)]
+        await _settle()
+        rejected = [t for t in noisy if t.done()]
+        assert len(rejected) == 3
+        for t in rejected:
+            assert isinstance(t.exception(), AdmissionRejected)
+            assert t.exception().status_code == 429
+
+        # 전체 대기열에는 자리가 남아 있으므로 quiet는 줄을 설 수 있음
+        adm.check("quiet")
+        quiet = asyncio.create_task(_hold(adm, "quiet", release, order))
+        await _settle()
+        assert not quiet.done()
+
+        # 라운드 로빈: noisy 대기가 남아 있어도 quiet가 바로 다음 차례
+        release.set()
+        await asyncio.gather(holder, quiet, *[t for t in noisy if t not in rejected])
+        assert order[:3] == ["noisy", "noisy", "quiet"]
+        assert adm.stats()["in_flight"] == 0 and adm.stats()["queued"] == 0
+
+    run(scenario())
+
+
+def test_round_robin_across_clients():
+    async def scenario():
+        adm = Admission(max_in_flight=1, max_queue=16, queue_timeout=5, max_queue_per_client=16)
+        release, order = asyncio.Event(), []
+
+        first = asyncio.create_task(_hold(adm, "a", release, order))
+        await _settle()
+        tasks = [asyncio.create_task(_hold(adm, c, release, order)) for c in ["a", "a", "a", "b", "b", "c"]]
+        await _settle()
+        assert adm.stats()["queued"] == 6
+
+        release.set()
+        await asyncio.gather(first, *tasks)
+        assert order == ["a", "a", "b", "c", "a", "b", "a"]
+
+    run(scenario())
+
+
+def test_queue_full_returns_429_with_retry_after():
+    async def scenario():
+        adm = Admission(max_in_flight=1, max_queue=1, queue_timeout=5, max_queue_per_client=1)
+        release, order = asyncio.Event(), []
+        holder = asyncio.create_task(_hold(adm, "a", release, order))
+        await _settle()
+        waiter = asyncio.create_task(_hold(adm, "b", release, order))
+        await _settle()
+
+        with pytest.raises(AdmissionRejected) as e:
+            adm.check("c")
+        assert e.value.status_code == 429
+        assert int(e.value.headers["Retry-After"]) >= 1
+
+        release.set()
+        await asyncio.gather(holder, waiter)
+
+    run(scenario())
+
+
+def test_queue_timeout_returns_503_and_frees_queue():
+    async def scenario():
+        adm = Admission(max_in_flight=1, max_queue=4, queue_timeout=0.05, max_queue_per_client=4)
+        release, order = asyncio.Event(), []
+        holder = asyncio.create_task(_hold(adm, "a", release, order))
+        await _settle()
+
+        with pytest.raises(AdmissionRejected) as e:
+            async with adm.slot("b"):
+                pass
+        assert e.value.status_code == 503
+        assert "Retry-After" in e.value.headers
+        assert adm.stats()["queued"] == 0
+
+        release.set()
+        await holder
+        assert adm.stats()["in_flight"] == 0
+
+    run(scenario())
+
+
+def test_cancelled_waiter_is_removed_from_queue():
+    async def scenario():
+        adm = Admission(max_in_flight=1, max_queue=4, queue_timeout=5, max_queue_per_client=4)
+        release, order = asyncio.Event(), []
+        holder = asyncio.create_task(_hold(adm, "a", release, order))
+        await _settle()
+
+        waiter = asyncio.create_task(_hold(adm, "b", release, order))
+        await _settle()
+        assert adm.stats()["queued"] == 1
+
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        assert adm.stats()["queued"] == 0
+        assert adm.stats()["clients_waiting"] == 0
+
+        release.set()
+        await holder
+        assert adm.stats()["in_flight"] == 0
+        assert order == ["a"]
+
+    run(scenario())
+
+
+def test_coalesce_shares_one_call():
+    async def scenario():
+        calls = 0
+
+        async def call():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return {"answer": "ok"}
+
+        key = request_key(message="q", system=None, temperature=0.7, max_tokens=16)
+        results = await asyncio.gather(*(coalesce(key, call) for _ in range(5)))
+        assert calls == 1
+        assert [r for r, _ in results] == [{"answer": "ok"}] * 5
+        assert sorted(c for _, c in results) == [False, True, True, True, True]
+
+        # 끝난 뒤에는 새로 호출
+        await coalesce(key, call)
+        assert calls == 2
+
+    run(scenario())
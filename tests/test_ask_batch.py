@@ -0,0 +1,100 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("qdrant_client")
+
+from app.api import routes
+
+
+def _ask_batch(payload: dict) -> list:
+    async def collect():
+        request = SimpleNamespace(headers={"x-client-id": "test"}, client=None)
+        resp = await routes.ask_batch(payload, request)
+        return [json.loads(line) async for line in resp.body_iterator if line.strip()]
+
+    # 스트림이 멈추면 실패 (무한 대기 방지)
+    return asyncio.run(asyncio.wait_for(collect(), timeout=10))
+
+
+@pytest.fixture
+def fake_rag(monkeypatch):
+    """임베딩/검색/vLLM 호출을 가짜로 대체 (질문 "fail"은 업스트림 오류)"""
+    async def embed_queries(messages):
+        return [[0.0] for _ in messages]
+
+    async def build_contexts(messages, vectors):
+        return [("context", ["manual.txt"], True) for _ in messages]
+
+    async def lookup_answer(vector, params):
+        return None
+
+    async def ask_upstream(message, **kwargs):
+        if "fail" in message:
+            raise RuntimeError("upstream down")
+        return {"answer": "ok", "timing": {}}
+
+    monkeypatch.setattr(routes, "embed_queries", embed_queries)
+    monkeypatch.setattr(routes, "build_contexts", build_contexts)
+    monkeypatch.setattr(routes, "lookup_answer", lookup_answer)
+    monkeypatch.setattr(routes, "store_answer", lambda *a, **k: None)
+    monkeypatch.setattr(routes, "ask_upstream", ask_upstream)
+    monkeypatch.setattr(routes, "STRICT_RAG", False)
+
+
+def test_item_errors_are_reported_per_line(fake_rag):
+    lines = _ask_batch({"items": ["질문 1", "", "fail", {"id": "q-4", "message": "질문 4"}]})
+
+    done = lines[-1]
+    results = {r["index"]: r for r in lines[:-1]}
+    assert sorted(results) == [0, 1, 2, 3]
+
+    # 실패한 질문만 ok=false, 나머지는 정상 답변
+    assert results[0]["ok"] and results[0]["answer"] == "ok"
+    assert results[3]["ok"] and results[3]["id"] == "q-4"
+    assert results[1] == {"index": 1, "id": 1, "ok": False, "status": 400, "error": "message is required"}
+    assert not results[2]["ok"] and results[2]["status"] == 500
+    assert "upstream down" in results[2]["error"]
+
+    assert done["done"] and done["total"] == 4
+    assert done["ok"] == 2 and done["errors"] == 2
+
+
+def test_retrieval_error_fails_only_its_group(fake_rag, monkeypatch):
+    async def build_contexts(messages, vectors):
+        if "broken" in messages:
+            raise RuntimeError("qdrant down")
+        return [("context", ["manual.txt"], True) for _ in messages]
+
+    monkeypatch.setattr(routes, "build_contexts", build_contexts)
+    monkeypatch.setattr(routes, "ASK_BATCH_SIZE", 2)
+
+    lines = _ask_batch({"items": ["질문 1", "broken", "질문 3"]})
+    results = {r["index"]: r for r in lines[:-1]}
+
+    assert [results[i]["ok"] for i in range(3)] == [False, False, True]
+    assert results[0]["status"] == 500 and "qdrant down" in results[0]["error"]
+    assert lines[-1]["ok"] == 1 and lines[-1]["errors"] == 2
+
+
+def test_failed_retrieve_task_ends_the_stream(fake_rag, monkeypatch):
+    async def retrieve_batch(items):
+        raise RuntimeError("unexpected")
+
+    monkeypatch.setattr(routes, "_retrieve_batch", retrieve_batch)
+
+    lines = _ask_batch({"items": ["질문 1", {"id": "q-2", "message": "질문 2"}]})
+    results = sorted(lines[:-1], key=lambda r: r["index"])
+
+    assert [(r["id"], r["ok"], r["status"]) for r in results] == [(0, False, 500), ("q-2", False, 500)]
+    assert "unexpected" in results[0]["error"]
+    assert lines[-1]["done"] and lines[-1]["errors"] == 2
+
+
+def test_invalid_payload_is_rejected_before_streaming():
+    request = SimpleNamespace(headers={}, client=None)
+    resp = asyncio.run(routes.ask_batch({"items": []}, request))
+    assert resp.status_code == 400
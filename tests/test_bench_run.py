@@ -0,0 +1,53 @@
+import json
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+from tests.conftest import ROOT
+
+for module in ("fastapi", "uvicorn", "httpx", "qdrant_client", "aiofiles", "psutil"):
+    pytest.importorskip(module)
+
+
+# 앱 모듈은 import 시점에 환경 변수를 읽으므로 별도 프로세스에서 실행
+#   - 임베딩 모델 없이 돌도록 워밍업을 끄고 RAG 컨텍스트는 고정값으로 대체
+#   - 작업 디렉토리(tmp)에는 static/ templates/ 가 없음 → main.py가 자기 위치 기준으로 찾아야 함
+SCRIPT = textwrap.dedent("""
+    import argparse, asyncio, json, os, sys
+    from pathlib import Path
+
+    sys.path.insert(0, {root!r})
+    os.environ["WARMUP_ENABLED"] = "false"
+    from bench import run
+
+    port = run._free_port()
+    run.setup_workdir(Path({workdir!r}), port)
+
+    from app.api import routes
+
+    async def fixed_context(message, vector=None):
+        return "context", ["manual.txt"], True
+
+    routes.build_context = fixed_context
+
+    args = argparse.Namespace(concurrency="1,4", requests=8, ttft_ms=5.0, tokens_per_sec=2000.0, tokens=8)
+    print(json.dumps(asyncio.run(run.chat_phase(args, ["q1", "q2", "q3"], port))))
+""")
+
+
+def test_chat_phase_against_fake_upstream(tmp_path):
+    workdir = tmp_path / "work"
+    proc = subprocess.run(
+        [sys.executable, "-c", SCRIPT.format(root=str(ROOT), workdir=str(workdir))],
+        cwd=tmp_path, capture_output=True, text=True, timeout=120,
+    )
+    assert proc.returncode == 0, proc.stderr
+
+    levels = json.loads(proc.stdout.strip().splitlines()[-1])
+    assert [lv["concurrency"] for lv in levels] == [1, 4]
+    for lv in levels:
+        assert lv["requests"] == 8
+        assert lv["errors"] == 0
+        assert lv["rps"] > 0
@@ -0,0 +1,63 @@
+import sys
+import threading
+import time
+import types
+
+import pytest
+
+from app.rag import jobs
+
+
+@pytest.fixture
+def fake_indexer(monkeypatch):
+    """langchain 등 색인 의존성 없이 _run_job이 호출하는 indexer.run만 대체"""
+    events = []
+    gate = threading.Event()
+
+    def run(progress=None, source_ids=None, force=False):
+        events.append("run:start")
+        gate.wait(5)
+        events.append("run:end")
+        return {"files": 0}
+
+    monkeypatch.setitem(sys.modules, "app.rag.indexer", types.SimpleNamespace(run=run))
+    return events, gate
+
+
+def _wait_for(cond, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if cond():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_run_exclusive_rejects_while_job_active(fake_indexer):
+    events, gate = fake_indexer
+    job = jobs.submit()
+    assert _wait_for(lambda: job.status == "running")
+
+    with pytest.raises(jobs.IndexBusy):
+        jobs.run_exclusive(events.append, "delete")
+
+    gate.set()
+    assert _wait_for(lambda: job.status == "succeeded")
+    assert "delete" not in events
+
+
+def test_job_submitted_during_exclusive_step_waits(fake_indexer):
+    events, gate = fake_indexer
+    gate.set()
+    submitted = {}
+
+    def delete():
+        events.append("delete:start")
+        # 삭제 도중 embed-all이 들어와도 삭제가 끝난 뒤에 색인 시작
+        submitted["job"] = jobs.submit()
+        time.sleep(0.1)
+        events.append("delete:end")
+
+    jobs.run_exclusive(delete)
+    assert _wait_for(lambda: submitted["job"].status == "succeeded")
+    assert events == ["delete:start", "delete:end", "run:start", "run:end"]
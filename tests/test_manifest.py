@@ -0,0 +1,15 @@
+from app.rag.manifest import chunk_hash, point_id
+
+
+def test_chunk_hash_is_stable():
+    meta = {"source": "data/uploads/a.txt", "start_index": 680}
+    assert chunk_hash("a.txt", "본문", meta) == chunk_hash("a.txt", "본문", dict(reversed(meta.items())))
+    assert point_id(chunk_hash("a.txt", "본문", meta)) == point_id(chunk_hash("a.txt", "본문", meta))
+
+
+def test_moved_chunk_gets_new_hash():
+    # 앞부분이 수정되어 위치만 바뀐 청크도 다시 올려서 payload의 start_index를 갱신
+    before = chunk_hash("a.txt", "본문", {"start_index": 680})
+    assert chunk_hash("a.txt", "본문", {"start_index": 780}) != before
+    assert chunk_hash("a.txt", "본문", {"start_index": 680, "page": 2}) != before
+    assert chunk_hash("b.txt", "본문", {"start_index": 680}) != before
@@ -0,0 +1,63 @@
+import threading
+
+import pytest
+
+pytest.importorskip("qdrant_client")
+
+from app.service import rag_service
+
+# 겹침 판정이 우연히 맞지 않도록 위치마다 다른 문자
+DOC = "".join(chr(0xAC00 + i % 2000) for i in range(3000))
+
+
+def _doc(start: int, end: int, stored_start: int | None, score: float = 0.5) -> dict:
+    meta = {"source_id": "a.txt", "source": "data/uploads/a.txt"}
+    if stored_start is not None:
+        meta["start_index"] = stored_start
+    return {"text": DOC[start:end], "metadata": meta, "score": score}
+
+
+def test_merges_neighbours_by_position():
+    merged = rag_service.merge_chunks([_doc(680, 1480, 680, 0.9), _doc(0, 800, 0, 0.3)])
+    assert len(merged) == 1
+    assert merged[0]["text"] == DOC[0:1480]
+    assert merged[0]["score"] == 0.9
+
+
+def test_stale_start_index_falls_back_to_text_overlap():
+    # 앞쪽에 100자가 삽입된 뒤, 두 번째 청크는 수정 전 위치(680)를 그대로 가짐
+    merged = rag_service.merge_chunks([_doc(0, 800, 0), _doc(780, 1580, 680)])
+    assert len(merged) == 1
+    assert merged[0]["text"] == DOC[0:1580]
+
+
+def test_stale_start_index_without_overlap_keeps_both_pieces():
+    merged = rag_service.merge_chunks([_doc(0, 800, 0), _doc(1200, 2000, 700)])
+    assert sorted(m["text"] for m in merged) == sorted([DOC[0:800], DOC[1200:2000]])
+
+
+def test_merges_chunks_without_position_by_text():
+    merged = rag_service.merge_chunks([_doc(0, 800, None), _doc(680, 1480, None)])
+    assert [m["text"] for m in merged] == [DOC[0:1480]]
+
+
+def test_count_tokens_estimates_until_tokenizer_is_loaded(monkeypatch):
+    class FakeTokenizer:
+        def encode(self, text, add_special_tokens=False):
+            return list(text)
+
+    release = threading.Event()
+
+    def slow_load():
+        release.wait(5)
+        return FakeTokenizer()
+
+    monkeypatch.setattr(rag_service, "_tokenizer_future", None)
+    monkeypatch.setattr(rag_service, "_get_tokenizer", slow_load)
+
+    # 로딩 중에는 기다리지 않고 추정치 (ASCII 4자 ≈ 1토큰)
+    assert rag_service.count_tokens("abcdefgh") == 2
+
+    release.set()
+    rag_service._load_tokenizer().result(timeout=5)
+    assert rag_service.count_tokens("abcdefgh") == 8
@@ -0,0 +1,29 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("psutil")
+
+from app.service import startup
+
+
+def _call(mw, path: str):
+    async def app(scope, receive, send):
+        pass
+
+    mw.app = app
+    asyncio.run(mw(scope={"type": "http", "method": "GET", "path": path}, receive=None, send=None))
+
+
+def test_first_request_logger_ignores_cheap_chat_routes(monkeypatch):
+    monkeypatch.setitem(startup.state, "first_request_ms", None)
+    mw = startup.FirstRequestLogger(app=None)
+
+    for path in ("/api/chat/admission", "/api/chat/cache", "/healthz", "/api/chat/ask/extra"):
+        _call(mw, path)
+    assert not mw.logged
+    assert startup.state["first_request_ms"] is None
+
+    _call(mw, "/api/chat/ask-stream")
+    assert mw.logged
+    assert startup.state["first_request_ms"] is not None
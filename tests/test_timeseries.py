@@ -0,0 +1,60 @@
+import math
+
+from app.service.timeseries import RingBuffer, TieredHistory
+
+FIELDS = ("cpu", "mem")
+
+
+def test_ring_buffer_keeps_latest_in_order():
+    buf = RingBuffer(3, FIELDS)
+    for t in range(5):
+        buf.append(float(t), (t * 10.0, math.nan))
+
+    data = buf.range()
+    assert len(buf) == 3
+    assert data["ts"] == [2.0, 3.0, 4.0]
+    assert data["cpu"] == [20.0, 30.0, 40.0]
+    assert data["mem"] == [None, None, None]
+    assert buf.range(start=3.0)["ts"] == [3.0, 4.0]
+
+
+def test_tiers_bucket_by_timestamp():
+    h = TieredHistory("1:10,10:10", FIELDS)
+    # 0.5초 간격 수집 → 1초 단계는 2개씩 평균, 10초 단계는 20개씩 평균
+    for k in range(41):
+        t = k * 0.5
+        h.add(t, (t, 1.0))
+
+    fine = h.query("1s")
+    assert fine["step"] == 1.0
+    assert fine["ts"] == [float(t) for t in range(10, 20)]
+    assert fine["cpu"][0] == 10.25        # (10.0 + 10.5) / 2
+    assert fine["mem"] == [1.0] * 10
+
+    coarse = h.query("10s")
+    assert coarse["ts"] == [0.0, 10.0]
+    assert coarse["cpu"] == [4.75, 14.75]
+
+
+def test_first_tier_step_follows_sample_interval():
+    h = TieredHistory("1:600,60:1440", FIELDS, min_step=5.0)
+    assert h.tier_names() == ["5s", "1m"]
+
+    # 5초 간격 수집: 점 1개 = 5초, 600개 = 50분
+    for k in range(700):
+        h.add(k * 5.0, (1.0, 2.0))
+    fine = h.query()
+    assert fine["step"] == 5.0
+    assert len(fine["ts"]) == 600
+    assert fine["ts"][-1] - fine["ts"][0] == 599 * 5.0
+
+
+def test_nan_values_are_skipped_in_averages():
+    h = TieredHistory("1:10", FIELDS)
+    h.add(0.0, (10.0, math.nan))
+    h.add(0.5, (20.0, math.nan))
+    h.add(1.0, (0.0, 3.0))   # 다음 구간 → 0초 구간 기록
+
+    data = h.query()
+    assert data["cpu"] == [15.0]
+    assert data["mem"] == [None]
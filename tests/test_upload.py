@@ -0,0 +1,58 @@
+import asyncio
+import json
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("aiofiles")
+
+from fastapi import HTTPException
+
+from app.api import upload
+
+
+class FakeFile:
+    def __init__(self, filename: str):
+        self.filename = filename
+        self.closed = False
+
+    async def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def fake_save(monkeypatch):
+    async def save_upload(f):
+        if f.filename.endswith(".exe"):
+            raise HTTPException(status_code=400, detail="지원하지 않는 파일 형식입니다.")
+        if f.filename == "boom.txt":
+            raise OSError("disk full")
+        return {"filename": f.filename, "size": 1, "sha256": "0" * 64}
+
+    monkeypatch.setattr(upload, "save_upload", save_upload)
+
+
+def test_partial_failure_reports_each_file(fake_save):
+    files = [FakeFile("a.txt"), FakeFile("bad.exe"), FakeFile("boom.txt"), FakeFile("b.txt")]
+    resp = asyncio.run(upload.upload_file(files=files, file=None))
+
+    assert resp.status_code == 207
+    body = json.loads(resp.body)
+    assert not body["ok"]
+    # 실패 뒤의 파일도 계속 저장
+    assert [f["filename"] for f in body["files"]] == ["a.txt", "b.txt"]
+    assert [(f["filename"], f["status"]) for f in body["failed"]] == [("bad.exe", 400), ("boom.txt", 500)]
+    assert "disk full" in body["failed"][1]["error"]
+    assert all(f.closed for f in files)
+
+
+def test_single_file_failure_keeps_error_status(fake_save):
+    with pytest.raises(HTTPException) as e:
+        asyncio.run(upload.upload_file(files=[FakeFile("bad.exe")], file=None))
+    assert e.value.status_code == 400
+
+
+def test_all_saved(fake_save):
+    body = asyncio.run(upload.upload_file(files=[FakeFile("a.txt")], file=FakeFile("b.txt")))
+    assert body["ok"] and body["failed"] == []
+    assert [f["filename"] for f in body["files"]] == ["a.txt", "b.txt"]